@@ -1,5 +1,16 @@
+import asyncio
+import csv
 import re
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .gene2uniprot import gene2uniprotid
+from .rate_limit import RateLimiter
 
 
 def Check_Value(val:[str, float, int], valid_values:set, valname:str, message='Wrong value123'):
@@ -27,6 +38,134 @@ def Check_Value(val:[str, float, int], valid_values:set, valname:str, message='W
         raise Exception(message)
 
 
+# DB priority for Gene and where the value starts in a 'db:value' token, by the first letter of the DB
+_GENE_DB_PRIORITY = {'u': (0, len('uniprotkb:')), 'p': (1, len('psi-mi:')), 'e': (2, len('entrez gene/locuslink:'))}
+_DB = r'(?:uniprotkb|psi-mi|entrez gene/locuslink)'
+
+# Cells are joined with '\x00' into one string and scanned with a single findall. Tokens are 'db:value',
+# the value running to the next '|'. The pattern returns every cell end and every token whose value
+# is a valid gene name; other tokens are skipped whole, so tokens are the same as in a per-cell
+# re.findall(r'(uniprotkb|psi-mi|entrez gene/locuslink):([^|]+)', cell).
+_TOKEN_PATTERN = re.compile(
+    rf'(?:{_DB}:[^|\x00]+|(?!{_DB}:[^|\x00])[^\x00])*?'
+    rf'(\x00|{_DB}:[A-Za-z][A-Za-z0-9\-]*\n?(?![^|\x00]))'
+)
+_UNIPROT_PATTERN = re.compile(r'[A-Z][A-Z0-9]{5,9}\n?')  # 6-10 символов, первая буква
+_ALIAS_LOOKAHEAD_CHUNK = 1024
+
+# cell end or one 'key:value' item of a joined column (publications, confidence values), items without ':' are skipped
+_ITEM_PATTERN = re.compile(r'\x00|[^|\x00:]*:[^|\x00]*')
+# key (stripped) and value (left-stripped) of every item of a '\x01'-joined list of 'key:value' items
+_ITEM_KEY_PATTERN = re.compile(r'\s*([^\x01:]*?)\s*:[^\x01]*')
+_ITEM_VALUE_PATTERN = re.compile(r'[^\x01:]*:\s*([^\x01]*)')
+_TAXID_PATTERN = re.compile(r'\x00|taxid:\d+')
+
+
+def _split_items(cells):
+    """
+    Splits '|'-separated 'key:value' items of every cell, the value running to the end of the item.
+
+    Returns
+    -------
+    tuple[np.ndarray, list, pd.Series]
+        Cell position, key (stripped) and value (stripped) of every item.
+    """
+    found = np.array(_ITEM_PATTERN.findall('\x00'.join(map(str, cells))), dtype=object)
+    is_cell_end = found == np.array('\x00', dtype=object)  # a str scalar would lose its trailing '\x00'
+    items = '\x01'.join(found[~is_cell_end].tolist())
+    positions = np.cumsum(is_cell_end)[~is_cell_end]
+    return positions, _ITEM_KEY_PATTERN.findall(items), pd.Series(_ITEM_VALUE_PATTERN.findall(items), dtype=str).str.rstrip()
+
+
+def _first_taxids(cells):
+    # first 'taxid:<digits>' of every cell as float, NaN where there is none (same as re.search per cell)
+    found = np.array(_TAXID_PATTERN.findall('\x00'.join(map(str, cells)) + '\x00'), dtype=object)
+    is_cell_end = found == np.array('\x00', dtype=object)
+    positions = np.cumsum(is_cell_end)[~is_cell_end]
+    first = np.ones(len(positions), dtype=bool)
+    first[1:] = positions[1:] != positions[:-1]
+    taxids = np.full(len(cells), np.nan)
+    taxids[positions[first]] = [float(taxid[len('taxid:'):]) for taxid in found[~is_cell_end][first].tolist()]
+    return taxids
+
+
+def _find_uniprot_gene(cells):
+    """
+    Finds the UniProt ID and the gene name of every cell of an ID or Alias column.
+
+    The UniProt ID is the first uniprotkb value shaped like an accession, the gene name is the first
+    value shaped like a gene name from the DB with the highest priority (uniprotkb, psi-mi, entrez gene/locuslink).
+
+    Parameters
+    ----------
+    cells : list
+        Cell values, converted with str().
+
+    Returns
+    -------
+    tuple[list, list]
+        UniProt IDs and gene names, None where nothing was found.
+    """
+    uniprot_ids = [None] * len(cells)
+    genes = [None] * len(cells)
+    if not cells:
+        return uniprot_ids, genes
+
+    tokens = np.array(_TOKEN_PATTERN.findall('\x00'.join(map(str, cells)) + '\x00'), dtype=object)
+    is_cell_end = tokens == np.array('\x00', dtype=object)  # a str scalar would lose its trailing '\x00'
+    rows = np.cumsum(is_cell_end)[~is_cell_end]
+
+    last_row = -1
+    for row, token in zip(rows.tolist(), tokens[~is_cell_end].tolist()):
+        rank, value_start = _GENE_DB_PRIORITY[token[0]]
+        value = token[value_start:]
+        if row != last_row:
+            last_row = row
+            gene_rank = rank
+            genes[row] = value
+        elif rank < gene_rank:
+            gene_rank = rank
+            genes[row] = value
+        if rank == 0 and uniprot_ids[row] is None and _UNIPROT_PATTERN.fullmatch(value):
+            uniprot_ids[row] = value
+    return uniprot_ids, genes
+
+
+def _find_alias_uniprot_gene(cells, id_uniprot_ids, id_genes):
+    """
+    _find_uniprot_gene over an Alias column, evaluated only in rows where the ID column misses a value.
+
+    combine_first reads Alias values only in those rows, but the dtype pandas infers for a column
+    depends on whether it holds any value at all, so the remaining rows are scanned in growing chunks
+    until one UniProt ID and one gene name are found (or the column ends).
+
+    Returns
+    -------
+    tuple[list, list]
+        UniProt IDs and gene names, None in rows that were not evaluated or where nothing was found.
+    """
+    uniprot_ids = [None] * len(cells)
+    genes = [None] * len(cells)
+    incomplete = (np.array(id_uniprot_ids, dtype=object) == None) | (np.array(id_genes, dtype=object) == None)  # noqa: E711
+
+    def evaluate(rows):
+        found_uniprot_ids, found_genes = _find_uniprot_gene([cells[i] for i in rows])
+        for i, uniprot_id, gene in zip(rows, found_uniprot_ids, found_genes):
+            uniprot_ids[i] = uniprot_id
+            genes[i] = gene
+        return found_uniprot_ids.count(None) < len(rows), found_genes.count(None) < len(rows)
+
+    has_uniprot, has_gene = evaluate(np.flatnonzero(incomplete).tolist())
+    rest = np.flatnonzero(~incomplete).tolist()
+    start, chunk = 0, _ALIAS_LOOKAHEAD_CHUNK
+    while not (has_uniprot and has_gene) and start < len(rest):
+        found_uniprot, found_gene = evaluate(rest[start:start + chunk])
+        has_uniprot, has_gene = has_uniprot or found_uniprot, has_gene or found_gene
+        start += chunk
+        chunk *= 2
+    return uniprot_ids, genes
+
+
 class MITAB_parser():
     
     MITAB_columns = {'#ID(s) interactor A', 'ID(s) interactor B', 'Alt. ID(s) interactor A',
@@ -52,32 +191,296 @@ class MITAB_parser():
        'Biological effect(s) interactor B', 'Causal regulatory mechanism',
        'Causal statement'}
     
-    valid_parsing_data = {'protein_id', 'taxid', 'publications'}
+    valid_parsing_data = {'protein_id', 'taxid', 'publications', 'confidence', 'source'}
+    valid_taxid_types = {'digits', 'text', 'full'}
+    
+    # MITAB columns needed for each kind of parsing_data
+    required_columns = {'protein_id': ['#ID(s) interactor A', 'ID(s) interactor B',
+                                       'Alias(es) interactor A', 'Alias(es) interactor B'],
+                        'taxid': ['Taxid interactor A', 'Taxid interactor B'],
+                        'publications': ['Publication Identifier(s)'],
+                        'confidence': ['Confidence value(s)'],
+                        'source': ['Source database(s)']}
     
-    def __init__(self, df, parsing_data = ['UniProtID']):
+    def __init__(self, df, parsing_data = ['protein_id'], confidence_methods=None, taxid_type='digits'):
         self.df = df
+        # scoring methods of the 'confidence' columns, None for every method found in df
+        self.confidence_methods = confidence_methods
+        # part of the taxid values kept by 'taxid', see get_taxid_from_mitab
+        Check_Value(taxid_type, self.valid_taxid_types, 'taxid_type')
+        self.taxid_type = taxid_type
         # instructions for parsing
         self.get_data = {'protein_id': self.get_UID_Gene_from_mitab, 
-                                'taxid': self.get_taxid_from_mitab,
-                                'publications': self.get_publications_from_mitab}
+                                'taxid': lambda: self.get_taxid_from_mitab(self.taxid_type),
+                                'publications': self.get_publication_from_mitab,
+                                'confidence': lambda: self.get_confidence_from_mitab(self.confidence_methods),
+                                'source': self.get_source_from_mitab}
         
         self._validate_required_data(parsing_data)
         self.required_data = parsing_data
         self._check_columns()
         
-    def _validate_required_data(self, required_data):
+    @classmethod
+    def _validate_required_data(cls, required_data):
         for datatype in required_data:
-            valid_values = set(self.data_path_A.keys())
-            Check_Value(datatype, valid_values, valname='', 
-                        message=f"Valid members of 'required_data' list is {valid_values}.\n\t   Example: required_data=['UniProtID', 'GO_terms']")
+            Check_Value(datatype, cls.valid_parsing_data, valname='', 
+                        message=f"Valid members of 'parsing_data' list is {cls.valid_parsing_data}.\n\t   Example: parsing_data=['protein_id', 'taxid']")
     
+    @classmethod
+    def _columns_for(cls, parsing_data):
+        # MITAB columns needed for parsing_data, without duplicates
+        return list(dict.fromkeys(column for k in parsing_data for column in cls.required_columns[k]))
+
+    @classmethod
+    def _file_columns(cls, parsing_data, row_filter=None):
+        # columns to read from a file: those of parsing_data, then those of the row filter
+        columns = cls._columns_for(parsing_data)
+        if row_filter is not None:
+            columns += [column for column in row_filter.columns if column not in columns]
+        return columns
+
     def _check_columns(self):
-        valid_columns = set(self.data.columns)
-        necessary_cols = {item for k in self.required_data for item in list(self.data_path_A[k].keys()) + list(self.data_path_B[k].keys())} # get set of necessary columns for required data
+        valid_columns = set(self.df.columns)
+        necessary_cols = self._columns_for(self.required_data) # get list of necessary columns for required data
         for column in necessary_cols:
             Check_Value(column, valid_columns, valname='',
                     message=f"Your MITAB Table isn`t contain '{column}'.\nFor current required_data it must contain at least:\n{necessary_cols}.")
             
+    def parse(self, compact=False, row_filter=None, publications='dict'):
+        """
+        Runs the extractors for parsing_data and returns their outputs side by side.
+
+        The source table is not modified or copied, extractors only read the columns they need.
+
+        Parameters
+        ----------
+        compact : bool
+            If True, return UniProt IDs and gene names as categoricals whose categories are shared
+            by the A and B columns, and taxids as nullable Int32 (shared categoricals too for
+            taxid_type 'text' or 'full'). Interaction tables repeat the same
+            proteins many times, so this takes several times less memory and speeds up groupby/merge.
+        row_filter : MITABFilter or None
+            Rows to keep. The filter runs on its own columns first, so the extractors only parse
+            the rows that pass it.
+        publications : str
+            'dict' (default) returns a Publications column of {db: [ids]} dicts. 'table' returns the
+            long table of get_publication_table_from_mitab instead, one row per identifier; it needs
+            parsing_data=['publications'].
+
+        Returns
+        -------
+        pd.DataFrame
+            E.g. UniProtID_A, UniProtID_B, Gene_A, Gene_B, taxid_A, taxid_B, Publications
+            for parsing_data=['protein_id', 'taxid', 'publications'], with the index of the source table.
+            With publications='table', the row_idx, db, id table.
+
+        Examples
+        --------
+        >>> parser = MITAB_parser(df, parsing_data=['protein_id', 'taxid'])
+        >>> interactors = parser.parse()
+        >>> human = parser.parse(row_filter=MITABFilter(min_score=0.45, taxids=[9606]))
+        """
+        self._check_publications(publications, self.required_data)
+        if row_filter is not None:
+            keep = row_filter.mask(self.df)
+            subset = self.df.loc[keep, self._columns_for(self.required_data)]
+            return type(self)(subset, self.required_data, self.confidence_methods,
+                              self.taxid_type).parse(compact, publications=publications)
+        if publications == 'table':
+            return self.get_publication_table_from_mitab()
+        result = pd.concat([self.get_data[datatype]() for datatype in self.required_data], axis=1)
+        if compact:
+            result = _to_compact_dtypes(result, self.taxid_type)
+        return result
+
+    @staticmethod
+    def _check_publications(publications, parsing_data):
+        Check_Value(publications, {'dict', 'table'}, 'publications')
+        if publications == 'table' and list(parsing_data) != ['publications']:
+            raise ValueError("publications='table' returns one row per identifier and needs parsing_data=['publications']")
+
+    @staticmethod
+    def _read_header(path):
+        return list(pd.read_csv(path, sep='\t', quoting=csv.QUOTE_NONE, dtype=str, compression='infer', nrows=0).columns)
+
+    @staticmethod
+    def _read_chunks(path, chunksize=100000, columns=None, engine='c'):
+        """
+        Reads a MITAB file in chunks.
+
+        Parameters
+        ----------
+        path : str
+            Path to a plain or compressed (.gz, .bz2, .zip, .xz) MITAB file with a header line.
+        chunksize : int
+            Number of rows per chunk.
+        columns : list or None
+            Columns to read, None for all. Other columns are skipped by the CSV parser.
+        engine : str
+            'c' (pandas.read_csv) or 'pyarrow' (pyarrow.csv.open_csv, needs pyarrow).
+
+        Returns
+        -------
+        Iterator[pd.DataFrame]
+            Chunks with string columns. Their index continues from chunk to chunk, so it is the row
+            number in the file. Empty fields are kept as '' (MITAB marks missing values with '-').
+        """
+        if engine == 'pyarrow':
+            yield from _read_arrow_chunks(path, chunksize, columns)
+            return
+        with pd.read_csv(path, sep='\t', quoting=csv.QUOTE_NONE, dtype=str, na_filter=False, usecols=columns,
+                         compression='infer', chunksize=chunksize) as reader:
+            yield from reader
+
+    @classmethod
+    def _confidence_methods_in(cls, path, chunksize=100000, engine='c'):
+        # sorted scoring methods of the whole file, read in a first pass over its confidence column
+        methods = set()
+        column = cls.required_columns['confidence'][0]
+        for chunk in cls._read_chunks(path, chunksize, [column], engine):
+            methods.update(_split_items(chunk[column].tolist())[1])
+        return sorted(methods)
+
+    @classmethod
+    def _parse_chunks_in_pool(cls, chunks, parsing_data, n_workers, compact=False, row_filter=None,
+                              confidence_methods=None, publications='dict', taxid_type='digits'):
+        # at most 2 * n_workers chunks are in flight, results are yielded in file order
+        columns = cls._file_columns(parsing_data, row_filter)
+        pool = ProcessPoolExecutor(max_workers=n_workers)
+        pending = deque()
+        try:
+            for chunk in chunks:
+                cls(chunk, parsing_data)  # check the columns before sending the chunk
+                pending.append(pool.submit(_parse_chunk, cls, chunk.loc[:, columns], parsing_data, compact,
+                                           row_filter, confidence_methods, publications, taxid_type))
+                if len(pending) >= 2 * n_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @classmethod
+    def from_file(cls, path, parsing_data=['protein_id'], chunksize=100000, iterator=False, n_workers=1,
+                  engine='c', compact=False, cache=None, row_filter=None, confidence_methods=None,
+                  publications='dict', taxid_type='digits'):
+        """
+        Parses a MITAB file chunk by chunk, so that the file is never loaded whole.
+
+        Only the columns needed for parsing_data (see MITAB_parser.required_columns) are read,
+        the other columns of the file are skipped by the CSV parser.
+
+        Parameters
+        ----------
+        path : str
+            Path to a plain or compressed (.gz, .bz2, .zip, .xz) MITAB file with a header line.
+        parsing_data : list
+            Data to extract, members of MITAB_parser.valid_parsing_data.
+        chunksize : int
+            Number of rows parsed at once. Peak memory is proportional to it. Default is 100000.
+        iterator : bool
+            If True, return an iterator over per-chunk results instead of one DataFrame.
+        n_workers : int
+            Number of worker processes parsing chunks in parallel. Chunks are read in the calling
+            process and only their required columns are sent to the workers; at most 2 * n_workers
+            chunks are in flight. Default is 1 (parse in the calling process).
+        engine : str
+            CSV reader: 'c' (pandas, default) or 'pyarrow' (multithreaded, requires pyarrow).
+        compact : bool
+            Compact dtypes, see MITAB_parser.parse. The concatenated result has one category set per
+            A/B column pair; with iterator=True every chunk has its own categories.
+        cache : MITABCache or None
+            Cache of parsed results. If the file and options match a cached entry, its Parquet
+            parts are read instead of parsing the file; otherwise the parsed chunks are stored.
+            Entries are keyed by chunksize and engine too, so cached chunks have chunksize rows.
+            Not available for 'publications' dicts, which do not round-trip through Parquet; the
+            publications='table' output can be cached.
+        row_filter : MITABFilter or None
+            Rows to keep, see MITAB_parser.parse. Its columns are read in addition to those of
+            parsing_data and it is applied to every chunk before the extractors run.
+        confidence_methods : list or None
+            Scoring methods of the 'confidence' columns, see MITAB_parser.get_confidence_from_mitab.
+            Every chunk gets one 'confidence_<method>' column per method, in sorted order, whichever
+            methods it contains. None uses every method of the file, found in a first pass over its
+            'Confidence value(s)' column: the file is then read twice. With a cache, the methods
+            found are stored, so the first pass runs once per file; without one, a warning is issued.
+        publications : str
+            'dict' or 'table', see MITAB_parser.parse. With 'table' every chunk gives a long
+            row_idx, db, id table whose row_idx is the row number in the file; the concatenated
+            table has a RangeIndex and one category set for db.
+        taxid_type : str
+            Part of the taxid values kept by 'taxid': 'digits' (default), 'text' or 'full', see
+            MITAB_parser.get_taxid_from_mitab.
+
+        Returns
+        -------
+        pd.DataFrame or Iterator[pd.DataFrame]
+            Results of the extractors for parsing_data side by side (e.g. UniProtID_A, ..., taxid_B),
+            indexed by row number in the file.
+
+        Examples
+        --------
+        >>> interactors = MITAB_parser.from_file("intact.txt.gz", ['protein_id', 'taxid'], n_workers=8)
+        >>> for chunk in MITAB_parser.from_file("intact.txt.gz", ['protein_id', 'taxid'], iterator=True):
+        ...     chunk.to_csv("interactors.tsv", sep='\t', mode='a')
+        >>> confident = MITAB_parser.from_file("intact.txt.gz", ['protein_id'], row_filter=MITABFilter(min_score=0.6))
+        >>> publications = MITAB_parser.from_file("intact.txt.gz", ['publications'], publications='table')
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        if n_workers < 1:
+            raise ValueError("n_workers must be at least 1")
+        Check_Value(engine, {'c', 'pyarrow'}, 'engine')
+        Check_Value(taxid_type, cls.valid_taxid_types, 'taxid_type')
+        cls._validate_required_data(parsing_data)
+        cls._check_publications(publications, parsing_data)
+        if cache is not None and 'publications' in parsing_data and publications == 'dict':
+            raise ValueError("'publications' dicts can not be cached, use cache=None or publications='table'")
+        columns = cls._file_columns(parsing_data, row_filter)
+        header = set(cls._read_header(path))
+        for column in columns:
+            Check_Value(column, header, valname='',
+                        message=f"Your MITAB file isn`t contain '{column}'.\nFor current required_data it must contain at least:\n{columns}.")
+
+        if confidence_methods is not None:
+            confidence_methods = sorted(set(confidence_methods))
+        elif 'confidence' in parsing_data and cache is None:
+            warnings.warn("confidence_methods=None reads the file twice to find its scoring methods, "
+                          "pass confidence_methods or a MITABCache", stacklevel=2)
+
+        def parse_chunks():
+            # chunks contain different scoring methods, so they are fixed for the whole file
+            methods = confidence_methods
+            if methods is None and 'confidence' in parsing_data:
+                if cache is None:
+                    methods = cls._confidence_methods_in(path, chunksize, engine)
+                else:
+                    # stored apart from the parsed chunks, so that parses with other options reuse it
+                    methods = cache.get_or_compute(cache.key(path, scan='confidence_methods'),
+                                                   lambda: cls._confidence_methods_in(path, chunksize, engine))
+            chunks = cls._read_chunks(path, chunksize, columns, engine)
+            if n_workers == 1:
+                return (cls(chunk, parsing_data, methods, taxid_type).parse(compact, row_filter, publications)
+                        for chunk in chunks)
+            return cls._parse_chunks_in_pool(chunks, parsing_data, n_workers, compact, row_filter, methods,
+                                             publications, taxid_type)
+
+        if cache is not None:
+            # chunksize is part of the key, so cached chunks keep the size (and memory bound) asked for
+            key = cache.key(path, parsing_data=list(parsing_data), compact=compact, chunksize=chunksize, engine=engine,
+                            row_filter=None if row_filter is None else row_filter.options(),
+                            confidence_methods=confidence_methods, publications=publications, taxid_type=taxid_type)
+            results = cache.get_or_parse(key, parse_chunks)
+        else:
+            results = parse_chunks()
+        if iterator:
+            return results
+        if publications == 'table':
+            return _concat_publication_tables(list(results))
+        if compact:
+            return _concat_compact(list(results))
+        return pd.concat(results)
+
     def get_UID_Gene_from_mitab(self):
         
         '''
@@ -104,48 +507,31 @@ class MITAB_parser():
         '''
         
         target_columns = ['#ID(s) interactor A', 'ID(s) interactor B', 'Alias(es) interactor A', 'Alias(es) interactor B']
-        
-        
-        # Regular expression for DB pattern
-        db_pattern = re.compile(r'(uniprotkb|psi-mi|entrez gene/locuslink):([^|]+)')
-        
-        # UniProtID and Gene Patterns
-        uniprot_pattern = re.compile(r'^[A-Z][A-Z0-9]{5,9}$')  # 6-10 символов, первая буква
-        gene_pattern = re.compile(r'^[A-Za-z][A-Za-z0-9\-]*$')  # Начинается с буквы
-
-        # DB priority for Gene
-        gene_db_priority = ['uniprotkb', 'psi-mi', 'entrez gene/locuslink']
-
-        # function for finding UniProtID
-        def find_uniprot(s):
-            for db, value in db_pattern.findall(str(s)):
-                if db == 'uniprotkb' and uniprot_pattern.match(value):
-                    return value
-            return None
-
-        # function for finding Gene
-        def find_gene(s):
-            entries = db_pattern.findall(str(s))
-            # search by DB priority
-            for db in gene_db_priority:
-                for entry_db, value in entries:
-                    if entry_db == db and gene_pattern.match(value):
-                        return value
-            return None
-
-        # transform data
-        renamed_columns = ['ID_A', 'ID_B', 'Alias_A', 'Alias_B']
-        self.df = self.df.loc[:, target_columns].rename(columns={c_old:c_new for c_old, c_new in zip(target_columns, renamed_columns)})
 
-        # data processing
+        # select data
+        columns = dict(zip(['ID_A', 'ID_B', 'Alias_A', 'Alias_B'], target_columns))
+
+        # data processing: IDs are searched in every row, Aliases only where IDs are not enough
+        def as_series(values, column):
+            # Series.apply keeps the dtype of an empty column
+            return pd.Series(values, index=column.index, dtype=column.dtype if column.empty else None)
+
+        found = {}
+        for side in ('A', 'B'):
+            ids, aliases = self.df[columns[f'ID_{side}']], self.df[columns[f'Alias_{side}']]
+            uniprot_ids, genes = _find_uniprot_gene(ids.tolist())
+            alias_uniprot_ids, alias_genes = _find_alias_uniprot_gene(aliases.tolist(), uniprot_ids, genes)
+            found[side] = [as_series(uniprot_ids, ids), as_series(alias_uniprot_ids, aliases),
+                           as_series(genes, ids), as_series(alias_genes, aliases)]
+
         result = pd.DataFrame({
             # UniProtID from ID and Alias
-            'UniProtID_A': self.df['ID_A'].apply(find_uniprot).combine_first(self.df['Alias_A'].apply(find_uniprot)),
-            'UniProtID_B': self.df['ID_B'].apply(find_uniprot).combine_first(self.df['Alias_B'].apply(find_uniprot)),
+            'UniProtID_A': found['A'][0].combine_first(found['A'][1]),
+            'UniProtID_B': found['B'][0].combine_first(found['B'][1]),
             
             # Gene from ID and Alias (ID priority)
-            'Gene_A': self.df['ID_A'].apply(find_gene).combine_first(self.df['Alias_A'].apply(find_gene)),
-            'Gene_B': self.df['ID_B'].apply(find_gene).combine_first(self.df['Alias_B'].apply(find_gene))
+            'Gene_A': found['A'][2].combine_first(found['A'][3]),
+            'Gene_B': found['B'][2].combine_first(found['B'][3])
         })
         return result
     
@@ -181,6 +567,84 @@ class MITAB_parser():
         
         return result
     
+    def get_publication_table_from_mitab(self):
+        """
+        Publication identifiers as a long table with one row per identifier.
+
+        Items are split as in get_publication_from_mitab (db before the first ':', id after it,
+        both stripped); items without ':' such as '-' are skipped.
+
+        Returns
+        -------
+        pd.DataFrame
+            Columns:
+                - 'row_idx': index label of the interaction in the source table
+                - 'db': database name, categorical (e.g. 'pubmed', 'imex', 'doi')
+                - 'id': identifier in that database
+
+        Examples
+        --------
+        >>> publications = parser.get_publication_table_from_mitab()
+        >>> by_id = publications.set_index(['db', 'id']).sort_index()
+        >>> rows = by_id.loc[[('pubmed', '10831611')], 'row_idx']
+        """
+        cells = self.df['Publication Identifier(s)']
+        positions, dbs, ids = _split_items(cells.tolist())
+
+        return pd.DataFrame({
+            'row_idx': cells.index.to_numpy()[positions],
+            'db': pd.Categorical(dbs),
+            'id': ids,
+        })
+
+    def get_confidence_from_mitab(self, methods=None):
+        """
+        Confidence scores as one float column per scoring method.
+
+        'Confidence value(s)' items look like 'intact-miscore:0.56|author score:high'. Non-numeric
+        scores are NaN; if a row repeats a method, its first score is used.
+
+        Parameters
+        ----------
+        methods : list or None
+            Scoring methods to return (e.g. ['intact-miscore']). None returns every method found.
+
+        Returns
+        -------
+        pd.DataFrame
+            A 'confidence_<method>' float64 column per method, NaN where the row has no such score,
+            with the index of the source table.
+        """
+        cells = self.df['Confidence value(s)']
+        positions, keys, values = _split_items(cells.tolist())
+        if methods is None:
+            methods = list(dict.fromkeys(keys))
+        columns = pd.Index(methods).get_indexer(keys)  # -1 for other methods
+        wanted = columns >= 0
+        positions, columns, values = positions[wanted], columns[wanted], values[wanted]
+        # keep the first score of every (row, method)
+        _, first = np.unique(positions * len(methods) + columns, return_index=True)
+        scores = np.full((len(cells), len(methods)), np.nan)
+        scores[positions[first], columns[first]] = pd.to_numeric(values.iloc[first], errors='coerce')
+
+        return pd.DataFrame(scores, index=cells.index, columns=[f'confidence_{method}' for method in methods])
+
+    def get_source_from_mitab(self):
+        """
+        Name of the source database of every row.
+
+        'Source database(s)' values look like 'psi-mi:"MI:0469"(IntAct)'. The name in brackets is
+        lowercased, so that files of one database with different capitalization agree.
+
+        Returns
+        -------
+        pd.DataFrame
+            A 'Source_database' column, None where the value is missing ('-'), with the index of the source table.
+        """
+        cells = self.df['Source database(s)'].astype(str).str.strip()
+        names = cells.str.extract(r'\(([^()]*)\)$', expand=False).fillna(cells).str.lower()
+        return pd.DataFrame({'Source_database': names.where(~cells.isin(['-', '']), None)}, index=cells.index)
+
     def get_taxid_from_mitab(self, taxid_type='digits'):
         '''
         This function takes a MITAB file and returns a DataFrame with taxid for each interactor.
@@ -227,13 +691,253 @@ class MITAB_parser():
                 return None
         
         
-        # transform data
-        self.df = self.df.loc[:, target_columns]
-        
         # data processing
         result = pd.DataFrame({
             'taxid_A': self.df[target_columns[0]].apply(lambda x: find_taxid(x, pattern)),
             'taxid_B': self.df[target_columns[1]].apply(lambda x: find_taxid(x, pattern))
         })
         
-        return result
\ No newline at end of file
+        return result
+
+
+class MITABFilter():
+    """
+    Row filter on interaction confidence, organism and negative flag.
+
+    It only reads the few columns it needs, so MITAB_parser.parse and MITAB_parser.from_file apply
+    it before the extractors and parse only the rows that pass. Conditions set to None are not checked.
+
+    Parameters
+    ----------
+    min_score : float or None
+        Keep rows whose score_method confidence is at least min_score. Rows without such a score are dropped.
+    score_method : str
+        Scoring method in 'Confidence value(s)'. Default is 'intact-miscore'.
+    taxids : iterable of int or None
+        Keep rows whose interactors both have their first taxid in taxids.
+    negative : bool or None
+        True keeps only negative interactions ('Negative' is 'true'), False drops them.
+
+    Examples
+    --------
+    >>> human = MITABFilter(min_score=0.45, taxids=[9606], negative=False)
+    >>> interactors = MITAB_parser.from_file("intact.txt.gz", ['protein_id'], row_filter=human)
+    """
+
+    def __init__(self, min_score=None, score_method='intact-miscore', taxids=None, negative=None):
+        if negative is not None and not isinstance(negative, bool):
+            raise ValueError("negative must be True, False or None")
+        self.min_score = None if min_score is None else float(min_score)
+        self.score_method = score_method
+        self.taxids = None if taxids is None else sorted({int(taxid) for taxid in taxids})
+        self.negative = negative
+
+    def __repr__(self):
+        return (f"MITABFilter(min_score={self.min_score!r}, score_method={self.score_method!r}, "
+                f"taxids={self.taxids!r}, negative={self.negative!r})")
+
+    @property
+    def columns(self):
+        """MITAB columns read by the filter."""
+        columns = []
+        if self.min_score is not None:
+            columns += MITAB_parser.required_columns['confidence']
+        if self.taxids is not None:
+            columns += MITAB_parser.required_columns['taxid']
+        if self.negative is not None:
+            columns.append('Negative')
+        return columns
+
+    def options(self):
+        """Filter settings as a JSON-serializable dict, e.g. for MITABCache.key."""
+        return {'min_score': self.min_score, 'score_method': self.score_method,
+                'taxids': self.taxids, 'negative': self.negative}
+
+    def mask(self, df):
+        """
+        Returns
+        -------
+        np.ndarray
+            Boolean array, True for the rows of df that pass the filter.
+        """
+        valid_columns = set(df.columns)
+        for column in self.columns:
+            Check_Value(column, valid_columns, valname='',
+                        message=f"Your MITAB Table isn`t contain '{column}'.\nThe filter needs:\n{self.columns}.")
+        keep = np.ones(len(df), dtype=bool)
+        if self.min_score is not None:
+            scores = MITAB_parser(df, []).get_confidence_from_mitab([self.score_method]).iloc[:, 0].to_numpy()
+            keep &= scores >= self.min_score  # NaN compares False
+        if self.taxids is not None:
+            for column in MITAB_parser.required_columns['taxid']:
+                keep &= np.isin(_first_taxids(df[column].tolist()), self.taxids)
+        if self.negative is not None:
+            negative = df['Negative'].astype(str).str.strip().str.lower().to_numpy() == 'true'
+            keep &= negative if self.negative else ~negative
+        return keep
+
+
+# result columns stored as categoricals with one category set per pair
+_CATEGORICAL_PAIRS = [('UniProtID_A', 'UniProtID_B'), ('Gene_A', 'Gene_B')]
+_TAXID_PAIR = ('taxid_A', 'taxid_B')
+
+
+def _to_compact_dtypes(result, taxid_type='digits'):
+    # digit taxids become Int32, other taxids share categories like the ID pairs; None leaves them as they are
+    result = result.copy(deep=False)
+    pairs = _CATEGORICAL_PAIRS + ([_TAXID_PAIR] if taxid_type in ('text', 'full') else [])
+    for pair in pairs:
+        if pair[0] in result:
+            categories = pd.concat([result[column] for column in pair], ignore_index=True).astype('category').cat.categories
+            for column in pair:
+                result[column] = pd.Categorical(result[column], categories=categories)
+    if taxid_type == 'digits':
+        for column in _TAXID_PAIR:
+            if column in result:
+                result[column] = pd.to_numeric(result[column]).astype('Int32')
+    return result
+
+
+def _concat_compact(results):
+    # chunks have their own categories, recode them to the union before concatenating
+    for pair in _CATEGORICAL_PAIRS + [_TAXID_PAIR]:
+        if pair[0] in results[0] and isinstance(results[0][pair[0]].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([df[column] for df in results for column in pair],
+                                            sort_categories=True).categories
+            for df in results:
+                for column in pair:
+                    df[column] = df[column].cat.set_categories(categories)
+    return pd.concat(results)
+
+
+def _concat_publication_tables(tables):
+    # chunks have their own db categories, they are recoded to the union
+    db = union_categoricals([table['db'] for table in tables], sort_categories=True)
+    result = pd.concat([table.drop(columns='db') for table in tables], ignore_index=True)
+    result.insert(1, 'db', db)
+    return result
+
+
+def _read_arrow_chunks(path, chunksize, columns=None):
+    # pyarrow.csv streams record batches of block_size bytes, they are regrouped into chunksize rows
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        raise ImportError("engine='pyarrow' requires pyarrow, install it with 'pip install pyarrow'")
+
+    names = columns if columns is not None else MITAB_parser._read_header(path)
+    reader = pa_csv.open_csv(
+        path,
+        parse_options=pa_csv.ParseOptions(delimiter='\t', quote_char=False),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=names,
+            column_types={name: pa.string() for name in names},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+
+    def to_frame(table, start):
+        df = table.to_pandas()
+        df.index = pd.RangeIndex(start, start + len(df))
+        return df
+
+    start = 0
+    pending = []
+    n_pending = 0
+    for batch in reader:
+        pending.append(batch)
+        n_pending += batch.num_rows
+        while n_pending >= chunksize:
+            table = pa.Table.from_batches(pending, schema=reader.schema)
+            yield to_frame(table.slice(0, chunksize), start)
+            start += chunksize
+            pending = table.slice(chunksize).to_batches()
+            n_pending -= chunksize
+    if n_pending or start == 0:
+        yield to_frame(pa.Table.from_batches(pending, schema=reader.schema), start)
+
+
+def _parse_chunk(parser_class, chunk, parsing_data, compact=False, row_filter=None, confidence_methods=None,
+                 publications='dict', taxid_type='digits'):
+    # runs in a worker process of MITAB_parser.from_file
+    return parser_class(chunk, parsing_data, confidence_methods, taxid_type).parse(compact, row_filter, publications)
+
+
+async def resolve_missing_uniprot_ids(result, taxid=9606, lookup=None, max_concurrent=20, **kwargs):
+    """
+    Fills UniProtID_A/B of rows that have a gene name but no UniProt ID.
+
+    Every distinct (gene, taxid) pair without an ID is looked up once, however many rows it
+    appears in, so the number of queries depends on the number of distinct genes. The genes of
+    every organism are queried with one gene2uniprotid call (batched, duplicate-free); the calls
+    of all organisms run concurrently and share one rate limiter.
+
+    It is a coroutine applied to parsed output rather than a MITAB_parser option: parsing is
+    synchronous (and cached by MITABCache), while the lookups have to run in the caller's event loop.
+
+    Parameters
+    ----------
+    result : pd.DataFrame
+        MITAB_parser output with UniProtID_A/B and Gene_A/B (parsing_data 'protein_id'). If it
+        has taxid_A/B (parsing_data 'taxid'), genes are looked up in their own organism.
+    taxid : int or None
+        Organism of genes without a taxid (or of all genes if result has no taxid columns).
+        If None, such genes are not looked up. Default is 9606 (human).
+    lookup : coroutine function or None
+        Called as lookup(genes, taxid=taxid, limiter=limiter, **kwargs) and returning
+        ({gene: uniprot_id}, error_genes), like gene2uniprotid (the default) or
+        BioToolsClient.gene2uniprotid.
+    max_concurrent : int
+        Maximum number of concurrent requests of the shared limiter, if kwargs has no limiter.
+    **kwargs
+        Passed to lookup, e.g. cache=GeneCache(...) or batch_size. The default lookup gets
+        verbose=False unless given, so the calls of every organism do not print their counts.
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy of result with the resolved IDs filled in. Compact dtypes are kept.
+
+    Examples
+    --------
+    >>> interactors = MITAB_parser.from_file("intact.txt.gz", ['protein_id', 'taxid'])
+    >>> interactors = await resolve_missing_uniprot_ids(interactors, cache=GeneCache("genes.sqlite"))
+    """
+    if lookup is None:
+        lookup = gene2uniprotid
+        kwargs.setdefault('verbose', False)
+    kwargs.setdefault('limiter', RateLimiter(max_concurrent=max_concurrent))
+
+    result = result.copy()
+    missing = []  # (column, rows, genes, taxids) of every side
+    for side in ('A', 'B'):
+        genes = result[f'Gene_{side}'].to_numpy(dtype=object)
+        taxids = np.full(len(result), np.nan)
+        if f'taxid_{side}' in result:
+            taxids = pd.to_numeric(result[f'taxid_{side}'], errors='coerce').to_numpy(dtype=float, na_value=np.nan, copy=True)
+        if taxid is not None:
+            taxids[np.isnan(taxids)] = taxid
+        rows = np.flatnonzero(result[f'UniProtID_{side}'].isna().to_numpy() & pd.notna(genes) & ~np.isnan(taxids))
+        missing.append((f'UniProtID_{side}', rows, genes[rows], taxids[rows].astype(np.int64)))
+
+    queries = pd.DataFrame({'gene': np.concatenate([genes for _, _, genes, _ in missing]),
+                            'taxid': np.concatenate([taxids for _, _, _, taxids in missing])}).drop_duplicates()
+    by_taxid = [(int(organism), group['gene'].tolist()) for organism, group in queries.groupby('taxid', sort=True)]
+    answers = await asyncio.gather(*(lookup(genes, taxid=organism, **kwargs) for organism, genes in by_taxid))
+    found = pd.Series({(gene, organism): uniprot_id
+                       for (organism, _), (uniprot_ids, _) in zip(by_taxid, answers)
+                       for gene, uniprot_id in uniprot_ids.items()}, dtype=object)
+
+    compact = any(isinstance(result[column].dtype, pd.CategoricalDtype) for column, _, _, _ in missing)
+    for column, rows, genes, taxids in missing:
+        if not len(rows) or found.empty:
+            continue
+        values = result[column].to_numpy(dtype=object)
+        resolved = found.reindex(pd.MultiIndex.from_arrays([genes, taxids])).to_numpy()
+        values[rows] = np.where(pd.isna(resolved), values[rows], resolved)
+        result[column] = pd.Series(values, index=result.index, dtype=object if compact else result[column].dtype)
+    if compact:
+        result = _to_compact_dtypes(result, taxid_type=None)
+    return result
@@ -1,4 +1,14 @@
 from .gene2uniprot import gene2uniprotid
-from .protein_annotation import get_proteins_info, protein_results_to_dataframe
-from .MITAB_parser import Check_Value, MITAB_parser
+from .gene_cache import GeneCache
+from .gene_index import GeneIndex
+from .protein_annotation import get_proteins_info, iter_proteins_info, protein_results_to_dataframe
+from .protein_index import ProteinIndex
+from .protein_table import ProteinTable
+from .sifts_index import SiftsIndex
+from .MITAB_parser import Check_Value, MITAB_parser, MITABFilter, resolve_missing_uniprot_ids
+from .mitab_cache import MITABCache
+from .client import BioToolsClient
+from .interaction_dedup import canonical_pair_keys, deduplicate_interactions
+from .interaction_graph import InteractionGraph
+from .rate_limit import RateLimiter
 from .wrappers import savefig
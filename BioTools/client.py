@@ -0,0 +1,138 @@
+from typing import Optional
+
+import aiohttp
+
+from .gene2uniprot import MYGENE_API_URL, gene2uniprotid
+from .gene_cache import GeneCache
+from .protein_annotation import PDB_API_URL, UNIPROT_API_URL, get_proteins_info, iter_proteins_info
+from .rate_limit import RateLimiter
+
+
+class BioToolsClient:
+    """
+    Long-lived client that keeps HTTP sessions open between calls.
+
+    The client owns one session per API (mygene.info, EBI proteins, PDBe), each with its own
+    keep-alive connection pool and DNS cache, and one RateLimiter, so repeated calls reuse warm
+    connections and the adaptive concurrency learned by previous calls.
+
+    Parameters
+    ----------
+    max_concurrent : int
+        Connection pool size per API and default concurrency limit of the limiter. Default is 20.
+    request_timeout : float
+        Request timeout in seconds. Default is 20.0.
+    limiter : RateLimiter or None
+        Rate limiter shared by all calls. If None, RateLimiter(max_concurrent) is created.
+    cache : GeneCache or None
+        Default cache for gene2uniprotid.
+    dns_cache_ttl : int
+        Lifetime of cached DNS lookups in seconds. Default is 300.
+    keepalive_timeout : float
+        How long idle connections are kept open, in seconds. Default is 60.0.
+
+    Examples
+    --------
+    >>> async with BioToolsClient(max_concurrent=20) as client:
+    ...     uniprot_ids, error_genes = await client.gene2uniprotid(["TP53", "EGFR"])
+    ...     results, error_ids = await client.get_proteins_info(list(uniprot_ids.values()))
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 20,
+        request_timeout: float = 20.0,
+        limiter: Optional[RateLimiter] = None,
+        cache: Optional[GeneCache] = None,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 60.0,
+    ):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        if request_timeout <= 0:
+            raise ValueError("request_timeout must be > 0")
+
+        self.max_concurrent = max_concurrent
+        self.request_timeout = request_timeout
+        self.limiter = limiter if limiter is not None else RateLimiter(max_concurrent=max_concurrent)
+        self.cache = cache
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self._sessions = {}
+
+    def _open_session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrent,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+        )
+
+    async def __aenter__(self):
+        for url in (MYGENE_API_URL, UNIPROT_API_URL, PDB_API_URL):
+            self._sessions[RateLimiter.service_key(url)] = self._open_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            await session.close()
+
+    @staticmethod
+    def _check_kwargs(method, kwargs, fixed):
+        # options fixed by the client are rejected instead of being ignored or overridden
+        given = sorted(set(kwargs) & set(fixed))
+        if given:
+            raise TypeError(f"BioToolsClient.{method}() does not accept {', '.join(given)}; "
+                            "sessions and request_timeout are set when the client is created")
+
+    def _session(self, url):
+        try:
+            return self._sessions[RateLimiter.service_key(url)]
+        except KeyError:
+            raise RuntimeError("BioToolsClient is not open, use it as 'async with BioToolsClient() as client'")
+
+    async def gene2uniprotid(self, genenames, taxid=9606, **kwargs):
+        """
+        gene2uniprotid over the client's session, limiter and cache.
+
+        Accepts the keyword arguments of BioTools.gene2uniprotid, except session and request_timeout
+        (TypeError).
+        """
+        self._check_kwargs("gene2uniprotid", kwargs, ("session", "request_timeout"))
+        kwargs.setdefault("cache", self.cache)
+        kwargs.setdefault("limiter", self.limiter)
+        kwargs.setdefault("max_concurrent", self.max_concurrent)
+        return await gene2uniprotid(genenames, taxid=taxid, session=self._session(MYGENE_API_URL), **kwargs)
+
+    def _protein_kwargs(self, method, kwargs):
+        self._check_kwargs(method, kwargs, ("uniprot_session", "pdb_session", "request_timeout"))
+        kwargs.setdefault("limiter", self.limiter)
+        kwargs.setdefault("max_concurrent", self.max_concurrent)
+        kwargs["uniprot_session"] = self._session(UNIPROT_API_URL)
+        kwargs["pdb_session"] = self._session(PDB_API_URL)
+        return kwargs
+
+    async def get_proteins_info(self, uniprot_ids, **kwargs):
+        """
+        get_proteins_info over the client's sessions and limiter.
+
+        Accepts the keyword arguments of BioTools.get_proteins_info, except the sessions and request_timeout
+        (TypeError).
+        """
+        return await get_proteins_info(uniprot_ids, **self._protein_kwargs("get_proteins_info", kwargs))
+
+    def iter_proteins_info(self, uniprot_ids, **kwargs):
+        """
+        iter_proteins_info over the client's sessions and limiter.
+
+        Accepts the keyword arguments of BioTools.iter_proteins_info, except the sessions and request_timeout
+        (TypeError).
+        """
+        return iter_proteins_info(uniprot_ids, **self._protein_kwargs("iter_proteins_info", kwargs))
@@ -1,32 +1,89 @@
 import asyncio
+import heapq
+import itertools
+import os
+import warnings
+from collections import deque
+from typing import Optional
 
 import aiohttp
 
+from .gene_cache import GeneCache
+from .gene_index import GeneIndex
+from .rate_limit import RateLimiter, backoff_delay, fetch_json
+
 MYGENE_API_URL = "https://mygene.info/v3/query"
+MYGENE_MAX_BATCH_SIZE = 1000
 
 
-async def _async_query(genename, taxid, session, per_request_retries=2, per_request_retry_delay=0.5):
+async def _async_query(
+    genename, taxid, session, per_request_retries=2, per_request_retry_delay=0.5, limiter=None
+):
     url = f"{MYGENE_API_URL}?q={genename}&species_facet_filter={taxid}&fields=uniprot&species={taxid}"
 
-    for attempt in range(per_request_retries + 1):
-        try:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    if attempt < per_request_retries:
-                        await asyncio.sleep(per_request_retry_delay)
-                        continue
-                    return [genename, None]
+    status, json_res = await fetch_json(
+        session,
+        "GET",
+        url,
+        limiter=limiter,
+        retries=per_request_retries,
+        retry_delay=per_request_retry_delay,
+    )
+    if status is None:
+        return [genename, None, False]
+    return [genename, _find_UID(json_res), True]
+
+
+async def _async_query_batch(
+    genenames, taxid, session, per_request_retries=2, per_request_retry_delay=0.5, limiter=None
+):
+    data = {
+        "q": ",".join(genenames),
+        "scopes": "symbol",
+        "fields": "uniprot",
+        "species": str(taxid),
+    }
+
+    status, json_res = await fetch_json(
+        session,
+        "POST",
+        MYGENE_API_URL,
+        limiter=limiter,
+        retries=per_request_retries,
+        retry_delay=per_request_retry_delay,
+        data=data,
+    )
+    if status is None:
+        return [[genename, None, False] for genename in genenames]
+    return [
+        [genename, uniprot_id, True]
+        for genename, uniprot_id in _split_batch_hits(genenames, json_res)
+    ]
 
-                json_res = await response.json()
-                uniprot_id = _find_UID(json_res)
-                return [genename, uniprot_id]
-        except (aiohttp.ClientError, asyncio.TimeoutError):
-            if attempt < per_request_retries:
-                await asyncio.sleep(per_request_retry_delay)
-                continue
-            return [genename, None]
 
-    return [genename, None]
+def _split_batch_hits(genenames, json_res):
+    """
+    This function splits the result of a multi-term mygene.info/v3/query POST back into per-gene results.
+
+    Parameters
+    ----------
+    genenames : list
+        Gene names in the order they were sent.
+    json_res : list
+        The result of the POST query in json format: a flat list of hits, each carrying the "query" term it answers.
+
+    Returns
+    -------
+    list
+        A list of [genename, uniprot_id] pairs, in the order of genenames.
+    """
+    hits_by_query = {}
+    for hit in json_res if isinstance(json_res, list) else []:
+        if not isinstance(hit, dict) or hit.get("notfound"):
+            continue
+        hits_by_query.setdefault(hit.get("query"), []).append(hit)
+
+    return [[genename, _find_UID({"hits": hits_by_query.get(genename, [])})] for genename in genenames]
 
 
 def _find_UID(json_res):
@@ -54,24 +111,130 @@ def _find_UID(json_res):
     return uid
 
 
+async def _schedule_queries(
+    genenames,
+    taxid,
+    session,
+    batch_size,
+    max_attempts=5,
+    retry_delay=5.0,
+    max_retry_delay=60.0,
+    per_request_retries=2,
+    per_request_retry_delay=0.5,
+    limiter=None,
+):
+    """
+    Queries genes with a per-gene retry budget.
+
+    Ready genes are sent at once (in batches of batch_size, or one per request when batch_size is None).
+    Genes of a failed request go back into a delay queue with an exponential backoff of their own and
+    are sent again when it expires, grouped with other ready genes, while the rest keep flowing.
+    A gene whose query was answered by the service (with or without a UniProt ID) is never retried.
+
+    Returns
+    -------
+    list
+        [genename, uniprot_id, answered] for every gene, answered being False if all attempts failed.
+    """
+    loop = asyncio.get_running_loop()
+    ready = deque((gene, 0) for gene in genenames)
+    delayed = []
+    order = itertools.count()
+    in_flight = set()
+    results = {}
+
+    async def _send(batch):
+        genes = [gene for gene, _ in batch]
+        if batch_size is None:
+            answer = [await _async_query(
+                genes[0],
+                taxid,
+                session,
+                per_request_retries=per_request_retries,
+                per_request_retry_delay=per_request_retry_delay,
+                limiter=limiter,
+            )]
+        else:
+            answer = await _async_query_batch(
+                genes,
+                taxid,
+                session,
+                per_request_retries=per_request_retries,
+                per_request_retry_delay=per_request_retry_delay,
+                limiter=limiter,
+            )
+        return batch, answer
+
+    while ready or delayed or in_flight:
+        now = loop.time()
+        while delayed and delayed[0][0] <= now:
+            _, _, gene, attempts = heapq.heappop(delayed)
+            ready.append((gene, attempts))
+        while ready:
+            batch = [ready.popleft() for _ in range(min(batch_size or 1, len(ready)))]
+            in_flight.add(asyncio.ensure_future(_send(batch)))
+
+        wait_for = max(0.0, delayed[0][0] - loop.time()) if delayed else None
+        if not in_flight:
+            await asyncio.sleep(wait_for)
+            continue
+        done, _ = await asyncio.wait(in_flight, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+
+        for task in done:
+            in_flight.remove(task)
+            batch, answer = task.result()
+            attempts = dict(batch)
+            # a batch can mix genes of different retry rounds: each gene backs off by its own attempts,
+            # genes of the same round share one delay, so they are retried together
+            retry_at = {}
+            for gene, uniprot_id, answered in answer:
+                if answered or attempts[gene] + 1 >= max_attempts:
+                    results[gene] = [gene, uniprot_id, answered]
+                    continue
+                if attempts[gene] not in retry_at:
+                    retry_at[attempts[gene]] = loop.time() + backoff_delay(attempts[gene], retry_delay, max_retry_delay)
+                heapq.heappush(delayed, (retry_at[attempts[gene]], next(order), gene, attempts[gene] + 1))
+
+    return [results[gene] for gene in genenames]
+
+
 async def _async_request(
     genenames: list,
     taxid,
     max_concurrent: int = 20,
+    max_attempts: int = 5,
+    retry_delay: float = 5.0,
     request_timeout: float = 20.0,
     per_request_retries: int = 2,
     per_request_retry_delay: float = 0.5,
+    batch_size: Optional[int] = MYGENE_MAX_BATCH_SIZE,
+    cache: Optional[GeneCache] = None,
+    limiter: Optional[RateLimiter] = None,
+    session: Optional[aiohttp.ClientSession] = None,
 ):
     """
     Asynchronously retrieves UniProt IDs for a list of gene names.
 
-    This function queries the mygene.info API for each gene name provided, retrieves the corresponding UniProt ID,
+    This function queries the mygene.info API for the gene names provided, retrieves the corresponding UniProt ID,
     and returns a dictionary mapping each gene name to its UniProt ID, along with a list of gene names that encountered errors.
+    Duplicate gene names are queried only once.
 
     Parameters
     ----------
     genenames : list
         A list of gene names to query.
+    max_attempts : int
+        Maximum number of attempts per gene (including the first).
+    retry_delay : float
+        Base delay of the per-gene exponential backoff between attempts in seconds.
+    batch_size : int or None
+        Number of genes sent in one POST request. If None, one GET request is sent per gene.
+    cache : GeneCache or None
+        If given, genes found in the cache are not queried, and the answers of the API are stored in it.
+    limiter : RateLimiter or None
+        Rate and concurrency limiter of the requests. If None, a new one capped at max_concurrent is used.
+    session : aiohttp.ClientSession or None
+        Session to send the requests with. If None, a new session is opened and closed by this call.
 
     Returns
     -------
@@ -82,58 +245,103 @@ async def _async_request(
         - error_list: list
             A list of gene names for which the query did not successfully retrieve a UniProt ID.
     """
-    timeout = aiohttp.ClientTimeout(total=request_timeout)
-    connector = aiohttp.TCPConnector(limit=max_concurrent)
-    semaphore = asyncio.Semaphore(max_concurrent)
-
-    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+    unique_genes = list(dict.fromkeys(genenames))
+
+    cached = {}
+    query_genes = unique_genes
+    if cache is not None:
+        cached, query_genes = cache.get_many(unique_genes, taxid)
+    if not query_genes:
+        return _split_found(unique_genes, cached)
+
+    if limiter is None:
+        limiter = RateLimiter(max_concurrent=max_concurrent)
+
+    query_kwargs = dict(
+        batch_size=batch_size,
+        max_attempts=max_attempts,
+        retry_delay=retry_delay,
+        per_request_retries=per_request_retries,
+        per_request_retry_delay=per_request_retry_delay,
+        limiter=limiter,
+    )
+    if session is not None:
+        results = await _schedule_queries(query_genes, taxid, session, **query_kwargs)
+    else:
+        timeout = aiohttp.ClientTimeout(total=request_timeout)
+        connector = aiohttp.TCPConnector(limit=max_concurrent)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as own_session:
+            results = await _schedule_queries(query_genes, taxid, own_session, **query_kwargs)
 
-        async def _bounded_query(gene):
-            async with semaphore:
-                return await _async_query(
-                    gene,
-                    taxid,
-                    session,
-                    per_request_retries=per_request_retries,
-                    per_request_retry_delay=per_request_retry_delay,
-                )
+    if cache is not None:
+        # only answered queries are cached, transport failures must be retried
+        cache.set_many({res[0]: res[1] for res in results if res[2]}, taxid)
 
-        tasks = [_bounded_query(genename) for genename in genenames]
-        results = await asyncio.gather(*tasks)
+    cached.update({res[0]: res[1] for res in results})
+    return _split_found(unique_genes, cached)
 
-    uniprot_ids = {res[0]: res[1] for res in results if res[1] is not None}
-    error_list = [res[0] for res in results if res[1] is None]
 
+def _split_found(genenames, mapping):
+    uniprot_ids = {gene: mapping[gene] for gene in genenames if mapping.get(gene) is not None}
+    error_list = [gene for gene in genenames if mapping.get(gene) is None]
     return uniprot_ids, error_list
 
 
+def _local_request(genenames, taxid, gene_index):
+    if gene_index is None:
+        raise ValueError("backend='local' needs gene_index, a GeneIndex built from UniProt idmapping files")
+    unique_genes = list(dict.fromkeys(genenames))
+    if isinstance(gene_index, GeneIndex):
+        return _split_found(unique_genes, gene_index.lookup(unique_genes, taxid))
+    if not os.path.exists(gene_index):
+        raise FileNotFoundError(f"gene index {gene_index!r} does not exist, build it with GeneIndex.ingest")
+    with GeneIndex(gene_index) as index:
+        return _split_found(unique_genes, index.lookup(unique_genes, taxid))
+
+
 async def gene2uniprotid(
     genenames: list,
     taxid: int = 9606,
-    max_cycle: int = 50,
+    max_attempts: int = 5,
     retry_delay: float = 5.0,
     max_concurrent: int = 20,
     request_timeout: float = 20.0,
     per_request_retries: int = 2,
     per_request_retry_delay: float = 0.5,
+    batch_size: Optional[int] = MYGENE_MAX_BATCH_SIZE,
+    cache: Optional[GeneCache] = None,
+    limiter: Optional[RateLimiter] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    max_cycle: Optional[int] = None,
+    backend: str = "mygene",
+    gene_index=None,
+    verbose: bool = True,
 ):
     """
     Retrieves UniProt IDs for a list of gene names.
 
-    This function uses asynchronous requests to query the mygene.info API for each gene name provided,
+    This function uses asynchronous requests to query the mygene.info API for the gene names provided,
     retrieves the corresponding UniProt ID, and returns a dictionary mapping each gene name to its UniProt ID.
     It also returns a list of gene names for which the queries did not successfully retrieve a UniProt ID.
 
+    Failed requests are retried per gene: each gene of a failed request waits for its own exponential
+    backoff and is sent again with other ready genes, while the remaining genes keep being queried.
+    Genes the service answered without a UniProt ID are not retried.
+
     Parameters
     ----------
     genenames : list
         A list of gene names to query.
     taxid : int, optional
         Taxonomy ID (default 9606, human).
-    max_cycle : int, optional
-        Maximum number of cycles (including the first), default 50.
+    max_attempts : int, optional
+        Maximum number of attempts per gene (including the first), default 5. It replaces max_cycle
+        (default 50): cycles re-sent every unconverted gene, including those the service answered
+        without a UniProt ID, whereas attempts are only spent on failed requests and back off
+        exponentially, so 5 attempts wait up to 75 s per gene with the default retry_delay.
     retry_delay : float, optional
-        Pause between cycles in seconds, default 5.0.
+        Base delay of the per-gene exponential backoff between attempts in seconds, default 5.0.
+        The delay doubles with every failed attempt, up to 60 seconds.
     max_concurrent : int, optional
         Maximum number of parallel HTTP requests, default 20.
     request_timeout : float, optional
@@ -141,7 +349,29 @@ async def gene2uniprotid(
     per_request_retries : int, optional
         Retries for each gene request, default 2.
     per_request_retry_delay : float, optional
-        Delay between per-request retries in seconds, default 0.5.
+        Base delay of the exponential backoff between per-request retries in seconds, default 0.5.
+        Retry-After headers of 429/503 answers are honored.
+    batch_size : int or None, optional
+        Number of unique genes sent in one multi-term POST request (``scopes=symbol``),
+        default 1000, the mygene.info maximum. If None, one GET request is sent per gene.
+    cache : GeneCache or None, optional
+        Persistent cache of (gene, taxid) -> UniProt ID. Cached genes (including cached
+        "not found" answers) are not sent to the API; only misses are queried and then stored.
+    limiter : RateLimiter or None, optional
+        Shared rate limiter (token-bucket rate cap, adaptive concurrency). If None, a limiter
+        with max_concurrent concurrent requests is created for this call.
+    session : aiohttp.ClientSession or None, optional
+        Open session to reuse (see BioToolsClient). If None, a session is opened for this call.
+        request_timeout is ignored when a session is given: the timeout of the session applies.
+    max_cycle : int or None, optional
+        Deprecated alias of max_attempts.
+    backend : str, optional
+        "mygene" (default) queries mygene.info. "local" answers from gene_index without network
+        access; the request, retry, cache and limiter options are then ignored.
+    gene_index : GeneIndex or str or None, optional
+        Offline index (or the path of its SQLite file) used by backend="local", see GeneIndex.
+    verbose : bool, optional
+        Print the numbers of converted and unconverted genes, default True.
 
     Returns
     -------
@@ -149,53 +379,42 @@ async def gene2uniprotid(
         - UniProtId_dict: {gene: uniprot_id}
         - error_genes: list of genes for which ID was not found.
     """
-    if max_cycle < 1:
-        raise ValueError("max_cycle must be at least 1")
+    if max_cycle is not None:
+        warnings.warn("max_cycle is deprecated, use max_attempts", DeprecationWarning, stacklevel=2)
+        max_attempts = max_cycle
+    if max_attempts < 1:
+        raise ValueError("max_attempts must be at least 1")
     if max_concurrent < 1:
         raise ValueError("max_concurrent must be at least 1")
     if request_timeout <= 0:
         raise ValueError("request_timeout must be > 0")
     if per_request_retries < 0:
         raise ValueError("per_request_retries must be >= 0")
-
-    cycle = 1
-    uniprot_id_dict, error_genes = await _async_request(
-        genenames,
-        taxid=taxid,
-        max_concurrent=max_concurrent,
-        request_timeout=request_timeout,
-        per_request_retries=per_request_retries,
-        per_request_retry_delay=per_request_retry_delay,
-    )
-
-    found_previous_cycle = 0
-    found_current_cycle = len(uniprot_id_dict)
-
-    while cycle < max_cycle and error_genes:
-        if found_previous_cycle == 0:
-            ratio = float("inf") if found_current_cycle > 0 else 1.0
-        else:
-            ratio = found_current_cycle / found_previous_cycle
-
-        if ratio == 1.0:
-            break
-
-        await asyncio.sleep(retry_delay)
-        cycle += 1
-
-        found_previous_cycle = found_current_cycle
-        new_dict, error_genes = await _async_request(
-            error_genes,
+    if batch_size is not None and not 1 <= batch_size <= MYGENE_MAX_BATCH_SIZE:
+        raise ValueError(f"batch_size must be between 1 and {MYGENE_MAX_BATCH_SIZE}, or None")
+    if backend not in ("mygene", "local"):
+        raise ValueError("backend must be 'mygene' or 'local'")
+
+    if backend == "local":
+        uniprot_id_dict, error_genes = _local_request(genenames, taxid, gene_index)
+    else:
+        uniprot_id_dict, error_genes = await _async_request(
+            genenames,
             taxid=taxid,
             max_concurrent=max_concurrent,
+            max_attempts=max_attempts,
+            retry_delay=retry_delay,
             request_timeout=request_timeout,
             per_request_retries=per_request_retries,
             per_request_retry_delay=per_request_retry_delay,
+            batch_size=batch_size,
+            cache=cache,
+            limiter=limiter,
+            session=session,
         )
-        uniprot_id_dict.update(new_dict)
-        found_current_cycle = len(uniprot_id_dict)
 
-    print(f"{len(uniprot_id_dict)} genes successfully converted to UniProtIDs")
-    print(f"{len(error_genes)} genes not converted")
+    if verbose:
+        print(f"{len(uniprot_id_dict)} genes successfully converted to UniProtIDs")
+        print(f"{len(error_genes)} genes not converted")
 
     return uniprot_id_dict, error_genes
@@ -0,0 +1,178 @@
+import sqlite3
+import time
+from typing import Optional
+
+DEFAULT_CACHE_TTL = 30 * 24 * 3600.0
+_SQLITE_CHUNK = 500
+
+
+class GeneCache:
+    """
+    Persistent SQLite cache of gene -> UniProt ID mappings keyed by (gene, taxid).
+
+    Both positive results (a UniProt ID was found) and negative results (mygene.info answered,
+    but had no UniProt ID for the gene) are stored. Entries older than their TTL are treated as misses.
+
+    Parameters
+    ----------
+    path : str
+        Path to the SQLite database file. It is created if it does not exist.
+        Use ":memory:" for a cache that lives only as long as the object.
+    ttl : float or None
+        Lifetime of positive results in seconds, default 30 days. None means entries never expire.
+    negative_ttl : float or None
+        Lifetime of negative results in seconds. Defaults to ttl.
+
+    Examples
+    --------
+    >>> cache = GeneCache("gene2uniprot.sqlite", ttl=7 * 24 * 3600)
+    >>> uniprot_ids, error_genes = await gene2uniprotid(genes, cache=cache)
+    >>> cache.stats()
+    """
+
+    def __init__(self, path="gene2uniprot_cache.sqlite", ttl: Optional[float] = DEFAULT_CACHE_TTL,
+                 negative_ttl: Optional[float] = None):
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be > 0 or None")
+        if negative_ttl is not None and negative_ttl <= 0:
+            raise ValueError("negative_ttl must be > 0 or None")
+
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.writes = 0
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS gene2uniprot ("
+            "gene TEXT NOT NULL, taxid TEXT NOT NULL, uniprot_id TEXT, updated REAL NOT NULL, "
+            "PRIMARY KEY (gene, taxid))"
+        )
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def _is_fresh(self, uniprot_id, updated, now):
+        ttl = self.ttl if uniprot_id is not None else self.negative_ttl
+        return ttl is None or now - updated <= ttl
+
+    def get_many(self, genenames, taxid):
+        """
+        Looks up genes in the cache.
+
+        Parameters
+        ----------
+        genenames : list
+            Gene names to look up.
+        taxid : int or str
+            Taxonomy ID.
+
+        Returns
+        -------
+        tuple[dict, list]
+            - cached: {gene: uniprot_id or None} for fresh entries (None is a cached negative result)
+            - misses: genes that are absent or expired, in input order
+        """
+        genenames = list(dict.fromkeys(genenames))
+        now = time.time()
+        rows = {}
+        for i in range(0, len(genenames), _SQLITE_CHUNK):
+            chunk = genenames[i:i + _SQLITE_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            query = (
+                "SELECT gene, uniprot_id, updated FROM gene2uniprot "
+                f"WHERE taxid = ? AND gene IN ({placeholders})"
+            )
+            for gene, uniprot_id, updated in self._conn.execute(query, [str(taxid), *chunk]):
+                rows[gene] = (uniprot_id, updated)
+
+        cached = {}
+        misses = []
+        for gene in genenames:
+            if gene in rows and self._is_fresh(*rows[gene], now):
+                uniprot_id = rows[gene][0]
+                cached[gene] = uniprot_id
+                self.hits += 1
+                if uniprot_id is None:
+                    self.negative_hits += 1
+            else:
+                if gene in rows:
+                    self.expired += 1
+                misses.append(gene)
+                self.misses += 1
+        return cached, misses
+
+    def set_many(self, mapping, taxid):
+        """
+        Stores results in the cache.
+
+        Parameters
+        ----------
+        mapping : dict
+            {gene: uniprot_id or None}. None stores a negative result.
+        taxid : int or str
+            Taxonomy ID.
+        """
+        now = time.time()
+        rows = [(gene, str(taxid), uniprot_id, now) for gene, uniprot_id in mapping.items()]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO gene2uniprot (gene, taxid, uniprot_id, updated) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        self.writes += len(rows)
+
+    def invalidate(self, taxid=None):
+        """
+        Removes cached entries.
+
+        Parameters
+        ----------
+        taxid : int or str or None
+            Taxonomy ID whose entries are removed. If None, the whole cache is cleared.
+
+        Returns
+        -------
+        int
+            Number of removed entries.
+        """
+        with self._conn:
+            if taxid is None:
+                cursor = self._conn.execute("DELETE FROM gene2uniprot")
+            else:
+                cursor = self._conn.execute("DELETE FROM gene2uniprot WHERE taxid = ?", (str(taxid),))
+        return cursor.rowcount
+
+    def stats(self):
+        """
+        Returns cache statistics.
+
+        Returns
+        -------
+        dict
+            Lookup counters of this object (hits, negative_hits, misses, expired, writes)
+            and the number of stored entries per taxid.
+        """
+        entries = dict(
+            self._conn.execute("SELECT taxid, COUNT(*) FROM gene2uniprot GROUP BY taxid").fetchall()
+        )
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "writes": self.writes,
+            "entries": sum(entries.values()),
+            "entries_by_taxid": entries,
+        }
@@ -0,0 +1,171 @@
+import csv
+import sqlite3
+from typing import Optional
+
+import pandas as pd
+
+_SQLITE_CHUNK = 500
+_INGEST_CHUNKSIZE = 1000000
+# idmapping.dat ID types read by GeneIndex.ingest
+_ID_TYPES = ["Gene_Name", "UniProtKB-ID", "NCBI_TaxID"]
+
+
+class GeneIndex:
+    """
+    Offline SQLite index of gene symbol -> UniProt ID keyed by (gene, taxid), built from UniProt idmapping files.
+
+    It answers gene2uniprotid(..., backend="local") without network access. Like the mygene.info
+    backend, a Swiss-Prot (reviewed) entry is preferred over TrEMBL; among entries of the same
+    status the first one in the file wins. Gene symbols are matched case-insensitively.
+
+    Parameters
+    ----------
+    path : str
+        Path to the SQLite database file. It is created if it does not exist.
+
+    Examples
+    --------
+    >>> index = GeneIndex("gene_index.sqlite")
+    >>> index.ingest("HUMAN_9606_idmapping.dat.gz")  # once
+    >>> uniprot_ids, error_genes = await gene2uniprotid(genes, backend="local", gene_index=index)
+    """
+
+    def __init__(self, path="gene_index.sqlite"):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS gene_index ("
+            "gene TEXT NOT NULL COLLATE NOCASE, taxid INTEGER NOT NULL, uniprot_id TEXT NOT NULL, "
+            "reviewed INTEGER NOT NULL, PRIMARY KEY (gene, taxid))"
+        )
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM gene_index").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def ingest(self, path, taxids=None, chunksize=_INGEST_CHUNKSIZE):
+        """
+        Adds the gene names of a UniProt idmapping file to the index.
+
+        Parameters
+        ----------
+        path : str
+            Plain or compressed idmapping.dat file (e.g. idmapping.dat.gz or HUMAN_9606_idmapping.dat.gz):
+            tab-separated accession, ID type and ID lines, grouped by accession. Gene names come from
+            'Gene_Name' lines, organisms from 'NCBI_TaxID' and the review status from 'UniProtKB-ID':
+            TrEMBL entry names are the accession followed by the species, Swiss-Prot ones are not.
+            idmapping_selected.tab has no gene names and can not be used.
+        taxids : iterable of int or None
+            Only index these organisms. None indexes all of them.
+        chunksize : int
+            Number of lines read at once.
+
+        Returns
+        -------
+        int
+            Number of (gene, taxid) entries in the index afterwards.
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        taxids = None if taxids is None else {int(taxid) for taxid in taxids}
+
+        carry = None
+        with pd.read_csv(path, sep="\t", header=None, names=["accession", "type", "value"], dtype=str,
+                         quoting=csv.QUOTE_NONE, na_filter=False, compression="infer", chunksize=chunksize) as reader:
+            for chunk in reader:
+                chunk = chunk[chunk["type"].isin(_ID_TYPES)]
+                if carry is not None:
+                    chunk = pd.concat([carry, chunk])
+                if chunk.empty:
+                    continue
+                # the last accession may continue in the next chunk
+                tail = (chunk["accession"] == chunk["accession"].iat[-1]).to_numpy()
+                carry = chunk[tail]
+                self._insert(_gene_entries(chunk[~tail], taxids))
+        if carry is not None:
+            self._insert(_gene_entries(carry, taxids))
+        return len(self)
+
+    def _insert(self, entries):
+        with self._conn:
+            # a reviewed entry replaces an unreviewed one, otherwise the first entry stays
+            self._conn.executemany(
+                "INSERT INTO gene_index (gene, taxid, uniprot_id, reviewed) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (gene, taxid) DO UPDATE SET uniprot_id = excluded.uniprot_id, reviewed = excluded.reviewed "
+                "WHERE excluded.reviewed > gene_index.reviewed",
+                entries.itertuples(index=False, name=None),
+            )
+
+    def lookup(self, genenames, taxid):
+        """
+        Looks up genes in the index.
+
+        Parameters
+        ----------
+        genenames : list
+            Gene names to look up.
+        taxid : int or str
+            Taxonomy ID.
+
+        Returns
+        -------
+        dict
+            {gene: uniprot_id} for the genes found, keyed by the given spelling.
+        """
+        genenames = list(dict.fromkeys(genenames))
+        found = {}
+        for i in range(0, len(genenames), _SQLITE_CHUNK):
+            chunk = genenames[i:i + _SQLITE_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            query = f"SELECT gene, uniprot_id FROM gene_index WHERE taxid = ? AND gene IN ({placeholders})"
+            for gene, uniprot_id in self._conn.execute(query, [int(taxid), *chunk]):
+                found[gene.lower()] = uniprot_id
+        return {gene: found[gene.lower()] for gene in genenames if gene.lower() in found}
+
+    def stats(self):
+        """
+        Returns
+        -------
+        dict
+            Number of entries, of reviewed (Swiss-Prot) entries and of entries per taxid.
+        """
+        entries = dict(self._conn.execute("SELECT taxid, COUNT(*) FROM gene_index GROUP BY taxid").fetchall())
+        reviewed = self._conn.execute("SELECT COUNT(*) FROM gene_index WHERE reviewed = 1").fetchone()[0]
+        return {"entries": sum(entries.values()), "reviewed": reviewed, "entries_by_taxid": entries}
+
+
+def _gene_entries(lines, taxids: Optional[set] = None):
+    # (gene, taxid, uniprot_id, reviewed) rows of idmapping lines of whole accessions, Swiss-Prot first
+    by_type = {
+        id_type: lines.loc[lines["type"] == id_type].drop_duplicates("accession").set_index("accession")["value"]
+        for id_type in ("UniProtKB-ID", "NCBI_TaxID")
+    }
+    genes = lines.loc[lines["type"] == "Gene_Name", ["accession", "value"]]
+    entries = pd.DataFrame({
+        "gene": genes["value"].str.strip(),
+        "taxid": pd.to_numeric(genes["accession"].map(by_type["NCBI_TaxID"]), errors="coerce"),
+        "uniprot_id": genes["accession"],
+        "entry_name": genes["accession"].map(by_type["UniProtKB-ID"]).fillna(""),
+    })
+    entries = entries[(entries["gene"] != "") & entries["taxid"].notna()]
+    if taxids is not None:
+        entries = entries[entries["taxid"].isin(taxids)]
+    if entries.empty:
+        return pd.DataFrame(columns=["gene", "taxid", "uniprot_id", "reviewed"])
+
+    entries = entries.assign(
+        taxid=entries["taxid"].astype("int64"),
+        reviewed=(entries["entry_name"] != "") & (entries["entry_name"].str.split("_").str[0] != entries["uniprot_id"]),
+        key=entries["gene"].str.lower(),
+    )
+    entries = entries.sort_values("reviewed", ascending=False, kind="stable").drop_duplicates(["key", "taxid"])
+    return entries.assign(reviewed=entries["reviewed"].astype(int))[["gene", "taxid", "uniprot_id", "reviewed"]]
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+
+def canonical_pair_keys(ids_a, ids_b):
+    """
+    64-bit keys of unordered pairs, equal for (a, b) and (b, a).
+
+    IDs are mapped to dense integer codes in sorted order and every pair is packed as
+    min(code) * n_ids + max(code) into an int64, which is exact for up to 3e9 distinct IDs.
+
+    Parameters
+    ----------
+    ids_a, ids_b : array-like
+        IDs of the interactors, one pair per position.
+
+    Returns
+    -------
+    keys : np.ndarray
+        int64 key of every pair, -1 where an ID is missing.
+    swapped : np.ndarray
+        True where ids_b sorts before ids_a, i.e. the canonical pair is (b, a).
+    """
+    ids_a = np.asarray(ids_a, dtype=object)
+    ids_b = np.asarray(ids_b, dtype=object)
+    if len(ids_a) != len(ids_b):
+        raise ValueError("ids_a and ids_b must have the same length")
+
+    # missing IDs get code -1
+    codes, ids = pd.factorize(np.concatenate([ids_a, ids_b]), sort=True)
+    a, b = codes[:len(ids_a)].astype(np.int64), codes[len(ids_a):].astype(np.int64)
+    keys = np.minimum(a, b) * len(ids) + np.maximum(a, b)
+    keys[(a < 0) | (b < 0)] = -1
+    return keys, a > b
+
+
+def _first_occurrences(codes):
+    # codes of pd.factorize are in order of first appearance: a code is new where it exceeds every earlier code
+    is_first = np.ones(len(codes), dtype=bool)
+    is_first[1:] = codes[1:] > np.maximum.accumulate(codes)[:-1]
+    return is_first
+
+
+def _source_labels(pair_codes, n_pairs, sources):
+    # '|'-joined sorted names of the sources of every pair, and their number
+    source_codes, names = pd.factorize(np.asarray(sources, dtype=object), sort=True)
+    known = source_codes >= 0
+    present = np.zeros((n_pairs, len(names)), dtype=bool)
+    present[pair_codes[known], source_codes[known]] = True
+
+    # pairs share few distinct source sets, so label each set once
+    packed = np.packbits(present, axis=1)
+    width = packed.shape[1]
+    if width == 0:
+        return np.full(n_pairs, None, dtype=object), np.zeros(n_pairs, dtype=np.int64)
+    set_codes, sets = pd.factorize(np.ascontiguousarray(packed).view(f'S{width}').ravel().astype(object))
+    labels = np.array(['|'.join(names[row]) or None for row in present[_first_occurrences(set_codes)]], dtype=object)
+    return labels[set_codes], present.sum(axis=1)
+
+
+def deduplicate_interactions(result, source_column='Source_database', id_columns=('UniProtID_A', 'UniProtID_B')):
+    """
+    Collapses repeated interactions into one row per unordered protein pair.
+
+    Rows of (P1, P2) and (P2, P1) are the same interaction. Every pair keeps its first row, with
+    the A and B columns (UniProtID, Gene, taxid, ...) swapped where needed so that A <= B, and
+    gets the number of rows reporting it and the databases they come from. Pairs are grouped by
+    hashing their canonical 64-bit keys, so the runtime is linear in the number of rows.
+
+    Parameters
+    ----------
+    result : pd.DataFrame
+        MITAB_parser output, e.g. of MITAB_parser.from_file(path, ['protein_id', 'source']).
+    source_column : str or None
+        Column with the source database of every row. Ignored if result has no such column.
+    id_columns : tuple
+        Columns with the interactor IDs. Rows missing either ID are dropped.
+
+    Returns
+    -------
+    pd.DataFrame
+        First row of every pair, in order of first appearance and with its index label, plus
+        'n_evidence' (number of rows) and, if source_column is present, 'sources' (sorted,
+        '|'-separated) and 'n_sources' instead of source_column.
+
+    Examples
+    --------
+    >>> interactions = MITAB_parser.from_file("merged.txt.gz", ['protein_id', 'taxid', 'source'])
+    >>> unique = deduplicate_interactions(interactions)
+    >>> unique[unique['n_sources'] > 1]
+    """
+    id_a, id_b = id_columns
+    keys, swapped = canonical_pair_keys(result[id_a].to_numpy(dtype=object), result[id_b].to_numpy(dtype=object))
+    rows = np.flatnonzero(keys >= 0)
+    pair_codes, unique_keys = pd.factorize(keys[rows])  # codes in order of first appearance
+    n_pairs = len(unique_keys)
+    first_rows = rows[_first_occurrences(pair_codes)]
+
+    unique = result.iloc[first_rows].copy()
+    swap = swapped[first_rows]
+    for column_a in list(unique.columns):
+        column_b = column_a[:-2] + '_B'
+        if column_a.endswith('_A') and column_b in unique and swap.any():
+            values_a, values_b = unique[column_a].copy(), unique[column_b].copy()
+            unique[column_a] = values_a.where(~swap, values_b)
+            unique[column_b] = values_b.where(~swap, values_a)
+
+    unique['n_evidence'] = np.bincount(pair_codes, minlength=n_pairs)
+    if source_column is not None and source_column in result:
+        sources, n_sources = _source_labels(pair_codes, n_pairs, result[source_column].to_numpy(dtype=object)[rows])
+        unique = unique.drop(columns=source_column)
+        unique['sources'] = sources
+        unique['n_sources'] = n_sources
+    return unique
@@ -0,0 +1,239 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .interaction_dedup import canonical_pair_keys
+
+_ARRAYS = ('nodes', 'indptr', 'indices', 'edge_rows')
+
+
+class InteractionGraph:
+    """
+    Protein interaction graph stored as a CSR (compressed sparse row) adjacency index.
+
+    Nodes are UniProt IDs mapped to dense integer IDs (their position in the sorted `nodes` array).
+    The neighbors of node i are indices[indptr[i]:indptr[i + 1]], sorted, and edge_rows holds, for
+    every stored edge, the row of the source table it comes from. An undirected graph stores every
+    edge in both directions (a self-loop once).
+
+    Parameters
+    ----------
+    nodes : np.ndarray
+        Sorted node names.
+    indptr : np.ndarray
+        Offsets of the adjacency lists, len(nodes) + 1 values.
+    indices : np.ndarray
+        Integer IDs of neighbors.
+    edge_rows : np.ndarray
+        Source-table row of every stored edge.
+    directed : bool
+        Whether edges have a direction.
+    n_edges : int
+        Number of edges (an undirected edge counts once).
+
+    Examples
+    --------
+    >>> interactors = MITAB_parser.from_file("intact.txt.gz", ["protein_id"])
+    >>> graph = InteractionGraph.from_mitab(interactors, deduplicate=True)
+    >>> graph.neighbors("P04637")
+    >>> graph.save("intact_graph")
+    >>> graph = InteractionGraph.load("intact_graph")
+    """
+
+    def __init__(self, nodes, indptr, indices, edge_rows, directed=False, n_edges=None):
+        self.nodes = nodes
+        self.indptr = indptr
+        self.indices = indices
+        self.edge_rows = edge_rows
+        self.directed = directed
+        self.n_edges = int(n_edges if n_edges is not None else len(indices))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __repr__(self):
+        kind = "directed" if self.directed else "undirected"
+        return f"InteractionGraph({kind}, {len(self)} nodes, {self.n_edges} edges)"
+
+    @classmethod
+    def from_pairs(cls, ids_a, ids_b, rows=None, directed=False, deduplicate=False):
+        """
+        Builds the graph from interacting pairs.
+
+        Parameters
+        ----------
+        ids_a, ids_b : array-like
+            IDs of the interactors, one pair per position. Pairs with a missing ID are skipped.
+        rows : array-like or None
+            Source row of every pair. Defaults to the pair positions.
+        directed : bool
+            If False (default), (a, b) and (b, a) are the same edge.
+        deduplicate : bool
+            Keep one edge per pair of nodes, the one from the first source row.
+
+        Returns
+        -------
+        InteractionGraph
+        """
+        ids_a = np.asarray(ids_a, dtype=object)
+        ids_b = np.asarray(ids_b, dtype=object)
+        if len(ids_a) != len(ids_b):
+            raise ValueError("ids_a and ids_b must have the same length")
+        rows = np.arange(len(ids_a)) if rows is None else np.asarray(rows)
+        if len(rows) != len(ids_a):
+            raise ValueError("rows must have one value per pair")
+        if deduplicate and not directed:
+            # one edge per unordered pair, the one of its first row
+            keys, _ = canonical_pair_keys(ids_a, ids_b)
+            first = ~pd.Series(keys).duplicated().to_numpy()
+            ids_a, ids_b, rows = ids_a[first], ids_b[first], rows[first]
+
+        # missing IDs get code -1
+        codes, nodes = pd.factorize(np.concatenate([ids_a, ids_b]), sort=True)
+        n = len(nodes)
+        src, dst = codes[:len(ids_a)].astype(np.int64), codes[len(ids_a):].astype(np.int64)
+        known = (src >= 0) & (dst >= 0)
+        src, dst, rows = src[known], dst[known], rows[known]
+
+        if not directed:
+            # store (min, max) and its mirror; the copies of one edge keep the order of their rows
+            src, dst = np.minimum(src, dst), np.maximum(src, dst)
+            mirrored = src != dst
+            src, dst = np.concatenate([src, dst[mirrored]]), np.concatenate([dst, src[mirrored]])
+            rows = np.concatenate([rows, rows[mirrored]])
+
+        keys = src * n + dst
+        order = np.argsort(keys, kind='stable')
+        src, dst, rows, keys = src[order], dst[order], rows[order], keys[order]
+        if deduplicate and directed:
+            first = np.ones(len(keys), dtype=bool)
+            first[1:] = keys[1:] != keys[:-1]
+            src, dst, rows = src[first], dst[first], rows[first]
+        n_edges = len(src) if directed else int((src <= dst).sum())
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        index_dtype = np.int32 if n < np.iinfo(np.int32).max else np.int64
+        return cls(np.asarray(nodes, dtype=str), indptr, dst.astype(index_dtype), rows,
+                   directed=directed, n_edges=n_edges)
+
+    @classmethod
+    def from_mitab(cls, result, directed=False, deduplicate=False):
+        """
+        Builds the graph from the UniProtID_A/UniProtID_B columns of MITAB_parser output.
+
+        Edge rows are index labels of result, i.e. row numbers in the file for MITAB_parser.from_file.
+        """
+        return cls.from_pairs(result['UniProtID_A'].to_numpy(dtype=object), result['UniProtID_B'].to_numpy(dtype=object),
+                              rows=result.index.to_numpy(), directed=directed, deduplicate=deduplicate)
+
+    def _lookup(self, uids):
+        # binary search in the sorted nodes, -1 for unknown IDs
+        queries = np.asarray(uids, dtype=str)
+        if not len(self.nodes) or not len(queries):
+            return np.full(len(queries), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.nodes, queries), len(self.nodes) - 1)
+        return np.where(self.nodes[positions] == queries, positions, -1).astype(np.int64)
+
+    def node_id(self, uid):
+        """Integer ID of a node, or -1 if uid is not in the graph."""
+        return int(self._lookup([uid])[0])
+
+    def _node_ids_of(self, uids):
+        ids = self._lookup(list(uids))
+        return np.unique(ids[ids >= 0])
+
+    def _require(self, uid):
+        i = self.node_id(uid)
+        if i < 0:
+            raise KeyError(uid)
+        return i
+
+    def neighbors(self, uid):
+        """
+        Returns
+        -------
+        np.ndarray
+            Sorted names of the neighbors of uid (successors in a directed graph).
+        """
+        i = self._require(uid)
+        return self.nodes[self.indices[self.indptr[i]:self.indptr[i + 1]]]
+
+    def degree(self, uid=None):
+        """
+        Number of stored edges of uid (out-degree in a directed graph; a self-loop counts once),
+        or an array with the degree of every node if uid is None.
+        """
+        if uid is None:
+            return np.diff(self.indptr)
+        i = self._require(uid)
+        return int(self.indptr[i + 1] - self.indptr[i])
+
+    def edge_rows_of(self, uid):
+        """Source-table rows of the edges of uid, aligned with neighbors(uid)."""
+        i = self._require(uid)
+        return self.edge_rows[self.indptr[i]:self.indptr[i + 1]]
+
+    def _edge_positions(self, ids):
+        # positions of the adjacency entries of the sorted node ids, in CSR order
+        starts = self.indptr[ids]
+        counts = self.indptr[ids + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return np.repeat(ids, counts), offsets + np.arange(counts.sum())
+
+    def subgraph(self, uids):
+        """
+        Induced subgraph: the given proteins (unknown IDs are ignored) and the edges between them.
+
+        Returns
+        -------
+        InteractionGraph
+        """
+        ids = self._node_ids_of(uids)
+        src, positions = self._edge_positions(ids)
+        dst = self.indices[positions]
+        inside = np.zeros(len(self.nodes), dtype=bool)
+        inside[ids] = True
+        keep = inside[dst]
+        src, dst, rows = src[keep], dst[keep], self.edge_rows[positions][keep]
+
+        new_ids = np.cumsum(inside) - 1
+        src, dst = new_ids[src], new_ids[dst].astype(self.indices.dtype)
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(ids)), out=indptr[1:])
+        n_edges = len(src) if self.directed else int(((src != dst).sum() // 2) + (src == dst).sum())
+        return type(self)(self.nodes[ids], indptr, dst, rows, directed=self.directed, n_edges=n_edges)
+
+    def save(self, path):
+        """
+        Saves the index into directory path as .npy files, see InteractionGraph.load.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), np.asarray(getattr(self, name)))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"directed": self.directed, "n_edges": self.n_edges}, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """
+        Opens an index saved with InteractionGraph.save.
+
+        Parameters
+        ----------
+        path : str
+            Directory of the index.
+        mmap_mode : str or None
+            Passed to np.load. With the default 'r' the arrays are memory-mapped read-only, so
+            opening is instant and pages are read on demand. None loads them into memory.
+
+        Returns
+        -------
+        InteractionGraph
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in _ARRAYS}
+        return cls(**arrays, directed=meta["directed"], n_edges=meta["n_edges"])
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import pandas as pd
+
+# bump when the parsed output changes, so that old cache entries are not reused
+CACHE_FORMAT_VERSION = 1
+_COMPLETE_MARKER = "_COMPLETE"
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+class MITABCache:
+    """
+    Cache of parsed MITAB results stored as Parquet files.
+
+    An entry is keyed by a fingerprint of the source file (absolute path, size and modification time,
+    or a SHA-256 of its content) and of the parsing options, so a changed file or different options
+    never reuse old results. Every parsed chunk is stored as one Parquet part; an entry becomes
+    visible only after all of its parts are written.
+
+    Parameters
+    ----------
+    directory : str
+        Directory holding the cache entries. It is created if it does not exist.
+    hash_content : bool
+        Fingerprint files by content instead of path and modification time. Survives copying and
+        touching the file, but reads it whole once per parse.
+
+    Examples
+    --------
+    >>> cache = MITABCache("mitab_cache")
+    >>> interactors = MITAB_parser.from_file("intact.txt.gz", ["protein_id", "taxid"], cache=cache)
+    >>> cache.stats()
+    """
+
+    def __init__(self, directory="mitab_cache", hash_content=False):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("MITABCache stores Parquet files and requires pyarrow, install it with 'pip install pyarrow'")
+
+        self.directory = directory
+        self.hash_content = hash_content
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _file_fingerprint(self, path):
+        stat = os.stat(path)
+        if not self.hash_content:
+            return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        return {"size": stat.st_size, "sha256": digest.hexdigest()}
+
+    def key(self, path, **options):
+        """
+        Cache key of a file parsed with the given options.
+
+        Parameters
+        ----------
+        path : str
+            Source file.
+        **options
+            JSON-serializable parsing options (parsing_data, compact, ...).
+
+        Returns
+        -------
+        str
+        """
+        fingerprint = {"version": CACHE_FORMAT_VERSION, "file": self._file_fingerprint(path), "options": options}
+        return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def __contains__(self, key):
+        return os.path.exists(os.path.join(self._entry(key), _COMPLETE_MARKER))
+
+    def read(self, key):
+        """
+        Returns
+        -------
+        Iterator[pd.DataFrame]
+            Stored chunks in their original order, read with memory-mapped IO.
+        """
+        entry = self._entry(key)
+        parts = sorted(name for name in os.listdir(entry) if name.endswith(".parquet"))
+        for name in parts:
+            yield pd.read_parquet(os.path.join(entry, name), memory_map=True)
+
+    def write(self, key, chunks):
+        """
+        Stores chunks while passing them through.
+
+        Parameters
+        ----------
+        key : str
+            Cache key, see MITABCache.key.
+        chunks : Iterable[pd.DataFrame]
+            Parsed chunks.
+
+        Returns
+        -------
+        Iterator[pd.DataFrame]
+            The same chunks. The entry is saved when the iterator is exhausted; if it is
+            abandoned earlier, nothing is stored.
+        """
+        tmp_entry = os.path.join(self.directory, f".tmp-{key}-{uuid.uuid4().hex}")
+        os.makedirs(tmp_entry)
+        try:
+            for i, chunk in enumerate(chunks):
+                chunk.to_parquet(os.path.join(tmp_entry, f"part-{i:06d}.parquet"))
+                yield chunk
+            open(os.path.join(tmp_entry, _COMPLETE_MARKER), "w").close()
+            try:
+                os.replace(tmp_entry, self._entry(key))
+            except OSError:
+                pass  # stored concurrently by another process
+        finally:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+
+    def get_or_parse(self, key, parse):
+        """
+        Chunks of a cached entry, or parse() results that are stored as they are produced.
+        """
+        if key in self:
+            self.hits += 1
+            return self.read(key)
+        self.misses += 1
+        return self.write(key, parse())
+
+    def get_or_compute(self, key, compute):
+        """
+        JSON-serializable value stored under key, or compute() stored under it, e.g. the
+        scoring methods found in a file. Not counted in the hits and misses of stats.
+        """
+        path = os.path.join(self.directory, f"{key}.json")
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        value = compute()
+        tmp_path = os.path.join(self.directory, f".tmp-{key}-{uuid.uuid4().hex}.json")
+        with open(tmp_path, "w") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+        return value
+
+    def clear(self):
+        """Removes every cache entry."""
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+
+    def stats(self):
+        """
+        Returns
+        -------
+        dict
+            Lookup counters of this object (hits, misses) and the number of stored entries.
+        """
+        entries = sum(1 for name in os.listdir(self.directory) if name in self)
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
@@ -1,11 +1,20 @@
 import asyncio
+import os
+from contextlib import AsyncExitStack
 
 import aiohttp
 import pandas as pd
 from tqdm.asyncio import tqdm
 
+from .protein_index import ProteinIndex
+from .protein_table import ProteinTable
+from .rate_limit import RateLimiter, fetch_json
+from .sifts_index import SiftsIndex
+
 UNIPROT_API_URL = "https://www.ebi.ac.uk/proteins/api/proteins/"
 PDB_API_URL = "https://www.ebi.ac.uk/pdbe/api/mappings/best_structures/"
+UNIPROT_MAX_BATCH_SIZE = 100
+LOCAL_CHUNK_SIZE = 500
 
 
 def _init_error_ids():
@@ -22,23 +31,73 @@ def _init_error_ids():
     }
 
 
-async def _get_uniprot_data(uniprot_id, session, per_request_retries=2, per_request_retry_delay=0.5):
-    url = f"{UNIPROT_API_URL}{uniprot_id}"
-    for attempt in range(per_request_retries + 1):
-        try:
-            async with session.get(url, headers={"Accept": "application/json"}) as response:
-                if response.status == 200:
-                    return await response.json()
-                if attempt < per_request_retries:
-                    await asyncio.sleep(per_request_retry_delay)
-                    continue
-                return None
-        except (aiohttp.ClientError, asyncio.TimeoutError):
-            if attempt < per_request_retries:
-                await asyncio.sleep(per_request_retry_delay)
-                continue
-            return None
-    return None
+async def _get_uniprot_data(
+    uniprot_id, session, per_request_retries=2, per_request_retry_delay=0.5, limiter=None
+):
+    _, data = await fetch_json(
+        session,
+        "GET",
+        f"{UNIPROT_API_URL}{uniprot_id}",
+        limiter=limiter,
+        retries=per_request_retries,
+        retry_delay=per_request_retry_delay,
+        accept_statuses=(200, 404),
+        headers={"Accept": "application/json"},
+    )
+    return data
+
+
+async def _get_uniprot_batch(
+    uniprot_ids, session, per_request_retries=2, per_request_retry_delay=0.5, limiter=None
+):
+    _, entries = await fetch_json(
+        session,
+        "GET",
+        UNIPROT_API_URL.rstrip("/"),
+        limiter=limiter,
+        retries=per_request_retries,
+        retry_delay=per_request_retry_delay,
+        accept_statuses=(200, 404),
+        params={"accession": ",".join(uniprot_ids), "size": str(len(uniprot_ids))},
+        headers={"Accept": "application/json"},
+    )
+    return _match_uniprot_entries(uniprot_ids, entries)
+
+
+def _match_uniprot_entries(uniprot_ids, entries):
+    """
+    Map entries returned by a multi-accession request back to the requested UniProt IDs.
+
+    Entries are matched by primary accession first, then by secondary accessions,
+    so requests made with merged (secondary) accessions are still resolved.
+
+    Parameters
+    ----------
+    uniprot_ids : list
+        Requested UniProt IDs.
+    entries : list[dict]
+        Entries returned by the EBI proteins API.
+
+    Returns
+    -------
+    dict
+        {uniprot_id: entry} for every requested ID found in entries.
+    """
+    by_accession = {}
+    by_secondary = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        by_accession.setdefault(entry.get("accession"), entry)
+        for accession in entry.get("secondaryAccession", []):
+            by_secondary.setdefault(accession, entry)
+
+    matched = {}
+    for uniprot_id in uniprot_ids:
+        entry = by_accession.get(uniprot_id, by_secondary.get(uniprot_id))
+        if entry is not None:
+            matched[uniprot_id] = entry
+    return matched
 
 
 def _parse_uniprot_data(data):
@@ -77,26 +136,46 @@ def _parse_uniprot_data(data):
     return result
 
 
-async def _get_pdb_structures(uniprot_id, session, error_ids, per_request_retries=2, per_request_retry_delay=0.5):
-    url = f"{PDB_API_URL}{uniprot_id}"
-    for attempt in range(per_request_retries + 1):
-        try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                if attempt < per_request_retries:
-                    await asyncio.sleep(per_request_retry_delay)
-                    continue
-                error_ids["PDB"].append(uniprot_id)
-                return None
-        except (aiohttp.ClientError, asyncio.TimeoutError):
-            if attempt < per_request_retries:
-                await asyncio.sleep(per_request_retry_delay)
-                continue
-            error_ids["PDB"].append(uniprot_id)
-            return None
-    error_ids["PDB"].append(uniprot_id)
-    return None
+async def _get_pdb_structures(
+    uniprot_id, session, error_ids, per_request_retries=2, per_request_retry_delay=0.5, limiter=None
+):
+    # 404 means that PDBe has no structures for the accession
+    _, data = await fetch_json(
+        session,
+        "GET",
+        f"{PDB_API_URL}{uniprot_id}",
+        limiter=limiter,
+        retries=per_request_retries,
+        retry_delay=per_request_retry_delay,
+        accept_statuses=(200, 404),
+    )
+    if data is None:
+        error_ids["PDB"].append(uniprot_id)
+    return data
+
+
+async def _get_pdb_structures_batch(
+    uniprot_ids, session, error_ids, per_request_retries=2, per_request_retry_delay=0.5, limiter=None
+):
+    # PDBe answers a POST with a dict keyed by accession; accessions without structures are absent
+    # from it, and a batch where none of the accessions has a structure is answered with 404.
+    status, data = await fetch_json(
+        session,
+        "POST",
+        PDB_API_URL,
+        limiter=limiter,
+        retries=per_request_retries,
+        retry_delay=per_request_retry_delay,
+        accept_statuses=(200, 404),
+        data=",".join(uniprot_ids),
+    )
+    if status is None:
+        error_ids["PDB"].extend(uniprot_ids)
+        return None
+
+    data = data if isinstance(data, dict) else {}
+    error_ids["PDB"].extend(uid for uid in uniprot_ids if uid not in data)
+    return data
 
 
 def _parse_pdb_data(data, uniprot_id):
@@ -130,17 +209,13 @@ def protein_results_to_dataframe(results, set_index=True, flatten_nested=True, l
     df = pd.DataFrame(results)
 
     if flatten_nested and not df.empty:
+        # one pass over the raw values, without a Series.apply call per column
         if "GO_terms" in df.columns:
-            df["GO_ids"] = df["GO_terms"].apply(
-                lambda x: list_sep.join(x.keys()) if isinstance(x, dict) and x else ""
-            )
-            df["GO_labels"] = df["GO_terms"].apply(
-                lambda x: list_sep.join(str(v) for v in x.values()) if isinstance(x, dict) and x else ""
-            )
+            go_terms = [x if isinstance(x, dict) else {} for x in df["GO_terms"].tolist()]
+            df["GO_ids"] = [list_sep.join(x.keys()) for x in go_terms]
+            df["GO_labels"] = [list_sep.join(map(str, x.values())) for x in go_terms]
         if "PDB" in df.columns:
-            df["PDB_ids"] = df["PDB"].apply(
-                lambda x: list_sep.join(str(v) for v in x) if isinstance(x, list) and x else ""
-            )
+            df["PDB_ids"] = [list_sep.join(map(str, x)) if isinstance(x, list) else "" for x in df["PDB"].tolist()]
 
     if set_index and "UniProtID" in df.columns:
         df = df.set_index("UniProtID", drop=False)
@@ -148,44 +223,453 @@ def protein_results_to_dataframe(results, set_index=True, flatten_nested=True, l
     return df
 
 
-async def _get_protein_info(
-    uniprot_id,
-    session,
-    error_ids,
-    per_request_retries=2,
-    per_request_retry_delay=0.5,
-):
-    uniprot_data = await _get_uniprot_data(
-        uniprot_id,
-        session,
-        per_request_retries=per_request_retries,
-        per_request_retry_delay=per_request_retry_delay,
-    )
+def _build_protein_result(uniprot_id, uniprot_data):
     if not uniprot_data:
-        error_ids["UniProtID"].append(uniprot_id)
-        return None
+        return None, ["UniProtID"]
 
     try:
         result = _parse_uniprot_data(uniprot_data)
     except Exception:
-        error_ids["ParseError"].append(uniprot_id)
-        return None
+        return None, ["ParseError"]
 
-    for k, v in result.items():
-        if v == "N/A" or v == [] or v == {}:
-            error_ids.setdefault(k, []).append(uniprot_id)
+    errors = [k for k, v in result.items() if v == "N/A" or v == [] or v == {}]
+    return result, errors
 
-    pdb_data = await _get_pdb_structures(
-        uniprot_id,
-        session,
-        error_ids,
-        per_request_retries=per_request_retries,
-        per_request_retry_delay=per_request_retry_delay,
-    )
-    result["PDB"] = _parse_pdb_data(pdb_data, uniprot_id) if pdb_data else []
-    result["UniProtID"] = uniprot_id
 
-    return result
+async def _fetch_uniprot_stage(
+    uniprot_ids, session, batched, per_request_retries=2, per_request_retry_delay=0.5, limiter=None
+):
+    if batched:
+        uniprot_data = await _get_uniprot_batch(
+            list(dict.fromkeys(uniprot_ids)),
+            session,
+            per_request_retries=per_request_retries,
+            per_request_retry_delay=per_request_retry_delay,
+            limiter=limiter,
+        )
+    else:
+        uniprot_data = {}
+        for uid in dict.fromkeys(uniprot_ids):
+            uniprot_data[uid] = await _get_uniprot_data(
+                uid,
+                session,
+                per_request_retries=per_request_retries,
+                per_request_retry_delay=per_request_retry_delay,
+                limiter=limiter,
+            )
+    return {uid: _build_protein_result(uid, uniprot_data.get(uid)) for uid in uniprot_ids}
+
+
+async def _fetch_pdb_stage(
+    uniprot_ids, session, batched, per_request_retries=2, per_request_retry_delay=0.5, limiter=None
+):
+    stage_errors = {"PDB": []}
+    unique_ids = list(dict.fromkeys(uniprot_ids))
+    if batched:
+        pdb_data = await _get_pdb_structures_batch(
+            unique_ids,
+            session,
+            stage_errors,
+            per_request_retries=per_request_retries,
+            per_request_retry_delay=per_request_retry_delay,
+            limiter=limiter,
+        )
+    else:
+        pdb_data = {}
+        for uid in unique_ids:
+            uid_data = await _get_pdb_structures(
+                uid,
+                session,
+                stage_errors,
+                per_request_retries=per_request_retries,
+                per_request_retry_delay=per_request_retry_delay,
+                limiter=limiter,
+            )
+            if uid_data:
+                pdb_data.update(uid_data)
+    return pdb_data or {}, set(stage_errors["PDB"])
+
+
+def _sifts_stage(uniprot_ids, pdb_index):
+    # output of _fetch_pdb_stage answered from a SiftsIndex; IDs without structures are PDB errors
+    found = pdb_index.lookup(uniprot_ids)
+    pdb_data = {uid: [{"pdb_id": pdb_id} for pdb_id in pdb_ids] for uid, pdb_ids in found.items()}
+    return pdb_data, {uid for uid in uniprot_ids if uid not in found}
+
+
+def _open_pdb_index(pdb_index):
+    if pdb_index is None or isinstance(pdb_index, SiftsIndex):
+        return pdb_index
+    if not os.path.isdir(pdb_index):
+        raise FileNotFoundError(f"SIFTS index {pdb_index!r} does not exist, build it with SiftsIndex.from_tsv and save")
+    return SiftsIndex.load(pdb_index)
+
+
+def _join_stages(chunk, uniprot_stage, pdb_stage):
+    """
+    Combine the UniProt and PDB stage outputs of one chunk.
+
+    Returns a list of (index, uniprot_id, result, error_categories) in chunk order.
+    A stage output of None means the stage failed with an unexpected exception.
+    PDB errors are reported only for IDs whose UniProt entry was found.
+    """
+    joined = []
+    for index, uid in chunk:
+        if uniprot_stage is None or pdb_stage is None:
+            joined.append((index, uid, None, ["UnhandledError"]))
+            continue
+
+        result, errors = uniprot_stage[uid]
+        if result is not None:
+            pdb_data, pdb_failed = pdb_stage
+            result = dict(result, PDB=_parse_pdb_data(pdb_data, uid), UniProtID=uid)
+            if uid in pdb_failed:
+                errors = errors + ["PDB"]
+        joined.append((index, uid, result, errors))
+    return joined
+
+
+async def _as_async_iterable(items):
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def _aenumerate(items):
+    index = 0
+    async for item in _as_async_iterable(items):
+        yield index, item
+        index += 1
+
+
+async def _iter_pipeline(
+    items,
+    uniprot_session,
+    pdb_session,
+    uniprot_concurrent=10,
+    pdb_concurrent=10,
+    batch_size=None,
+    per_request_retries=2,
+    per_request_retry_delay=0.5,
+    limiter=None,
+    window=None,
+    pdb_index=None,
+):
+    """
+    Run the UniProt and PDB stages concurrently over (index, uniprot_id) items.
+
+    Items (an iterable or an async iterable) are grouped into chunks (batch_size IDs, or single IDs
+    when batch_size is None). Every chunk goes to both stages at once: each stage has its own queue,
+    its own worker pool of the given size and its own session, so PDB lookups never wait for UniProt
+    payloads and a slow host does not hold back the other one.
+    Yields the joined results of each chunk as soon as both stages have finished it.
+    If window is set, at most window items are read from the input and not yet yielded.
+    If pdb_index (a SiftsIndex) is given, the PDB stage is answered from it when a chunk is queued,
+    without PDB workers or requests.
+    """
+    batched = batch_size is not None
+    chunk_size = batch_size or 1
+    in_flight = asyncio.Semaphore(window) if window is not None else None
+    uniprot_queue = asyncio.Queue()
+    pdb_queue = asyncio.Queue()
+    output = asyncio.Queue()
+    pending = {}
+
+    def _deliver(chunk_no, chunk, stage, value):
+        slot = pending.setdefault(chunk_no, {})
+        slot[stage] = value
+        if len(slot) == 2:
+            del pending[chunk_no]
+            output.put_nowait(_join_stages(chunk, slot["uniprot"], slot["pdb"]))
+
+    async def _worker(queue, stage, fetch, session):
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+            chunk_no, chunk = job
+            try:
+                value = await fetch(
+                    [uid for _, uid in chunk],
+                    session,
+                    batched,
+                    per_request_retries=per_request_retries,
+                    per_request_retry_delay=per_request_retry_delay,
+                    limiter=limiter,
+                )
+            except Exception:
+                value = None
+            _deliver(chunk_no, chunk, stage, value)
+
+    if pdb_index is not None:
+        pdb_concurrent = 0
+
+    def _put_chunk(chunk_no, chunk):
+        uniprot_queue.put_nowait((chunk_no, chunk))
+        if pdb_index is not None:
+            _deliver(chunk_no, chunk, "pdb", _sifts_stage([uid for _, uid in chunk], pdb_index))
+        else:
+            pdb_queue.put_nowait((chunk_no, chunk))
+
+    async def _feed():
+        chunk = []
+        chunk_no = 0
+        iterator = _as_async_iterable(items).__aiter__()
+        while True:
+            # the window slot is taken before the next item is read from the input
+            if in_flight is not None:
+                if in_flight.locked() and chunk:
+                    # a partial chunk must not wait for a window slot that only its own results can free
+                    _put_chunk(chunk_no, chunk)
+                    chunk_no += 1
+                    chunk = []
+                await in_flight.acquire()
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            chunk.append(item)
+            if len(chunk) == chunk_size:
+                _put_chunk(chunk_no, chunk)
+                chunk_no += 1
+                chunk = []
+        if chunk:
+            _put_chunk(chunk_no, chunk)
+        for _ in range(uniprot_concurrent):
+            uniprot_queue.put_nowait(None)
+        for _ in range(pdb_concurrent):
+            pdb_queue.put_nowait(None)
+
+    workers = [
+        asyncio.create_task(_worker(uniprot_queue, "uniprot", _fetch_uniprot_stage, uniprot_session))
+        for _ in range(uniprot_concurrent)
+    ] + [
+        asyncio.create_task(_worker(pdb_queue, "pdb", _fetch_pdb_stage, pdb_session))
+        for _ in range(pdb_concurrent)
+    ]
+
+    async def _run():
+        try:
+            await _feed()
+            await asyncio.gather(*workers)
+        finally:
+            output.put_nowait(None)
+
+    runner = asyncio.create_task(_run())
+    try:
+        while True:
+            chunk_results = await output.get()
+            if chunk_results is None:
+                break
+            if in_flight is not None:
+                for _ in chunk_results:
+                    in_flight.release()
+            yield chunk_results
+        await runner
+    finally:
+        # on early exit (break, aclose, error) the tasks are cancelled and awaited, so none is left pending
+        tasks = [runner, *workers]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _local_results(chunk, found, primary=None, pdb_index=None):
+    # (index, uniprot_id, result, error_categories) like _join_stages, from ProteinIndex entries;
+    # SIFTS maps primary accessions, so secondary ones are looked up by their primary accession
+    joined = []
+    primary = primary or {}
+    structures = {}
+    if pdb_index is not None:
+        structures = pdb_index.lookup([primary.get(uid, uid) for _, uid in chunk])
+    for index, uid in chunk:
+        entry = found.get(uid)
+        if entry is None:
+            joined.append((index, uid, None, ["UniProtID"]))
+            continue
+        pdb = entry.pop("PDB")
+        if pdb_index is not None:
+            pdb = structures.get(primary.get(uid, uid), [])
+        errors = [k for k, v in entry.items() if v == "N/A" or v == [] or v == {}]
+        if not pdb:
+            errors.append("PDB")
+        joined.append((index, uid, dict(entry, PDB=pdb, UniProtID=uid), errors))
+    return joined
+
+
+async def _stream_local(items, protein_index, chunk_size=LOCAL_CHUNK_SIZE, pdb_index=None):
+    """
+    Yields results of (index, uniprot_id) items looked up in a ProteinIndex, chunk by chunk.
+    """
+    async with AsyncExitStack() as stack:
+        if not isinstance(protein_index, ProteinIndex):
+            if not os.path.exists(protein_index):
+                raise FileNotFoundError(f"protein index {protein_index!r} does not exist, build it with ProteinIndex.ingest")
+            protein_index = stack.enter_context(ProteinIndex(protein_index))
+
+        def _results(chunk):
+            uniprot_ids = [uid for _, uid in chunk]
+            primary = protein_index.primary_accessions(uniprot_ids) if pdb_index is not None else None
+            return _local_results(chunk, protein_index.lookup(uniprot_ids), primary, pdb_index)
+
+        chunk = []
+        async for item in _as_async_iterable(items):
+            chunk.append(item)
+            if len(chunk) == chunk_size:
+                yield _results(chunk)
+                chunk = []
+        if chunk:
+            yield _results(chunk)
+
+
+def _check_backend(backend, protein_index):
+    if backend not in ("api", "local"):
+        raise ValueError("backend must be 'api' or 'local'")
+    if backend == "local" and protein_index is None:
+        raise ValueError("backend='local' needs protein_index, a ProteinIndex built from a UniProt release")
+
+
+def _resolve_stage_concurrency(max_concurrent, uniprot_concurrent, pdb_concurrent, request_timeout,
+                               per_request_retries, batch_size):
+    uniprot_concurrent = max_concurrent if uniprot_concurrent is None else uniprot_concurrent
+    pdb_concurrent = max_concurrent if pdb_concurrent is None else pdb_concurrent
+    if min(max_concurrent, uniprot_concurrent, pdb_concurrent) < 1:
+        raise ValueError("max_concurrent, uniprot_concurrent and pdb_concurrent must be at least 1")
+    if request_timeout <= 0:
+        raise ValueError("request_timeout must be > 0")
+    if per_request_retries < 0:
+        raise ValueError("per_request_retries must be >= 0")
+    if batch_size is not None and not 1 <= batch_size <= UNIPROT_MAX_BATCH_SIZE:
+        raise ValueError(f"batch_size must be between 1 and {UNIPROT_MAX_BATCH_SIZE}, or None")
+    return uniprot_concurrent, pdb_concurrent
+
+
+async def _stream_proteins(
+    items,
+    uniprot_concurrent,
+    pdb_concurrent,
+    request_timeout=20.0,
+    per_request_retries=2,
+    per_request_retry_delay=0.5,
+    batch_size=None,
+    limiter=None,
+    window=None,
+    uniprot_session=None,
+    pdb_session=None,
+    pdb_index=None,
+):
+    if limiter is None:
+        limiter = RateLimiter()
+        limiter.configure(UNIPROT_API_URL, max_concurrent=uniprot_concurrent)
+        limiter.configure(PDB_API_URL, max_concurrent=pdb_concurrent)
+
+    async with AsyncExitStack() as stack:
+        timeout = aiohttp.ClientTimeout(total=request_timeout)
+        if uniprot_session is None:
+            uniprot_session = await stack.enter_async_context(aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=uniprot_concurrent), timeout=timeout,
+            ))
+        if pdb_session is None and pdb_index is None:
+            pdb_session = await stack.enter_async_context(aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=pdb_concurrent), timeout=timeout,
+            ))
+
+        async for chunk_results in _iter_pipeline(
+            items,
+            uniprot_session,
+            pdb_session,
+            uniprot_concurrent=uniprot_concurrent,
+            pdb_concurrent=pdb_concurrent,
+            batch_size=batch_size,
+            per_request_retries=per_request_retries,
+            per_request_retry_delay=per_request_retry_delay,
+            limiter=limiter,
+            window=window,
+            pdb_index=pdb_index,
+        ):
+            yield chunk_results
+
+
+async def iter_proteins_info(
+    uniprot_ids,
+    max_concurrent=10,
+    request_timeout=20.0,
+    per_request_retries=2,
+    per_request_retry_delay=0.5,
+    batch_size=None,
+    uniprot_concurrent=None,
+    pdb_concurrent=None,
+    limiter=None,
+    window=None,
+    uniprot_session=None,
+    pdb_session=None,
+    backend="api",
+    protein_index=None,
+    pdb_index=None,
+):
+    """
+    Asynchronously yields protein information for UniProt IDs as soon as each one is processed.
+
+    Unlike get_proteins_info, IDs are read lazily and only a bounded window of them is in flight,
+    so memory use does not grow with the number of IDs. Records are yielded in completion order.
+
+    Parameters
+    ----------
+    uniprot_ids : iterable or async iterable
+        UniProt IDs to query.
+    window : int or None
+        Maximum number of IDs read from uniprot_ids but not yet yielded.
+        Default is 4 * max(uniprot_concurrent, pdb_concurrent) * (batch_size or 1).
+    max_concurrent, request_timeout, per_request_retries, per_request_retry_delay, batch_size,
+    uniprot_concurrent, pdb_concurrent, limiter, uniprot_session, pdb_session, backend, protein_index, pdb_index
+        Same as in get_proteins_info.
+
+    Yields
+    ------
+    tuple
+        (uniprot_id, result, error_categories), where result is the protein information dict
+        (None if the ID could not be processed) and error_categories is a list of error_ids keys
+        the ID belongs to.
+
+    Examples
+    --------
+    >>> async for uniprot_id, result, errors in iter_proteins_info(read_ids(), batch_size=100):
+    ...     if result is not None:
+    ...         await writer.write(result)
+    """
+    uniprot_concurrent, pdb_concurrent = _resolve_stage_concurrency(
+        max_concurrent, uniprot_concurrent, pdb_concurrent, request_timeout, per_request_retries, batch_size
+    )
+    if window is None:
+        window = 4 * max(uniprot_concurrent, pdb_concurrent) * (batch_size or 1)
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    _check_backend(backend, protein_index)
+    pdb_index = _open_pdb_index(pdb_index)
+
+    if backend == "local":
+        stream = _stream_local(_aenumerate(uniprot_ids), protein_index, pdb_index=pdb_index)
+    else:
+        stream = _stream_proteins(
+            _aenumerate(uniprot_ids),
+            uniprot_concurrent,
+            pdb_concurrent,
+            request_timeout=request_timeout,
+            per_request_retries=per_request_retries,
+            per_request_retry_delay=per_request_retry_delay,
+            batch_size=batch_size,
+            limiter=limiter,
+            window=window,
+            uniprot_session=uniprot_session,
+            pdb_session=pdb_session,
+            pdb_index=pdb_index,
+        )
+    async for chunk_results in stream:
+        for _, uid, result, errors in chunk_results:
+            yield uid, result, errors
 
 
 async def get_proteins_info(
@@ -196,16 +680,29 @@ async def get_proteins_info(
     request_timeout=20.0,
     per_request_retries=2,
     per_request_retry_delay=0.5,
+    batch_size=None,
+    uniprot_concurrent=None,
+    pdb_concurrent=None,
+    limiter=None,
+    uniprot_session=None,
+    pdb_session=None,
+    backend="api",
+    protein_index=None,
+    pdb_index=None,
+    columnar=False,
 ):
     """
     Asynchronously retrieves protein information for a list of UniProt IDs.
 
+    UniProt entries and PDB structures are fetched by two pipeline stages that run concurrently,
+    each with its own concurrency limit and connection pool.
+
     Parameters
     ----------
     uniprot_ids : list
         A list of UniProt IDs to query.
     max_concurrent : int
-        The maximum number of concurrent requests to the APIs. Default is 10.
+        The maximum number of concurrent requests per API. Default is 10.
     return_dataframe : bool
         If True, return pandas DataFrame instead of list of dictionaries.
     flatten_nested : bool
@@ -215,57 +712,100 @@ async def get_proteins_info(
     per_request_retries : int
         Number of retries for each request. Default is 2.
     per_request_retry_delay : float
-        Delay between per-request retries in seconds. Default is 0.5.
+        Base delay of the exponential backoff between per-request retries in seconds. Default is 0.5.
+        Retry-After headers of 429/503 answers are honored.
+    batch_size : int or None
+        If set, UniProt entries are fetched with multi-accession requests of up to batch_size IDs
+        (at most 100), and PDB structures of each batch with one PDBe POST request.
+        IDs missing from a batch response are reported in error_ids["UniProtID"] and error_ids["PDB"].
+        Default is None: one UniProt and one PDBe request per UniProt ID.
+    uniprot_concurrent : int or None
+        Concurrency limit of the UniProt stage. Default is max_concurrent.
+    pdb_concurrent : int or None
+        Concurrency limit of the PDBe stage. Default is max_concurrent.
+    limiter : RateLimiter or None
+        Shared rate limiter (token-bucket rate cap, adaptive concurrency). If None, a limiter
+        capped at uniprot_concurrent/pdb_concurrent requests to each API is created for this call.
+    uniprot_session, pdb_session : aiohttp.ClientSession or None
+        Open sessions to reuse for the EBI proteins and PDBe APIs (see BioToolsClient).
+        If None, a session is opened for this call. request_timeout applies only to sessions opened here.
+    backend : str
+        "api" (default) queries the EBI proteins and PDBe APIs. "local" reads entries from
+        protein_index without network access; PDB lists then come from the PDB cross-references
+        of the entries, and the request options are ignored.
+    protein_index : ProteinIndex or str or None
+        Offline index (or the path of its SQLite file) used by backend="local", see ProteinIndex.
+    pdb_index : SiftsIndex or str or None
+        SIFTS index (or the directory it was saved to) to fill PDB from instead of the PDBe API,
+        see SiftsIndex. No PDBe requests are sent; accessions without structures are reported in
+        error_ids["PDB"]. With backend="local" it replaces the PDB cross-references of the entries.
+    columnar : bool
+        If True, results are appended into a ProteinTable instead of being kept as one dict per
+        protein, and the ProteinTable is returned (its to_pandas() DataFrame with
+        return_dataframe=True; flatten_nested is then ignored, GO and PDB are list columns).
+        Results are appended in the order of uniprot_ids, those arriving early are held until the
+        earlier IDs are done, so the table is exported without copying.
 
     Returns
     -------
     tuple
-        - results: list or pandas.DataFrame
+        - results: list, pandas.DataFrame or ProteinTable
             Protein information per UniProt ID.
         - error_ids: dict
             A dictionary where each key is a category of error and each value is a list of UniProt IDs that encountered that error.
     """
-    if max_concurrent < 1:
-        raise ValueError("max_concurrent must be at least 1")
-    if request_timeout <= 0:
-        raise ValueError("request_timeout must be > 0")
-    if per_request_retries < 0:
-        raise ValueError("per_request_retries must be >= 0")
+    uniprot_concurrent, pdb_concurrent = _resolve_stage_concurrency(
+        max_concurrent, uniprot_concurrent, pdb_concurrent, request_timeout, per_request_retries, batch_size
+    )
+    _check_backend(backend, protein_index)
+    pdb_index = _open_pdb_index(pdb_index)
 
     error_ids = _init_error_ids()
-
-    timeout = aiohttp.ClientTimeout(total=request_timeout)
-    connector = aiohttp.TCPConnector(limit=max_concurrent)
-    semaphore = asyncio.Semaphore(max_concurrent)
-
-    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-
-        async def _bounded(uid):
-            try:
-                async with semaphore:
-                    return await _get_protein_info(
-                        uid,
-                        session,
-                        error_ids,
-                        per_request_retries=per_request_retries,
-                        per_request_retry_delay=per_request_retry_delay,
-                    )
-            except Exception:
-                error_ids["UnhandledError"].append(uid)
-                return None
-
-        tasks = [_bounded(uid) for uid in tqdm(uniprot_ids)]
-        results = await tqdm.gather(
-            *tasks,
-            desc="Fetching protein data",
-            unit="protein",
+    uniprot_ids = list(uniprot_ids)
+    table = ProteinTable() if columnar else None
+    results = [] if columnar else [None] * len(uniprot_ids)
+    pending, next_index = {}, 0
+
+    if backend == "local":
+        stream = _stream_local(enumerate(uniprot_ids), protein_index, pdb_index=pdb_index)
+    else:
+        stream = _stream_proteins(
+            enumerate(uniprot_ids),
+            uniprot_concurrent,
+            pdb_concurrent,
+            request_timeout=request_timeout,
+            per_request_retries=per_request_retries,
+            per_request_retry_delay=per_request_retry_delay,
+            batch_size=batch_size,
+            limiter=limiter,
+            uniprot_session=uniprot_session,
+            pdb_session=pdb_session,
+            pdb_index=pdb_index,
         )
-
-    valid_results = [res for res in results if res is not None]
+    with tqdm(total=len(uniprot_ids), desc="Fetching protein data", unit="protein") as progress:
+        async for chunk_results in stream:
+            for index, uid, result, errors in chunk_results:
+                if table is None:
+                    results[index] = result
+                else:
+                    pending[index] = (uid, result)
+                for category in errors:
+                    error_ids.setdefault(category, []).append(uid)
+            # fill the table in input order, so that its buffers need no reordering on export
+            while next_index in pending:
+                uid, result = pending.pop(next_index)
+                if result is not None:
+                    table.append(uid, result)
+                next_index += 1
+            progress.update(len(chunk_results))
+
+    valid_results = table if columnar else [res for res in results if res is not None]
 
     print(f"{len(valid_results)} UniProtID were successfully processed")
     print(f"{len(error_ids['UniProtID'])} UniProtID not found")
 
+    if columnar:
+        return (table.to_pandas() if return_dataframe else table), error_ids
     if return_dataframe:
         return protein_results_to_dataframe(valid_results, flatten_nested=flatten_nested), error_ids
 
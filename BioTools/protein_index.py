@@ -0,0 +1,314 @@
+import bz2
+import gzip
+import json
+import lzma
+import re
+import sqlite3
+import xml.etree.ElementTree as ET
+
+_SQLITE_CHUNK = 500
+_INSERT_BATCH = 10000
+_XML_NS = "{http://uniprot.org/uniprot}"
+_EVIDENCE_PATTERN = re.compile(r"\s*\{[^{}]*\}")  # ' {ECO:0000269|PubMed:123}' of flat files
+_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+class ProteinIndex:
+    """
+    Offline SQLite index of UniProt entries, built from streamed UniProt releases.
+
+    Every entry stores the fields of get_proteins_info results (Gene, TaxID, Annotation, GO_terms,
+    Sequence, and PDB from the PDB cross-references of the entry) under its primary accession;
+    secondary accessions point to it. It serves get_proteins_info(..., backend="local").
+
+    Parameters
+    ----------
+    path : str
+        Path to the SQLite database file. It is created if it does not exist.
+
+    Examples
+    --------
+    >>> index = ProteinIndex("proteins.sqlite")
+    >>> index.ingest("uniprot_sprot.dat.gz")  # once
+    >>> results, error_ids = await get_proteins_info(uniprot_ids, backend="local", protein_index=index)
+    """
+
+    def __init__(self, path="protein_index.sqlite"):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS proteins ("
+            "accession TEXT PRIMARY KEY, gene TEXT, taxid INTEGER, annotation TEXT, go_terms TEXT NOT NULL, "
+            "sequence TEXT, pdb TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS secondary_accessions ("
+            "accession TEXT PRIMARY KEY, primary_accession TEXT NOT NULL);"
+        )
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM proteins").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def ingest(self, path, format=None):
+        """
+        Adds the entries of a UniProt release file to the index, reading it as a stream.
+
+        Parameters
+        ----------
+        path : str
+            Plain or compressed (.gz, .bz2, .xz) release file, e.g. uniprot_sprot.dat.gz.
+        format : str or None
+            'flat' (UniProt text format, .dat/.txt), 'xml' or 'jsonl' (one entry per line, in the
+            EBI proteins API or the rest.uniprot.org format). None guesses it from the file name.
+
+        Returns
+        -------
+        int
+            Number of entries in the index afterwards.
+        """
+        if format is None:
+            format = _guess_format(path)
+        if format not in _PARSERS:
+            raise ValueError(f"format must be one of {sorted(_PARSERS)}")
+
+        batch = []
+        with _open_text(path) as f:
+            for entry in _PARSERS[format](f):
+                batch.append(entry)
+                if len(batch) >= _INSERT_BATCH:
+                    self._insert(batch)
+                    batch = []
+        self._insert(batch)
+        return len(self)
+
+    def _insert(self, entries):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO proteins (accession, gene, taxid, annotation, go_terms, sequence, pdb) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(accessions[0], result["Gene"], result["TaxID"], result["Annotation"], json.dumps(result["GO_terms"]),
+                  result["Sequence"], json.dumps(result["PDB"])) for accessions, result in entries],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO secondary_accessions (accession, primary_accession) VALUES (?, ?)",
+                [(secondary, accessions[0]) for accessions, _ in entries for secondary in accessions[1:]],
+            )
+
+    def _select(self, table, columns, accessions):
+        # {accession: (columns...)} of the accessions found in table
+        rows = {}
+        for i in range(0, len(accessions), _SQLITE_CHUNK):
+            chunk = accessions[i:i + _SQLITE_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            query = f"SELECT accession, {columns} FROM {table} WHERE accession IN ({placeholders})"
+            rows.update((row[0], row[1:]) for row in self._conn.execute(query, chunk))
+        return rows
+
+    def primary_accessions(self, uniprot_ids):
+        """
+        Returns
+        -------
+        dict
+            {uniprot_id: primary accession} for the IDs that are secondary accessions of an entry.
+        """
+        rows = self._select("secondary_accessions", "primary_accession", list(dict.fromkeys(uniprot_ids)))
+        return {uid: row[0] for uid, row in rows.items()}
+
+    def lookup(self, uniprot_ids):
+        """
+        Looks up entries by primary accession first, then by secondary accession.
+
+        Parameters
+        ----------
+        uniprot_ids : list
+            UniProt accessions.
+
+        Returns
+        -------
+        dict
+            {uniprot_id: result} for the IDs found. result has the keys of get_proteins_info results
+            except UniProtID, with "N/A" for missing values.
+        """
+        uniprot_ids = list(dict.fromkeys(uniprot_ids))
+        columns = "gene, taxid, annotation, go_terms, sequence, pdb"
+        rows = self._select("proteins", columns, uniprot_ids)
+        missing = [uid for uid in uniprot_ids if uid not in rows]
+        if missing:
+            primary = self.primary_accessions(missing)
+            primary_rows = self._select("proteins", columns, list(dict.fromkeys(primary.values())))
+            rows.update((uid, primary_rows[accession]) for uid, accession in primary.items() if accession in primary_rows)
+
+        found = {}
+        for uid in uniprot_ids:
+            if uid in rows:
+                gene, taxid, annotation, go_terms, sequence, pdb = rows[uid]
+                found[uid] = {
+                    "Gene": _or_na(gene),
+                    "TaxID": _or_na(taxid),
+                    "Annotation": _or_na(annotation),
+                    "GO_terms": json.loads(go_terms),
+                    "Sequence": _or_na(sequence),
+                    "PDB": json.loads(pdb),
+                }
+        return found
+
+
+def _or_na(value):
+    return "N/A" if value is None else value
+
+
+def _guess_format(path):
+    name = path.lower()
+    for suffix in _OPENERS:
+        name = name[:-len(suffix)] if name.endswith(suffix) else name
+    if name.endswith(".xml"):
+        return "xml"
+    if name.endswith((".jsonl", ".json")):
+        return "jsonl"
+    return "flat"
+
+
+def _open_text(path):
+    for suffix, opener in _OPENERS.items():
+        if path.endswith(suffix):
+            return opener(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def _new_result():
+    return {"Gene": None, "TaxID": None, "Annotation": None, "GO_terms": {}, "Sequence": None, "PDB": []}
+
+
+def _finish(result, pdb_ids):
+    # PDB IDs lowercased like those of the PDBe API and SIFTS, sorted and without duplicates
+    result["PDB"] = sorted({pdb_id.lower() for pdb_id in pdb_ids})
+    return result
+
+
+def _parse_flat(lines):
+    """
+    Yields (accessions, result) of every entry of a UniProt flat file.
+    """
+    accessions, result, pdb_ids = [], _new_result(), []
+    function, in_function, sequence = [], False, []
+    for line in lines:
+        code, value = line[:2], line[5:].rstrip("\n")
+        if code == "//":
+            if function:
+                result["Annotation"] = _EVIDENCE_PATTERN.sub("", " ".join(function)).rstrip(".").strip() + "."
+            result["Sequence"] = "".join(sequence) or None
+            if accessions:
+                yield accessions, _finish(result, pdb_ids)
+            accessions, result, pdb_ids = [], _new_result(), []
+            function, in_function, sequence = [], False, []
+        elif code == "AC":
+            accessions.extend(accession.strip() for accession in value.split(";") if accession.strip())
+        elif code == "GN" and result["Gene"] is None and value.startswith("Name="):
+            result["Gene"] = _EVIDENCE_PATTERN.sub("", value[len("Name="):].split(";")[0]).strip()
+        elif code == "OX" and value.startswith("NCBI_TaxID="):
+            result["TaxID"] = int(re.match(r"\d+", value[len("NCBI_TaxID="):]).group())
+        elif code == "CC":
+            if value.startswith("-!- "):
+                in_function = value.startswith("-!- FUNCTION:") and not function
+                if in_function:
+                    function.append(value[len("-!- FUNCTION:"):].strip())
+            elif value.startswith("---"):
+                in_function = False
+            elif in_function:
+                function.append(value.strip())
+        elif code == "DR":
+            fields = [field.strip() for field in value.split(";")]
+            if fields[0] == "GO" and len(fields) > 2:
+                result["GO_terms"][fields[1]] = fields[2]
+            elif fields[0] == "PDB" and len(fields) > 1:
+                pdb_ids.append(fields[1])
+        elif code == "  ":
+            sequence.append(value.replace(" ", ""))
+
+
+def _parse_xml(f):
+    """
+    Yields (accessions, result) of every entry of a UniProt XML file, clearing parsed elements.
+    """
+    context = ET.iterparse(f, events=("start", "end"))
+    _, root = next(context)
+    for event, element in context:
+        if event != "end" or element.tag != f"{_XML_NS}entry":
+            continue
+        result, pdb_ids = _new_result(), []
+        accessions = [accession.text for accession in element.findall(f"{_XML_NS}accession")]
+        gene = element.find(f"{_XML_NS}gene/{_XML_NS}name[@type='primary']")
+        result["Gene"] = gene.text if gene is not None else None
+        taxon = element.find(f"{_XML_NS}organism/{_XML_NS}dbReference[@type='NCBI Taxonomy']")
+        result["TaxID"] = int(taxon.get("id")) if taxon is not None else None
+        function = element.find(f"{_XML_NS}comment[@type='function']/{_XML_NS}text")
+        result["Annotation"] = function.text if function is not None else None
+        for reference in element.findall(f"{_XML_NS}dbReference"):
+            if reference.get("type") == "GO":
+                term = reference.find(f"{_XML_NS}property[@type='term']")
+                result["GO_terms"][reference.get("id")] = term.get("value") if term is not None else None
+            elif reference.get("type") == "PDB":
+                pdb_ids.append(reference.get("id"))
+        sequence = element.find(f"{_XML_NS}sequence")
+        result["Sequence"] = "".join(sequence.text.split()) if sequence is not None and sequence.text else None
+        root.clear()  # drop parsed entries, so memory does not grow with the file
+        if accessions:
+            yield accessions, _finish(result, pdb_ids)
+
+
+def _parse_jsonl(lines):
+    """
+    Yields (accessions, result) of every entry of a JSON lines file.
+    """
+    from .protein_annotation import _parse_uniprot_data
+
+    for line in lines:
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        if "primaryAccession" in entry:
+            entry = _from_rest_format(entry)
+        result = {key: None if value == "N/A" else value for key, value in _parse_uniprot_data(entry).items()}
+        pdb_ids = [reference.get("id") for reference in entry.get("dbReferences", []) if reference.get("type") == "PDB"]
+        accessions = [entry.get("accession"), *entry.get("secondaryAccession", [])]
+        if accessions[0]:
+            yield accessions, _finish(result, pdb_ids)
+
+
+def _from_rest_format(entry):
+    # rest.uniprot.org JSON entry -> the EBI proteins API layout read by _parse_uniprot_data
+    genes = entry.get("genes") or [{}]
+    return {
+        "accession": entry.get("primaryAccession"),
+        "secondaryAccession": entry.get("secondaryAccessions", []),
+        "gene": [{"name": genes[0].get("geneName", {})}],
+        "organism": {"taxonomy": entry.get("organism", {}).get("taxonId", "N/A")},
+        "comments": [
+            {"type": "FUNCTION", "text": comment.get("texts", [])}
+            for comment in entry.get("comments", []) if comment.get("commentType") == "FUNCTION"
+        ],
+        "dbReferences": [
+            {"type": reference.get("database"), "id": reference.get("id"),
+             "properties": {"term": _rest_property(reference, "GoTerm")}}
+            for reference in entry.get("uniProtKBCrossReferences", [])
+        ],
+        "sequence": {"sequence": entry.get("sequence", {}).get("value", "N/A")},
+    }
+
+
+def _rest_property(reference, key):
+    for prop in reference.get("properties", []):
+        if prop.get("key") == key:
+            return prop.get("value")
+    return None
+
+
+_PARSERS = {"flat": _parse_flat, "xml": _parse_xml, "jsonl": _parse_jsonl}
@@ -0,0 +1,208 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+
+_STRING_FIELDS = ["UniProtID", "Gene", "Annotation", "Sequence"]
+
+
+class _StringColumn:
+    # UTF-8 values concatenated into one buffer, with int64 offsets and a validity mask
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("q", [0])
+        self.valid = bytearray()
+
+    def append(self, value):
+        if value is None:
+            self.valid.append(0)
+        else:
+            self.data += value.encode()
+            self.valid.append(1)
+        self.offsets.append(len(self.data))
+
+    def to_list(self):
+        data, offsets = bytes(self.data), self.offsets
+        return [data[offsets[i]:offsets[i + 1]].decode() if self.valid[i] else None for i in range(len(self.valid))]
+
+
+class _DictionaryListColumn:
+    # list column whose items are dictionary-encoded: indices into values, one offset per row
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+        self.indices = array("i")
+        self.offsets = array("q", [0])
+
+    def append(self, items):
+        for item in items:
+            code = self.codes.get(item)
+            if code is None:
+                code = self.codes[item] = len(self.values)
+                self.values.append(item)
+            self.indices.append(code)
+        self.offsets.append(len(self.indices))
+
+    def to_list(self, values=None):
+        values = np.asarray(self.values if values is None else values, dtype=object)
+        items = values[np.frombuffer(self.indices, dtype=np.int32)] if len(self.indices) else values[:0]
+        offsets = self.offsets
+        return [items[offsets[i]:offsets[i + 1]].tolist() for i in range(len(offsets) - 1)]
+
+
+def _missing(value):
+    return value is None or value == "N/A"
+
+
+class ProteinTable:
+    """
+    Columnar builder of get_proteins_info results.
+
+    Results are appended as they arrive, without keeping per-protein dicts: the string fields
+    (UniProtID, Gene, Annotation, Sequence) are stored as one UTF-8 buffer with offsets each,
+    TaxID as an int64 array, and GO terms and PDB IDs as dictionary-encoded list columns (every
+    distinct GO ID, label and PDB ID is stored once). "N/A" values become nulls.
+
+    The buffers are handed over to Arrow without copying, see ProteinTable.to_arrow. The exported
+    table shares them, so exporting (to_arrow or to_pandas) freezes the builder: later appends
+    raise RuntimeError.
+
+    Examples
+    --------
+    >>> table, error_ids = await get_proteins_info(uniprot_ids, batch_size=100, columnar=True)
+    >>> df = table.to_pandas()
+    >>> arrow_table = table.to_arrow()
+    """
+
+    def __init__(self):
+        self._strings = {field: _StringColumn() for field in _STRING_FIELDS}
+        self._taxids = array("q")
+        self._taxid_valid = bytearray()
+        self._go = _DictionaryListColumn()
+        self._go_labels = []
+        self._pdb = _DictionaryListColumn()
+        self._positions = array("q")
+        self._frozen = False
+
+    def __len__(self):
+        return len(self._taxids)
+
+    def __repr__(self):
+        return f"ProteinTable({len(self)} proteins, {len(self._go.values)} GO terms, {len(self._pdb.values)} PDB IDs)"
+
+    def append(self, uniprot_id, result, position=None):
+        """
+        Adds one protein.
+
+        Parameters
+        ----------
+        uniprot_id : str
+            Requested UniProt ID.
+        result : dict
+            A get_proteins_info result (Gene, TaxID, Annotation, GO_terms, Sequence, PDB).
+        position : int or None
+            Position of the protein in the output. Defaults to the order of appending.
+        """
+        if self._frozen:
+            raise RuntimeError("ProteinTable was exported and shares its buffers with the result, "
+                               "append to a new ProteinTable instead")
+        self._positions.append(len(self) if position is None else position)
+        for field in _STRING_FIELDS:
+            value = uniprot_id if field == "UniProtID" else result.get(field)
+            self._strings[field].append(None if _missing(value) else str(value))
+
+        taxid = result.get("TaxID")
+        self._taxids.append(0 if _missing(taxid) else int(taxid))
+        self._taxid_valid.append(0 if _missing(taxid) else 1)
+
+        go_terms = result.get("GO_terms") or {}
+        n_go_terms = len(self._go.values)
+        self._go.append(go_terms)
+        self._go_labels.extend(go_terms[go_id] for go_id in self._go.values[n_go_terms:])
+        self._pdb.append(result.get("PDB") or [])
+
+    def _order(self):
+        # permutation to output order, None if the rows are already in it
+        positions = np.frombuffer(self._positions, dtype=np.int64) if len(self) else np.zeros(0, dtype=np.int64)
+        if np.all(positions[1:] >= positions[:-1]):
+            return None
+        return np.argsort(positions, kind="stable")
+
+    def to_arrow(self):
+        """
+        Returns
+        -------
+        pyarrow.Table
+            Columns UniProtID, Gene, TaxID, Annotation, Sequence (large strings), GO_ids, GO_labels
+            and PDB (lists of dictionary-encoded strings). The builder buffers are wrapped without
+            copying when the rows are in output order. Requires pyarrow.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("ProteinTable.to_arrow requires pyarrow, install it with 'pip install pyarrow'")
+
+        self._frozen = True
+
+        def validity(mask):
+            return pa.py_buffer(np.packbits(np.frombuffer(mask, dtype=np.uint8), bitorder="little"))
+
+        def strings(column):
+            return pa.LargeStringArray.from_buffers(len(self), pa.py_buffer(column.offsets), pa.py_buffer(column.data),
+                                                    validity(column.valid))
+
+        def dictionary_lists(column, values):
+            indices = pa.Array.from_buffers(pa.int32(), len(column.indices), [None, pa.py_buffer(column.indices)])
+            offsets = pa.Array.from_buffers(pa.int64(), len(self) + 1, [None, pa.py_buffer(column.offsets)])
+            items = pa.DictionaryArray.from_arrays(indices, pa.array(values, type=pa.string()))
+            return pa.LargeListArray.from_arrays(offsets, items)
+
+        taxids = pa.Array.from_buffers(pa.int64(), len(self), [validity(self._taxid_valid), pa.py_buffer(self._taxids)])
+        table = pa.table({
+            "UniProtID": strings(self._strings["UniProtID"]),
+            "Gene": strings(self._strings["Gene"]),
+            "TaxID": taxids,
+            "Annotation": strings(self._strings["Annotation"]),
+            "Sequence": strings(self._strings["Sequence"]),
+            "GO_ids": dictionary_lists(self._go, self._go.values),
+            "GO_labels": dictionary_lists(self._go, self._go_labels),
+            "PDB": dictionary_lists(self._pdb, self._pdb.values),
+        })
+        order = self._order()
+        return table if order is None else table.take(pa.array(order))
+
+    def to_pandas(self, set_index=True):
+        """
+        Parameters
+        ----------
+        set_index : bool
+            If True, set UniProtID as the index (the column is kept), like protein_results_to_dataframe.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The columns of ProteinTable.to_arrow. With pyarrow, they are pd.ArrowDtype columns backed
+            by the Arrow buffers; without it, object columns of str, int and list values.
+        """
+        try:
+            df = self.to_arrow().to_pandas(types_mapper=pd.ArrowDtype)
+        except ImportError:
+            self._frozen = True
+            taxids = np.frombuffer(self._taxids, dtype=np.int64) if len(self) else np.zeros(0, dtype=np.int64)
+            df = pd.DataFrame({
+                "UniProtID": self._strings["UniProtID"].to_list(),
+                "Gene": self._strings["Gene"].to_list(),
+                "TaxID": pd.array(taxids, dtype="Int64"),
+                "Annotation": self._strings["Annotation"].to_list(),
+                "Sequence": self._strings["Sequence"].to_list(),
+                "GO_ids": self._go.to_list(),
+                "GO_labels": self._go.to_list(self._go_labels),
+                "PDB": self._pdb.to_list(),
+            })
+            df.loc[~np.frombuffer(self._taxid_valid, dtype=bool) if len(self) else [], "TaxID"] = pd.NA
+            order = self._order()
+            if order is not None:
+                df = df.iloc[order].reset_index(drop=True)
+        if set_index:
+            df = df.set_index("UniProtID", drop=False)
+        return df
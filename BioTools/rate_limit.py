@@ -0,0 +1,331 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+THROTTLE_STATUSES = {429, 503}
+
+
+def backoff_delay(attempt, base_delay=0.5, max_delay=60.0):
+    """
+    Exponential backoff with jitter.
+
+    Parameters
+    ----------
+    attempt : int
+        Number of the failed attempt, starting from 0.
+    base_delay : float
+        Delay after the first failed attempt.
+    max_delay : float
+        Upper bound of the delay before jitter.
+
+    Returns
+    -------
+    float
+        A delay drawn uniformly from [d / 2, d], where d = min(max_delay, base_delay * 2 ** attempt).
+    """
+    delay = min(max_delay, base_delay * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header given either in seconds or as an HTTP date.
+
+    Returns
+    -------
+    float or None
+        Number of seconds to wait, or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket capping the request rate.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second, i.e. the sustained request rate.
+    burst : int or None
+        Bucket capacity, i.e. the number of requests that may be sent at once. Defaults to max(1, rate).
+    """
+
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.capacity = max(1.0, float(burst if burst is not None else rate))
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit adjusted with AIMD (additive increase, multiplicative decrease).
+
+    The limit grows by one after a full window of successful responses (as many successes as the
+    current limit) and is halved when the service signals throttling. Only one decrease happens per
+    window: throttled responses to requests started before the last decrease are ignored.
+
+    Parameters
+    ----------
+    max_limit : int
+        Upper bound of the limit, also its initial value.
+    min_limit : int
+        Lower bound of the limit.
+    """
+
+    def __init__(self, max_limit, min_limit=1):
+        if max_limit < 1 or min_limit < 1:
+            raise ValueError("max_limit and min_limit must be at least 1")
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.epoch = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            return self.epoch
+
+    async def release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        self._successes += 1
+        if self._successes >= self.limit:
+            self._successes = 0
+            self.limit = min(float(self.max_limit), self.limit + 1)
+
+    def on_throttle(self, epoch):
+        if epoch != self.epoch:
+            return
+        self.epoch += 1
+        self._successes = 0
+        self.limit = max(float(self.min_limit), self.limit / 2)
+
+
+class HostLimiter:
+    """
+    Limits requests to one service: token-bucket rate cap, adaptive concurrency and Retry-After pauses.
+
+    Parameters
+    ----------
+    max_concurrent : int
+        Upper bound of concurrent requests.
+    rate : float or None
+        Maximum sustained requests per second. None means no rate cap.
+    burst : int or None
+        Token bucket capacity. Defaults to max(1, rate).
+    """
+
+    def __init__(self, max_concurrent=10, rate=None, burst=None):
+        self.concurrency = AdaptiveConcurrency(max_concurrent)
+        self.bucket = TokenBucket(rate, burst) if rate is not None else None
+        self.blocked_until = 0.0
+        self.successes = 0
+        self.throttled = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Waits for a free request slot and yields the concurrency epoch the request started in."""
+        while self.blocked_until > time.monotonic():
+            await asyncio.sleep(self.blocked_until - time.monotonic())
+        if self.bucket is not None:
+            await self.bucket.acquire()
+        epoch = await self.concurrency.acquire()
+        try:
+            yield epoch
+        finally:
+            await self.concurrency.release()
+
+    def record_success(self):
+        self.successes += 1
+        self.concurrency.on_success()
+
+    def record_throttle(self, epoch, retry_after=None):
+        self.throttled += 1
+        self.concurrency.on_throttle(epoch)
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+
+class RateLimiter:
+    """
+    Registry of HostLimiter objects, one per service.
+
+    A service is identified by the host and the first path segment of the URL, so that APIs served
+    from one host (e.g. the EBI proteins and PDBe APIs on www.ebi.ac.uk) are limited independently.
+
+    Parameters
+    ----------
+    max_concurrent : int
+        Default upper bound of concurrent requests per service.
+    rate : float or None
+        Default maximum requests per second per service. None means no rate cap.
+    burst : int or None
+        Default token bucket capacity.
+
+    Examples
+    --------
+    >>> limiter = RateLimiter(max_concurrent=20)
+    >>> limiter.configure("https://mygene.info/v3/query", rate=10)
+    >>> uniprot_ids, error_genes = await gene2uniprotid(genes, limiter=limiter)
+    """
+
+    def __init__(self, max_concurrent=10, rate=None, burst=None):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self.rate = rate
+        self.burst = burst
+        self._hosts = {}
+
+    @staticmethod
+    def service_key(url):
+        parts = urlsplit(url)
+        first_segment = parts.path.strip("/").split("/", 1)[0]
+        return f"{parts.netloc}/{first_segment}"
+
+    def configure(self, url, max_concurrent=None, rate=None, burst=None):
+        """
+        Sets the limits of the service that serves url, replacing its current limiter.
+
+        Returns
+        -------
+        HostLimiter
+        """
+        host = HostLimiter(
+            max_concurrent=max_concurrent if max_concurrent is not None else self.max_concurrent,
+            rate=rate if rate is not None else self.rate,
+            burst=burst if burst is not None else self.burst,
+        )
+        self._hosts[self.service_key(url)] = host
+        return host
+
+    def for_url(self, url):
+        host = self._hosts.get(self.service_key(url))
+        if host is None:
+            host = self.configure(url)
+        return host
+
+    def stats(self):
+        """
+        Returns
+        -------
+        dict
+            {service: {"limit", "in_flight", "successes", "throttled"}} for every service used so far.
+        """
+        return {
+            key: {
+                "limit": int(host.concurrency.limit),
+                "in_flight": host.concurrency.in_flight,
+                "successes": host.successes,
+                "throttled": host.throttled,
+            }
+            for key, host in self._hosts.items()
+        }
+
+
+async def fetch_json(
+    session,
+    method,
+    url,
+    limiter: Optional[RateLimiter] = None,
+    retries=2,
+    retry_delay=0.5,
+    max_retry_delay=60.0,
+    accept_statuses=(200,),
+    **request_kwargs,
+):
+    """
+    Sends a request through the limiter of its service and decodes the JSON answer, retrying failures.
+
+    Failed attempts (network errors, timeouts, statuses not in accept_statuses) are retried after
+    an exponential backoff with jitter. A 429/503 answer halves the concurrency of the service and,
+    if it carries Retry-After, pauses every request to the service for that long.
+
+    Parameters
+    ----------
+    session : aiohttp.ClientSession
+        Session used for the request.
+    method : str
+        "GET" or "POST".
+    url : str
+        Request URL.
+    limiter : RateLimiter or None
+        Limiter shared by concurrent requests. If None, requests are not limited.
+    retries : int
+        Number of retries after the first attempt.
+    retry_delay : float
+        Base backoff delay in seconds.
+    max_retry_delay : float
+        Upper bound of the backoff delay in seconds (Retry-After may ask for longer).
+    accept_statuses : tuple
+        Statuses accepted as a final answer. The body is decoded only for 200.
+    **request_kwargs
+        Passed to the session request (params, data, headers, ...).
+
+    Returns
+    -------
+    tuple
+        (status, payload) for an accepted answer, payload being None unless status is 200,
+        or (None, None) if all attempts failed.
+    """
+    host = limiter.for_url(url) if limiter is not None else HostLimiter(max_concurrent=1)
+    send = getattr(session, method.lower())
+
+    for attempt in range(retries + 1):
+        delay = backoff_delay(attempt, retry_delay, max_retry_delay)
+        try:
+            async with host.slot() as epoch:
+                async with send(url, **request_kwargs) as response:
+                    if response.status in accept_statuses:
+                        payload = await response.json() if response.status == 200 else None
+                        host.record_success()
+                        return response.status, payload
+                    if response.status in THROTTLE_STATUSES:
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        host.record_throttle(epoch, retry_after)
+                        if retry_after is not None:
+                            delay = max(delay, retry_after)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        if attempt < retries:
+            await asyncio.sleep(delay)
+
+    return None, None
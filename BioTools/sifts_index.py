@@ -0,0 +1,123 @@
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+_ARRAYS = ('accessions', 'indptr', 'pdb_codes', 'structures')
+
+
+class SiftsIndex:
+    """
+    UniProt accession -> PDB IDs index built from the SIFTS pdb_chain_uniprot mapping, stored in CSR form.
+
+    accessions holds the sorted UniProt accessions; the PDB entries of accession i are
+    pdb_codes[structures[indptr[i]:indptr[i + 1]]], sorted and without duplicates (a PDB entry
+    mapped through several chains is listed once). PDB IDs are dictionary-encoded in pdb_codes.
+
+    Parameters
+    ----------
+    accessions : np.ndarray
+        Sorted UniProt accessions.
+    indptr : np.ndarray
+        Offsets of the PDB lists, len(accessions) + 1 values.
+    pdb_codes : np.ndarray
+        Sorted distinct PDB IDs.
+    structures : np.ndarray
+        Positions in pdb_codes of the PDB entries of every accession.
+
+    Examples
+    --------
+    >>> sifts = SiftsIndex.from_tsv("pdb_chain_uniprot.tsv.gz")
+    >>> sifts.save("sifts_index")
+    >>> results, error_ids = await get_proteins_info(uniprot_ids, pdb_index=SiftsIndex.load("sifts_index"))
+    """
+
+    def __init__(self, accessions, indptr, pdb_codes, structures):
+        self.accessions = accessions
+        self.indptr = indptr
+        self.pdb_codes = pdb_codes
+        self.structures = structures
+
+    def __len__(self):
+        return len(self.accessions)
+
+    def __repr__(self):
+        return f"SiftsIndex({len(self)} accessions, {len(self.pdb_codes)} PDB entries)"
+
+    @classmethod
+    def from_tsv(cls, path):
+        """
+        Builds the index from a SIFTS pdb_chain_uniprot.tsv(.gz) file.
+
+        Parameters
+        ----------
+        path : str
+            Plain or compressed pdb_chain_uniprot.tsv, with its '#' release line and a header
+            with the PDB and SP_PRIMARY columns. Only these two columns are read.
+
+        Returns
+        -------
+        SiftsIndex
+        """
+        mapping = pd.read_csv(path, sep='\t', comment='#', usecols=['PDB', 'SP_PRIMARY'], dtype=str,
+                              quoting=csv.QUOTE_NONE, na_filter=False, compression='infer')
+        mapping = mapping[(mapping['PDB'] != '') & (mapping['SP_PRIMARY'] != '')]
+        accession_codes, accessions = pd.factorize(mapping['SP_PRIMARY'].to_numpy(), sort=True)
+        structure_codes, pdb_codes = pd.factorize(mapping['PDB'].str.lower().to_numpy(), sort=True)
+
+        # one sorted, duplicate-free key per (accession, PDB entry)
+        keys = np.unique(accession_codes.astype(np.int64) * len(pdb_codes) + structure_codes)
+        indptr = np.zeros(len(accessions) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // len(pdb_codes), minlength=len(accessions)), out=indptr[1:])
+        index_dtype = np.int32 if len(pdb_codes) < np.iinfo(np.int32).max else np.int64
+        return cls(np.asarray(accessions, dtype=str), indptr, np.asarray(pdb_codes, dtype=str),
+                   (keys % max(len(pdb_codes), 1)).astype(index_dtype))
+
+    def pdb_ids(self, uniprot_id):
+        """Sorted PDB IDs mapped to uniprot_id, an empty list if it has none."""
+        return self.lookup([uniprot_id]).get(uniprot_id, [])
+
+    def lookup(self, uniprot_ids):
+        """
+        Returns
+        -------
+        dict
+            {uniprot_id: sorted PDB IDs} for the IDs with at least one PDB entry.
+        """
+        uniprot_ids = list(dict.fromkeys(uniprot_ids))
+        if not uniprot_ids or not len(self.accessions):
+            return {}
+        queries = np.asarray(uniprot_ids, dtype=str)
+        positions = np.minimum(np.searchsorted(self.accessions, queries), len(self.accessions) - 1)
+        found = self.accessions[positions] == queries
+        return {
+            uid: self.pdb_codes[self.structures[self.indptr[i]:self.indptr[i + 1]]].tolist()
+            for uid, i, hit in zip(uniprot_ids, positions.tolist(), found.tolist()) if hit
+        }
+
+    def save(self, path):
+        """
+        Saves the index into directory path as .npy files, see SiftsIndex.load.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), np.asarray(getattr(self, name)))
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """
+        Opens an index saved with SiftsIndex.save.
+
+        Parameters
+        ----------
+        path : str
+            Directory of the index.
+        mmap_mode : str or None
+            Passed to np.load. With the default 'r' the arrays are memory-mapped read-only.
+
+        Returns
+        -------
+        SiftsIndex
+        """
+        return cls(**{name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in _ARRAYS})
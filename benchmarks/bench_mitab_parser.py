@@ -0,0 +1,113 @@
+"""
+Benchmark of MITAB_parser.get_UID_Gene_from_mitab against the previous Series.apply implementation.
+
+Usage:
+    python benchmarks/bench_mitab_parser.py [n_rows] [path/to/mitab.txt]
+
+Without a path a synthetic IntAct-like table with n_rows rows (default 200000) is used.
+"""
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from BioTools import MITAB_parser  # noqa: E402
+
+TARGET_COLUMNS = ['#ID(s) interactor A', 'ID(s) interactor B', 'Alias(es) interactor A', 'Alias(es) interactor B']
+
+
+def legacy_get_UID_Gene_from_mitab(df):
+    db_pattern = re.compile(r'(uniprotkb|psi-mi|entrez gene/locuslink):([^|]+)')
+    uniprot_pattern = re.compile(r'^[A-Z][A-Z0-9]{5,9}$')
+    gene_pattern = re.compile(r'^[A-Za-z][A-Za-z0-9\-]*$')
+    gene_db_priority = ['uniprotkb', 'psi-mi', 'entrez gene/locuslink']
+
+    def find_uniprot(s):
+        for db, value in db_pattern.findall(str(s)):
+            if db == 'uniprotkb' and uniprot_pattern.match(value):
+                return value
+        return None
+
+    def find_gene(s):
+        entries = db_pattern.findall(str(s))
+        for db in gene_db_priority:
+            for entry_db, value in entries:
+                if entry_db == db and gene_pattern.match(value):
+                    return value
+        return None
+
+    df = df.loc[:, TARGET_COLUMNS].rename(columns=dict(zip(TARGET_COLUMNS, ['ID_A', 'ID_B', 'Alias_A', 'Alias_B'])))
+    return pd.DataFrame({
+        'UniProtID_A': df['ID_A'].apply(find_uniprot).combine_first(df['Alias_A'].apply(find_uniprot)),
+        'UniProtID_B': df['ID_B'].apply(find_uniprot).combine_first(df['Alias_B'].apply(find_uniprot)),
+        'Gene_A': df['ID_A'].apply(find_gene).combine_first(df['Alias_A'].apply(find_gene)),
+        'Gene_B': df['ID_B'].apply(find_gene).combine_first(df['Alias_B'].apply(find_gene)),
+    })
+
+
+def make_mitab(n_rows, seed=0):
+    rnd = random.Random(seed)
+    n_proteins = max(1, n_rows // 50)
+    accessions = [f"{rnd.choice('OPQ')}{rnd.randint(10000, 99999)}" for _ in range(n_proteins)]
+    genes = [f"GENE{i}" for i in range(n_proteins)]
+
+    def identifier(i):
+        kind = rnd.random()
+        if kind < 0.85:
+            return f"uniprotkb:{accessions[i]}"
+        if kind < 0.95:
+            return f"intact:EBI-{rnd.randint(1, 10 ** 7)}"
+        return f"chebi:\"CHEBI:{rnd.randint(1, 10 ** 5)}\""
+
+    def alias(i):
+        if rnd.random() < 0.05:
+            return "-"
+        parts = [f"psi-mi:{genes[i].lower()}_human(display_long)", f"uniprotkb:{genes[i]}(gene name)",
+                 f"psi-mi:{genes[i]}(display_short)"]
+        if rnd.random() < 0.3:
+            parts.append(f"uniprotkb:{genes[i]}")
+        if rnd.random() < 0.1:
+            parts.append(f"entrez gene/locuslink:{genes[i]}")
+        return "|".join(parts)
+
+    rows = []
+    for _ in range(n_rows):
+        a, b = rnd.randrange(n_proteins), rnd.randrange(n_proteins)
+        rows.append((identifier(a), identifier(b), alias(a), alias(b)))
+    return pd.DataFrame(rows, columns=TARGET_COLUMNS)
+
+
+def timed(func, *args, repeat=3):
+    """Returns the result and the best wall time of repeat calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    if len(sys.argv) > 2:
+        df = pd.read_csv(sys.argv[2], sep='\t', usecols=TARGET_COLUMNS, nrows=n_rows)
+    else:
+        df = make_mitab(n_rows)
+
+    expected, legacy_time = timed(legacy_get_UID_Gene_from_mitab, df)
+    result, new_time = timed(lambda: MITAB_parser(df).get_UID_Gene_from_mitab())
+    pd.testing.assert_frame_equal(result, expected)
+
+    print(f"rows: {len(df)}")
+    print(f"Series.apply:  {legacy_time:.2f} s")
+    print(f"column scan:   {new_time:.2f} s")
+    print(f"speedup:       {legacy_time / new_time:.1f}x (identical output)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Fakes and assertions shared by the unit tests."""
+import pandas as pd
+
+
+class FakeResponse:
+    """aiohttp response stand-in with a status, a JSON payload and headers."""
+
+    def __init__(self, status, payload=None, headers=None):
+        self.status = status
+        self._payload = payload
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Answers requests from a {url: (status, payload)} map and records the calls."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def _respond(self, method, url, params=None, data=None):
+        self.calls.append((method, url, params, data))
+        return FakeResponse(*self.routes.get(url, (404, {})))
+
+    def get(self, url, params=None, headers=None):
+        return self._respond("GET", url, params=params)
+
+    def post(self, url, data=None, headers=None):
+        return self._respond("POST", url, data=data)
+
+
+def values(series):
+    # missing values are None or NaN depending on the pandas version
+    return [None if pd.isna(value) else value for value in series]
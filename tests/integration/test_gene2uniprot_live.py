@@ -32,7 +32,7 @@ def _run_live_gene2uniprot(genes, taxid=9606):
             gene2uniprotid(
                 genes,
                 taxid=taxid,
-                max_cycle=3,
+                max_attempts=3,
                 retry_delay=0.5,
             )
         )
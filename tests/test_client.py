@@ -0,0 +1,52 @@
+import asyncio
+import unittest
+
+from BioTools.client import BioToolsClient
+from BioTools.gene_cache import GeneCache
+
+
+class TestBioToolsClient(unittest.TestCase):
+    def test_sessions_are_opened_once_and_closed_on_exit(self):
+        async def _run():
+            async with BioToolsClient(max_concurrent=4) as client:
+                sessions = list(client._sessions.values())
+                first = client._session("https://mygene.info/v3/query")
+                second = client._session("https://mygene.info/v3/query?q=TP53")
+            return sessions, first, second
+
+        sessions, first, second = asyncio.run(_run())
+
+        self.assertEqual(len(sessions), 3)
+        self.assertIs(first, second)
+        self.assertTrue(all(session.closed for session in sessions))
+
+    def test_gene2uniprotid_uses_client_cache(self):
+        cache = GeneCache(":memory:")
+        cache.set_many({"TP53": "P04637"}, taxid=9606)
+
+        async def _run():
+            async with BioToolsClient(cache=cache) as client:
+                return await client.gene2uniprotid(["TP53"])
+
+        self.assertEqual(asyncio.run(_run()), ({"TP53": "P04637"}, []))
+        cache.close()
+
+    def test_rejects_options_fixed_by_the_client(self):
+        async def _run(call):
+            async with BioToolsClient() as client:
+                return await call(client)
+
+        with self.assertRaises(TypeError):
+            asyncio.run(_run(lambda client: client.gene2uniprotid(["TP53"], request_timeout=5)))
+        with self.assertRaises(TypeError):
+            asyncio.run(_run(lambda client: client.get_proteins_info(["P04637"], pdb_session=None)))
+        with self.assertRaises(TypeError):
+            asyncio.run(_run(lambda client: client.iter_proteins_info(["P04637"], request_timeout=5).__anext__()))
+
+    def test_requires_open_client(self):
+        with self.assertRaises(RuntimeError):
+            asyncio.run(BioToolsClient().gene2uniprotid(["TP53"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
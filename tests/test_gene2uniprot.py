@@ -1,6 +1,42 @@
+import asyncio
+import contextlib
+import io
 import unittest
+from unittest import mock
 
-from BioTools.gene2uniprot import _find_UID
+from BioTools.gene2uniprot import _find_UID, _schedule_queries, _split_batch_hits, gene2uniprotid
+from helpers import FakeResponse
+
+
+class _MyGeneSession:
+    """Fails the first `failures[gene]` requests containing a gene, then answers from `uids`."""
+
+    def __init__(self, uids, failures):
+        self.uids = uids
+        self.failures = dict(failures)
+        self.requests = []
+
+    def _answer(self, genes):
+        self.requests.append(genes)
+        if any(self.failures.get(gene, 0) > 0 for gene in genes):
+            for gene in genes:
+                self.failures[gene] = self.failures.get(gene, 0) - 1
+            return FakeResponse(500)
+        return FakeResponse(200, [
+            {"query": gene, "uniprot": {"Swiss-Prot": self.uids[gene]}} if self.uids.get(gene)
+            else {"query": gene, "notfound": True}
+            for gene in genes
+        ])
+
+    def post(self, url, data=None, **kwargs):
+        return self._answer(data["q"].split(","))
+
+    def get(self, url, **kwargs):
+        gene = url.split("q=", 1)[1].split("&", 1)[0]
+        response = self._answer([gene])
+        if response.status == 200:
+            response._payload = {"hits": response._payload if self.uids.get(gene) else []}
+        return response
 
 
 class TestFindUID(unittest.TestCase):
@@ -17,5 +53,86 @@ class TestFindUID(unittest.TestCase):
         self.assertIsNone(_find_UID(payload))
 
 
+class TestSplitBatchHits(unittest.TestCase):
+    def test_splits_hits_per_query_with_swiss_prot_preference(self):
+        payload = [
+            {"query": "TP53", "uniprot": {"Swiss-Prot": "P04637", "TrEMBL": ["A0A024RBG1"]}},
+            {"query": "TP53", "uniprot": {"TrEMBL": "Q53GA5"}},
+            {"query": "EGFR", "uniprot": {"TrEMBL": ["A0A0B4J1Y8", "Q504U8"]}},
+            {"query": "KEK", "notfound": True},
+        ]
+        result = _split_batch_hits(["TP53", "EGFR", "KEK"], payload)
+        self.assertEqual(result, [["TP53", "P04637"], ["EGFR", "A0A0B4J1Y8"], ["KEK", None]])
+
+    def test_returns_none_for_unexpected_payload(self):
+        self.assertEqual(_split_batch_hits(["TP53"], {"error": "bad request"}), [["TP53", None]])
+
+    def test_gene2uniprotid_validates_batch_size(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(gene2uniprotid(["TP53"], batch_size=1001))
+
+
+class TestScheduleQueries(unittest.TestCase):
+    def _run(self, session, genes, **kwargs):
+        kwargs.setdefault("per_request_retries", 0)
+        kwargs.setdefault("retry_delay", 0.001)
+        return asyncio.run(_schedule_queries(genes, 9606, session, **kwargs))
+
+    def test_failed_genes_are_retried_individually(self):
+        session = _MyGeneSession({"TP53": "P04637", "EGFR": "P00533"}, {"TP53": 2})
+
+        results = self._run(session, ["TP53", "EGFR"], batch_size=None, max_attempts=5)
+
+        self.assertEqual(results, [["TP53", "P04637", True], ["EGFR", "P00533", True]])
+        self.assertEqual(session.requests.count(["TP53"]), 3)
+        self.assertEqual(session.requests.count(["EGFR"]), 1)
+
+    def test_attempt_budget_is_per_gene(self):
+        session = _MyGeneSession({"TP53": "P04637"}, {"TP53": 10})
+
+        results = self._run(session, ["TP53", "KEK"], batch_size=None, max_attempts=3)
+
+        self.assertEqual(results, [["TP53", None, False], ["KEK", None, True]])
+        self.assertEqual(session.requests.count(["TP53"]), 3)
+        self.assertEqual(session.requests.count(["KEK"]), 1)
+
+    def test_failed_batch_is_requeued(self):
+        session = _MyGeneSession({"TP53": "P04637", "EGFR": "P00533"}, {"TP53": 1})
+
+        results = self._run(session, ["TP53", "EGFR", "KEK"], batch_size=2, max_attempts=2)
+
+        self.assertEqual(
+            results,
+            [["TP53", "P04637", True], ["EGFR", "P00533", True], ["KEK", None, True]],
+        )
+        self.assertEqual(session.requests.count(["TP53", "EGFR"]), 2)
+        self.assertEqual(session.requests.count(["KEK"]), 1)
+
+    def test_backoff_follows_the_attempts_of_the_genes(self):
+        session = _MyGeneSession({"TP53": "P04637", "EGFR": "P00533"}, {"TP53": 2})
+
+        with mock.patch("BioTools.gene2uniprot.backoff_delay", return_value=0.0) as backoff:
+            results = self._run(session, ["TP53", "EGFR"], batch_size=2, max_attempts=5)
+
+        self.assertEqual(results, [["TP53", "P04637", True], ["EGFR", "P00533", True]])
+        # genes of one round share a delay drawn from their own attempt count
+        self.assertEqual([call.args[0] for call in backoff.call_args_list], [0, 1])
+        self.assertEqual(session.requests.count(["TP53", "EGFR"]), 3)
+
+    def test_max_cycle_is_a_deprecated_alias(self):
+        with self.assertWarns(DeprecationWarning):
+            with self.assertRaises(ValueError):
+                asyncio.run(gene2uniprotid(["TP53"], max_cycle=0))
+
+    def test_verbose_false_prints_nothing(self):
+        session = _MyGeneSession({"TP53": "P04637"}, {})
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = asyncio.run(gene2uniprotid(["TP53"], session=session, verbose=False))
+
+        self.assertEqual(result, ({"TP53": "P04637"}, []))
+        self.assertEqual(output.getvalue(), "")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,65 @@
+import asyncio
+import time
+import unittest
+
+from BioTools.gene2uniprot import gene2uniprotid
+from BioTools.gene_cache import GeneCache
+
+
+class TestGeneCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = GeneCache(":memory:", ttl=3600)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_stores_positive_and_negative_results(self):
+        self.cache.set_many({"TP53": "P04637", "KEK": None}, taxid=9606)
+
+        cached, misses = self.cache.get_many(["TP53", "KEK", "EGFR"], taxid=9606)
+
+        self.assertEqual(cached, {"TP53": "P04637", "KEK": None})
+        self.assertEqual(misses, ["EGFR"])
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["negative_hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries_by_taxid"], {"9606": 2})
+
+    def test_keys_include_taxid(self):
+        self.cache.set_many({"TP53": "P04637"}, taxid=9606)
+        cached, misses = self.cache.get_many(["TP53"], taxid=10090)
+        self.assertEqual(cached, {})
+        self.assertEqual(misses, ["TP53"])
+
+    def test_expired_entries_are_misses(self):
+        cache = GeneCache(":memory:", ttl=3600, negative_ttl=60)
+        cache.set_many({"TP53": "P04637", "KEK": None}, taxid=9606)
+        cache._conn.execute("UPDATE gene2uniprot SET updated = ?", (time.time() - 600,))
+
+        cached, misses = cache.get_many(["TP53", "KEK"], taxid=9606)
+
+        self.assertEqual(cached, {"TP53": "P04637"})
+        self.assertEqual(misses, ["KEK"])
+        self.assertEqual(cache.stats()["expired"], 1)
+        cache.close()
+
+    def test_invalidate_by_taxid(self):
+        self.cache.set_many({"TP53": "P04637"}, taxid=9606)
+        self.cache.set_many({"Trp53": "P02340"}, taxid=10090)
+
+        self.assertEqual(self.cache.invalidate(taxid=9606), 1)
+        self.assertEqual(self.cache.stats()["entries_by_taxid"], {"10090": 1})
+        self.assertEqual(self.cache.invalidate(), 1)
+
+    def test_gene2uniprotid_answers_from_cache_without_network(self):
+        self.cache.set_many({"TP53": "P04637", "KEK": None}, taxid=9606)
+
+        found, errors = asyncio.run(gene2uniprotid(["TP53", "KEK", "TP53"], retry_delay=0, cache=self.cache))
+
+        self.assertEqual(found, {"TP53": "P04637"})
+        self.assertEqual(errors, ["KEK"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import contextlib
+import gzip
+import io
+import os
+import tempfile
+import unittest
+
+from BioTools.gene2uniprot import gene2uniprotid
+from BioTools.gene_index import GeneIndex
+
+# A0A024R161 is a TrEMBL entry (entry name = accession), listed before the Swiss-Prot entry of TP53;
+# P04637-2 is an isoform line without a gene name, Q00000 has no taxid
+IDMAPPING = """\
+A0A024R161\tUniProtKB-ID\tA0A024R161_HUMAN
+A0A024R161\tGene_Name\tTP53
+A0A024R161\tNCBI_TaxID\t9606
+P04637\tUniProtKB-ID\tP53_HUMAN
+P04637\tGene_Name\tTP53
+P04637\tGeneID\t7157
+P04637\tNCBI_TaxID\t9606
+P04637-2\tRefSeq\tNP_001119584.1
+P02340\tUniProtKB-ID\tP53_MOUSE
+P02340\tGene_Name\tTrp53
+P02340\tNCBI_TaxID\t10090
+A0A0B4J2F0\tUniProtKB-ID\tA0A0B4J2F0_HUMAN
+A0A0B4J2F0\tGene_Name\tPIGBOS1
+A0A0B4J2F0\tNCBI_TaxID\t9606
+A0A0B4J2F1\tUniProtKB-ID\tA0A0B4J2F1_HUMAN
+A0A0B4J2F1\tGene_Name\tPIGBOS1
+A0A0B4J2F1\tNCBI_TaxID\t9606
+Q00000\tGene_Name\tORPHAN
+"""
+
+
+class TestGeneIndex(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, "HUMAN_9606_idmapping.dat.gz")
+        with gzip.open(self.path, "wt") as f:
+            f.write(IDMAPPING)
+        self.db_path = os.path.join(tmpdir.name, "gene_index.sqlite")
+        self.index = GeneIndex(self.db_path)
+        self.addCleanup(self.index.close)
+
+    def test_prefers_swiss_prot_then_first_entry(self):
+        # chunks of 2 lines split accessions between chunks
+        self.assertEqual(self.index.ingest(self.path, chunksize=2), 3)
+
+        self.assertEqual(self.index.lookup(["TP53", "tp53", "PIGBOS1", "ORPHAN", "EGFR"], 9606),
+                         {"TP53": "P04637", "tp53": "P04637", "PIGBOS1": "A0A0B4J2F0"})
+        self.assertEqual(self.index.lookup(["Trp53"], "10090"), {"Trp53": "P02340"})
+        self.assertEqual(self.index.stats(),
+                         {"entries": 3, "reviewed": 2, "entries_by_taxid": {9606: 2, 10090: 1}})
+
+    def test_ingest_keeps_reviewed_entries_of_earlier_files(self):
+        self.index.ingest(self.path)
+        self.index.ingest(self.path)
+
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.lookup(["TP53"], 9606), {"TP53": "P04637"})
+
+    def test_taxid_filter(self):
+        self.index.ingest(self.path, taxids=[10090])
+
+        self.assertEqual(self.index.stats()["entries_by_taxid"], {10090: 1})
+
+    def test_gene2uniprotid_local_backend(self):
+        self.index.ingest(self.path)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            found, errors = asyncio.run(gene2uniprotid(["TP53", "EGFR", "TP53"], backend="local", gene_index=self.index))
+            by_path = asyncio.run(gene2uniprotid(["TP53"], backend="local", gene_index=self.db_path))
+
+        self.assertEqual(found, {"TP53": "P04637"})
+        self.assertEqual(errors, ["EGFR"])
+        self.assertEqual(by_path[0], {"TP53": "P04637"})
+
+    def test_gene2uniprotid_validates_backend(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(gene2uniprotid(["TP53"], backend="uniprot"))
+        with self.assertRaises(ValueError):
+            asyncio.run(gene2uniprotid(["TP53"], backend="local"))
+        with self.assertRaises(FileNotFoundError):
+            asyncio.run(gene2uniprotid(["TP53"], backend="local", gene_index="missing.sqlite"))
+
+
+if __name__ == "__main__":
+    unittest.main()
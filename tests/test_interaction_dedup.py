@@ -0,0 +1,64 @@
+import unittest
+
+import pandas as pd
+
+from BioTools.interaction_dedup import canonical_pair_keys, deduplicate_interactions
+from BioTools.MITAB_parser import _to_compact_dtypes
+from helpers import values
+
+
+def _interactions():
+    # rows 11 and 12 repeat row 10, row 13 has a missing ID, row 14 is a self-loop without a source
+    return pd.DataFrame({
+        'UniProtID_A': ['P1', 'P2', 'P1', None, 'P3', 'P3'],
+        'UniProtID_B': ['P2', 'P1', 'P2', 'P1', 'P3', 'P1'],
+        'Gene_A': ['G1', 'G2', 'G1', None, 'G3', 'G3'],
+        'Gene_B': ['G2', 'G1', 'G2', 'G1', 'G3', 'G1'],
+        'Source_database': ['intact', 'biogrid', 'intact', 'mint', None, 'mint'],
+    }, index=[10, 11, 12, 13, 14, 15])
+
+
+class TestDeduplicateInteractions(unittest.TestCase):
+    def test_canonical_pair_keys(self):
+        keys, swapped = canonical_pair_keys(['P1', 'P2', None, 'P2'], ['P2', 'P1', 'P1', 'P2'])
+
+        self.assertEqual(keys[0], keys[1])
+        self.assertEqual(keys[2], -1)
+        self.assertNotEqual(keys[3], keys[0])
+        self.assertEqual(swapped.tolist(), [False, True, False, False])
+        with self.assertRaises(ValueError):
+            canonical_pair_keys(['P1'], [])
+
+    def test_collapses_unordered_pairs(self):
+        unique = deduplicate_interactions(_interactions())
+
+        self.assertEqual(unique.index.tolist(), [10, 14, 15])
+        self.assertEqual(unique['UniProtID_A'].tolist(), ['P1', 'P3', 'P1'])
+        self.assertEqual(unique['UniProtID_B'].tolist(), ['P2', 'P3', 'P3'])
+        self.assertEqual(unique['Gene_A'].tolist(), ['G1', 'G3', 'G1'])
+        self.assertEqual(unique['Gene_B'].tolist(), ['G2', 'G3', 'G3'])
+        self.assertEqual(unique['n_evidence'].tolist(), [3, 1, 1])
+        self.assertEqual(values(unique['sources']), ['biogrid|intact', None, 'mint'])
+        self.assertEqual(unique['n_sources'].tolist(), [2, 0, 1])
+        self.assertNotIn('Source_database', unique)
+
+    def test_without_source_column(self):
+        unique = deduplicate_interactions(_interactions().drop(columns='Source_database'))
+
+        self.assertEqual(unique['n_evidence'].tolist(), [3, 1, 1])
+        self.assertNotIn('sources', unique)
+
+    def test_keeps_compact_dtypes(self):
+        df = pd.DataFrame({'UniProtID_A': ['P2', 'P1'], 'UniProtID_B': ['P1', 'P2'],
+                           'taxid_A': ['9606', '10090'], 'taxid_B': ['10090', '9606']})
+
+        unique = deduplicate_interactions(_to_compact_dtypes(df))
+
+        self.assertIsInstance(unique['UniProtID_A'].dtype, pd.CategoricalDtype)
+        self.assertEqual(unique['UniProtID_A'].tolist(), ['P1'])
+        self.assertEqual(unique['taxid_A'].tolist(), [10090])
+        self.assertEqual(unique['n_evidence'].tolist(), [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from BioTools.interaction_graph import InteractionGraph
+
+
+def _pairs():
+    # row 2 repeats row 0 in the other direction, row 3 has a missing ID, row 5 is a self-loop
+    return pd.DataFrame({
+        'UniProtID_A': ['P1', 'P2', 'P3', None, 'P3', 'P4'],
+        'UniProtID_B': ['P3', 'P3', 'P1', 'P2', 'P4', 'P4'],
+    }, index=[10, 11, 12, 13, 14, 15])
+
+
+class TestInteractionGraph(unittest.TestCase):
+    def test_undirected_graph(self):
+        graph = InteractionGraph.from_mitab(_pairs())
+
+        self.assertEqual(graph.nodes.tolist(), ['P1', 'P2', 'P3', 'P4'])
+        self.assertEqual(graph.n_edges, 5)
+        self.assertEqual(graph.neighbors('P3').tolist(), ['P1', 'P1', 'P2', 'P4'])
+        self.assertEqual(graph.edge_rows_of('P3').tolist(), [10, 12, 11, 14])
+        self.assertEqual(graph.neighbors('P4').tolist(), ['P3', 'P4'])
+        self.assertEqual(graph.degree().tolist(), [2, 1, 4, 2])
+        self.assertEqual(graph.node_id('P9'), -1)
+        with self.assertRaises(KeyError):
+            graph.neighbors('P9')
+
+    def test_deduplicate_keeps_first_row(self):
+        graph = InteractionGraph.from_mitab(_pairs(), deduplicate=True)
+
+        self.assertEqual(graph.n_edges, 4)
+        self.assertEqual(graph.neighbors('P1').tolist(), ['P3'])
+        self.assertEqual(graph.edge_rows_of('P1').tolist(), [10])
+
+    def test_deduplicate_directed_keeps_both_directions(self):
+        graph = InteractionGraph.from_pairs(['P1', 'P3', 'P1'], ['P3', 'P1', 'P3'], directed=True, deduplicate=True)
+
+        self.assertEqual(graph.n_edges, 2)
+        self.assertEqual(graph.edge_rows_of('P1').tolist(), [0])
+        self.assertEqual(graph.edge_rows_of('P3').tolist(), [1])
+
+    def test_node_lookup(self):
+        graph = InteractionGraph.from_mitab(_pairs())
+
+        self.assertEqual([graph.node_id(uid) for uid in ['P1', 'P4', 'P0', 'P5', 'P11']], [0, 3, -1, -1, -1])
+        self.assertEqual(graph._node_ids_of(['P4', 'P9', 'P2', 'P4']).tolist(), [1, 3])
+        self.assertEqual(InteractionGraph.from_pairs([], []).node_id('P1'), -1)
+
+    def test_directed_graph(self):
+        graph = InteractionGraph.from_mitab(_pairs(), directed=True)
+
+        self.assertEqual(graph.neighbors('P3').tolist(), ['P1', 'P4'])
+        self.assertEqual(graph.neighbors('P2').tolist(), ['P3'])
+        self.assertEqual(graph.degree('P1'), 1)
+
+    def test_induced_subgraph(self):
+        graph = InteractionGraph.from_mitab(_pairs(), deduplicate=True)
+
+        sub = graph.subgraph(['P4', 'P3', 'P9'])
+
+        self.assertEqual(sub.nodes.tolist(), ['P3', 'P4'])
+        self.assertEqual(sub.n_edges, 2)
+        self.assertEqual(sub.neighbors('P3').tolist(), ['P4'])
+        self.assertEqual(sub.neighbors('P4').tolist(), ['P3', 'P4'])
+        self.assertEqual(sub.edge_rows_of('P4').tolist(), [14, 15])
+
+    def test_save_and_load_memory_mapped(self):
+        graph = InteractionGraph.from_mitab(_pairs())
+        with tempfile.TemporaryDirectory() as path:
+            graph.save(path)
+            loaded = InteractionGraph.load(path)
+
+            self.assertIsInstance(loaded.indices, np.memmap)
+            self.assertEqual(loaded.n_edges, graph.n_edges)
+            self.assertFalse(loaded.directed)
+            self.assertEqual(loaded.neighbors('P3').tolist(), graph.neighbors('P3').tolist())
+            self.assertEqual(loaded.edge_rows_of('P3').tolist(), graph.edge_rows_of('P3').tolist())
+            del loaded
+
+    def test_empty_graph(self):
+        graph = InteractionGraph.from_pairs([], [])
+
+        self.assertEqual(len(graph), 0)
+        self.assertEqual(graph.degree().tolist(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+
+import pandas as pd
+
+from BioTools.MITAB_parser import MITAB_parser
+
+try:
+    from BioTools.mitab_cache import MITABCache
+    import pyarrow  # noqa: F401
+except ImportError:
+    pyarrow = None
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestMITABCache(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, 'interactions.txt')
+        pd.DataFrame({
+            '#ID(s) interactor A': ['uniprotkb:P04637', 'intact:EBI-1', 'uniprotkb:P00533'],
+            'ID(s) interactor B': ['uniprotkb:P00533', 'uniprotkb:Q9Y6K9', '-'],
+            'Alias(es) interactor A': ['psi-mi:TP53', 'psi-mi:Tp53', '-'],
+            'Alias(es) interactor B': ['-', '-', 'psi-mi:EGFR'],
+            'Taxid interactor A': ['taxid:9606(human)'] * 3,
+            'Taxid interactor B': ['taxid:10090(mouse)'] * 3,
+        }).to_csv(self.path, sep='\t', index=False)
+        self.cache = MITABCache(os.path.join(tmpdir.name, 'cache'))
+
+    def test_second_parse_reads_the_cache(self):
+        first = MITAB_parser.from_file(self.path, ['protein_id', 'taxid'], chunksize=2, compact=True, cache=self.cache)
+        second = MITAB_parser.from_file(self.path, ['protein_id', 'taxid'], chunksize=2, compact=True, cache=self.cache)
+
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 1, 'entries': 1})
+
+    def test_options_and_file_changes_miss_the_cache(self):
+        MITAB_parser.from_file(self.path, ['protein_id'], cache=self.cache)
+        MITAB_parser.from_file(self.path, ['protein_id'], compact=True, cache=self.cache)
+        MITAB_parser.from_file(self.path, ['taxid'], cache=self.cache)
+        text = MITAB_parser.from_file(self.path, ['taxid'], cache=self.cache, taxid_type='text')
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        MITAB_parser.from_file(self.path, ['taxid'], cache=self.cache)
+
+        self.assertEqual(text['taxid_A'].tolist(), ['human'] * 3)
+        self.assertEqual(self.cache.stats(), {'hits': 0, 'misses': 5, 'entries': 5})
+
+    def test_content_hash_ignores_modification_time(self):
+        cache = MITABCache(self.cache.directory, hash_content=True)
+        key = cache.key(self.path, parsing_data=['taxid'])
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        self.assertEqual(cache.key(self.path, parsing_data=['taxid']), key)
+        self.assertNotEqual(self.cache.key(self.path, parsing_data=['taxid']), key)
+
+    def test_abandoned_iteration_stores_nothing(self):
+        chunks = MITAB_parser.from_file(self.path, ['taxid'], chunksize=1, iterator=True, cache=self.cache)
+        next(chunks)
+        chunks.close()
+
+        self.assertEqual(self.cache.stats()['entries'], 0)
+        self.assertEqual(os.listdir(self.cache.directory), [])
+
+    def test_iterator_yields_cached_chunks(self):
+        list(MITAB_parser.from_file(self.path, ['taxid'], chunksize=2, iterator=True, cache=self.cache))
+        chunks = list(MITAB_parser.from_file(self.path, ['taxid'], chunksize=2, iterator=True, cache=self.cache))
+
+        self.assertEqual([chunk.index.tolist() for chunk in chunks], [[0, 1], [2]])
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_other_chunksize_gets_chunks_of_its_size(self):
+        list(MITAB_parser.from_file(self.path, ['taxid'], chunksize=2, iterator=True, cache=self.cache))
+        chunks = list(MITAB_parser.from_file(self.path, ['taxid'], chunksize=1, iterator=True, cache=self.cache))
+
+        self.assertEqual([chunk.index.tolist() for chunk in chunks], [[0], [1], [2]])
+        self.assertEqual(self.cache.stats(), {'hits': 0, 'misses': 2, 'entries': 2})
+
+    def test_confidence_methods_are_found_once_per_file(self):
+        pd.DataFrame({'Confidence value(s)': ['intact-miscore:0.8', '-', 'mint-score:0.2']}).to_csv(
+            self.path, sep='\t', index=False)
+        find = mock.patch.object(MITAB_parser, '_confidence_methods_in', wraps=MITAB_parser._confidence_methods_in)
+
+        with find as first_pass, warnings.catch_warnings():
+            warnings.simplefilter('error')
+            first = MITAB_parser.from_file(self.path, ['confidence'], chunksize=1, cache=self.cache)
+            second = MITAB_parser.from_file(self.path, ['confidence'], chunksize=2, cache=self.cache)
+
+        self.assertEqual(first_pass.call_count, 1)
+        self.assertEqual(list(second.columns), ['confidence_intact-miscore', 'confidence_mint-score'])
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(self.cache.stats(), {'hits': 0, 'misses': 2, 'entries': 2})
+        self.cache.clear()
+        self.assertEqual(os.listdir(self.cache.directory), [])
+
+    def test_publications_are_not_cached(self):
+        with self.assertRaises(ValueError):
+            MITAB_parser.from_file(self.path, ['publications'], cache=self.cache)
+
+    def test_publication_table_is_cached(self):
+        pd.DataFrame({'Publication Identifier(s)': ['pubmed:1|imex:IM-1', '-', 'pubmed:2']}).to_csv(
+            self.path, sep='\t', index=False)
+        first = MITAB_parser.from_file(self.path, ['publications'], chunksize=2, publications='table', cache=self.cache)
+        second = MITAB_parser.from_file(self.path, ['publications'], chunksize=2, publications='table', cache=self.cache)
+
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(first['row_idx'].tolist(), [0, 0, 2])
+        self.assertEqual(self.cache.hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
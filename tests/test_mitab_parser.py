@@ -1,6 +1,23 @@
+import asyncio
+import gzip
+import os
+import tempfile
 import unittest
 
-from BioTools.MITAB_parser import Check_Value
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    pyarrow = None
+
+from BioTools.MITAB_parser import Check_Value, MITAB_parser, MITABFilter, _to_compact_dtypes, resolve_missing_uniprot_ids
+from helpers import values
+
+
+def _mitab(rows):
+    columns = ['#ID(s) interactor A', 'ID(s) interactor B', 'Alias(es) interactor A', 'Alias(es) interactor B']
+    return pd.DataFrame(rows, columns=columns)
 
 
 class TestCheckValue(unittest.TestCase):
@@ -12,5 +29,313 @@ class TestCheckValue(unittest.TestCase):
             Check_Value("yeast", {"human", "mouse"}, "species")
 
 
+class TestMITABParser(unittest.TestCase):
+    def test_rejects_unknown_parsing_data(self):
+        with self.assertRaises(Exception):
+            MITAB_parser(_mitab([]), parsing_data=['UniProtID'])
+
+    def test_rejects_table_without_required_columns(self):
+        with self.assertRaises(Exception):
+            MITAB_parser(pd.DataFrame({'#ID(s) interactor A': []}), parsing_data=['protein_id'])
+
+    def test_get_UID_Gene_from_mitab(self):
+        df = _mitab([
+            ('uniprotkb:P04637', 'uniprotkb:P00533',
+             'psi-mi:p53_human(display_long)|uniprotkb:TP53(gene name)',
+             'uniprotkb:EGFR(gene name)|psi-mi:EGFR'),
+            ('intact:EBI-123', 'uniprotkb:Q9(isoform)',
+             'psi-mi:Tp53|entrez gene/locuslink:TP53|uniprotkb:Trp53',
+             'psi-mi:uniprotkb:P00533|entrez gene/locuslink:EGFR|uniprotkb:P00533'),
+            ('-', 'psi-mi:uniprotkb:P12345', '-', 'psi-mi:x(y)'),
+        ])
+
+        result = MITAB_parser(df).get_UID_Gene_from_mitab()
+
+        self.assertEqual(values(result['UniProtID_A']), ['P04637', None, None])
+        self.assertEqual(values(result['UniProtID_B']), ['P00533', 'P00533', None])
+        # Gene comes from the ID column first, then from Aliases by DB priority
+        self.assertEqual(values(result['Gene_A']), ['P04637', 'Trp53', None])
+        self.assertEqual(values(result['Gene_B']), ['P00533', 'P00533', None])
+
+    def test_parse_combines_extractors_without_changing_the_table(self):
+        df = _mitab([('uniprotkb:P04637', 'uniprotkb:P00533', '-', '-')])
+        df['Taxid interactor A'] = 'taxid:9606(human)'
+        df['Taxid interactor B'] = 'taxid:10090(mouse)'
+        df['Publication Identifier(s)'] = 'pubmed:123|imex:IM-1'
+        source = df.copy()
+        parser = MITAB_parser(df, parsing_data=['protein_id', 'taxid', 'publications'])
+
+        result = parser.parse()
+
+        self.assertEqual(list(result.columns), ['UniProtID_A', 'UniProtID_B', 'Gene_A', 'Gene_B',
+                                                'taxid_A', 'taxid_B', 'Publications'])
+        self.assertEqual(result.loc[0, 'taxid_B'], '10090')
+        self.assertEqual(result.loc[0, 'Publications'], {'pubmed': ['123'], 'imex': ['IM-1']})
+        self.assertIs(parser.df, df)
+        pd.testing.assert_frame_equal(df, source)
+        # the parser can be used again
+        pd.testing.assert_frame_equal(parser.parse(), result)
+
+    def test_publication_table(self):
+        df = pd.DataFrame({'Publication Identifier(s)': ['pubmed:123|imex:IM-1-2:3', '-', ' pubmed : 456 |doi:10.1/x']},
+                          index=[5, 6, 7])
+
+        table = MITAB_parser(df, parsing_data=['publications']).get_publication_table_from_mitab()
+
+        self.assertEqual(table['row_idx'].tolist(), [5, 5, 7, 7])
+        self.assertEqual(table['db'].tolist(), ['pubmed', 'imex', 'pubmed', 'doi'])
+        self.assertEqual(table['id'].tolist(), ['123', 'IM-1-2:3', '456', '10.1/x'])
+        self.assertIsInstance(table['db'].dtype, pd.CategoricalDtype)
+        by_id = table.set_index(['db', 'id']).sort_index()
+        self.assertEqual(by_id.loc[[('pubmed', '456')], 'row_idx'].tolist(), [7])
+        pd.testing.assert_frame_equal(MITAB_parser(df, parsing_data=['publications']).parse(publications='table'), table)
+
+    def test_parse_compact_dtypes(self):
+        df = _mitab([('uniprotkb:P04637', 'uniprotkb:P00533', '-', '-'),
+                     ('uniprotkb:P00533', '-', '-', 'psi-mi:EGFR')])
+        df['Taxid interactor A'] = ['taxid:9606(human)', 'taxid:10090(mouse)']
+        df['Taxid interactor B'] = ['taxid:9606(human)', '-']
+
+        result = MITAB_parser(df, parsing_data=['protein_id', 'taxid']).parse(compact=True)
+
+        self.assertIsInstance(result['UniProtID_A'].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(result['UniProtID_A'].cat.categories), ['P00533', 'P04637'])
+        self.assertTrue(result['UniProtID_A'].cat.categories.equals(result['UniProtID_B'].cat.categories))
+        self.assertEqual(values(result['Gene_B']), ['P00533', 'EGFR'])
+        self.assertEqual(str(result['taxid_A'].dtype), 'Int32')
+        self.assertEqual(values(result['taxid_B']), [9606, None])
+
+    def test_confidence_scores(self):
+        df = pd.DataFrame({'Confidence value(s)': ['intact-miscore:0.56|author score:high', '-',
+                                                   'author score:0.9|intact-miscore:0.3|intact-miscore:0.8']},
+                          index=[3, 4, 5])
+
+        result = MITAB_parser(df, parsing_data=['confidence']).parse()
+
+        self.assertEqual(list(result.columns), ['confidence_intact-miscore', 'confidence_author score'])
+        self.assertEqual(result.index.tolist(), [3, 4, 5])
+        self.assertEqual(values(result['confidence_intact-miscore']), [0.56, None, 0.3])
+        self.assertEqual(values(result['confidence_author score']), [None, None, 0.9])
+
+    def test_source_database(self):
+        df = pd.DataFrame({'Source database(s)': ['psi-mi:"MI:0469"(IntAct)', '-', 'psi-mi:"MI:0463"(biogrid)', 'MINT']})
+
+        result = MITAB_parser(df, parsing_data=['source']).parse()
+
+        self.assertEqual(values(result['Source_database']), ['intact', None, 'biogrid', 'mint'])
+
+    def test_parse_with_row_filter(self):
+        df = _mitab([('uniprotkb:P04637', 'uniprotkb:P00533', '-', '-'),
+                     ('uniprotkb:P00533', 'uniprotkb:Q9Y6K9', '-', '-'),
+                     ('uniprotkb:Q9Y6K9', 'uniprotkb:P04637', '-', '-'),
+                     ('uniprotkb:P12345', 'uniprotkb:P04637', '-', '-')])
+        df['Confidence value(s)'] = ['intact-miscore:0.7', 'intact-miscore:0.2', 'intact-miscore:0.9', '-']
+        df['Taxid interactor A'] = ['taxid:9606(human)', 'taxid:9606(human)', 'taxid:10090(mouse)', 'taxid:9606']
+        df['Taxid interactor B'] = 'taxid:9606(human)'
+        df['Negative'] = ['false', 'false', 'false', 'true']
+        parser = MITAB_parser(df)
+
+        self.assertEqual(parser.parse(row_filter=MITABFilter(min_score=0.5)).index.tolist(), [0, 2])
+        self.assertEqual(parser.parse(row_filter=MITABFilter(taxids=[9606])).index.tolist(), [0, 1, 3])
+        self.assertEqual(parser.parse(row_filter=MITABFilter(negative=True)).index.tolist(), [3])
+        both = parser.parse(row_filter=MITABFilter(min_score=0.5, taxids=[9606], negative=False))
+        self.assertEqual(both['UniProtID_A'].tolist(), ['P04637'])
+        self.assertEqual(len(parser.parse(row_filter=MITABFilter(min_score=1))), 0)
+
+    def test_row_filter_checks_its_columns(self):
+        with self.assertRaises(Exception):
+            MITAB_parser(_mitab([])).parse(row_filter=MITABFilter(negative=False))
+        with self.assertRaises(ValueError):
+            MITABFilter(negative='false')
+
+
+class TestMITABParserFromFile(unittest.TestCase):
+    def setUp(self):
+        self.df = _mitab([
+            ('uniprotkb:P04637', 'uniprotkb:P00533', 'psi-mi:TP53', 'psi-mi:EGFR'),
+            ('intact:EBI-1', 'uniprotkb:Q9Y6K9', 'psi-mi:Tp53', '-'),
+            ('-', 'uniprotkb:P00533', 'uniprotkb:P12345', 'psi-mi:EGFR'),
+        ] * 3)
+        self.df['Taxid interactor A'] = 'taxid:9606(human)'
+        self.df['Taxid interactor B'] = 'taxid:10090(mouse)'
+        self.df['Feature(s) interactor A'] = 'binding-associated region:1-100|"quoted'
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, 'interactions.txt')
+        self.df.to_csv(self.path, sep='\t', index=False)
+        self.gz_path = self.path + '.gz'
+        with open(self.path, 'rb') as src, gzip.open(self.gz_path, 'wb') as dst:
+            dst.write(src.read())
+
+    def _expected(self):
+        return pd.concat([MITAB_parser(self.df).get_UID_Gene_from_mitab(),
+                          MITAB_parser(self.df).get_taxid_from_mitab()], axis=1)
+
+    def test_reads_plain_and_gzipped_files_in_chunks(self):
+        expected = self._expected()
+        for path in (self.path, self.gz_path):
+            result = MITAB_parser.from_file(path, ['protein_id', 'taxid'], chunksize=4)
+            self.assertEqual(list(result.columns), list(expected.columns))
+            self.assertEqual(result.index.tolist(), list(range(len(self.df))))
+            for column in expected.columns:
+                self.assertEqual(values(result[column]), values(expected[column]))
+
+    def test_compact_chunks_share_categories(self):
+        result = MITAB_parser.from_file(self.path, ['protein_id', 'taxid'], chunksize=2, compact=True)
+        expected = self._expected()
+
+        for a, b in (('UniProtID_A', 'UniProtID_B'), ('Gene_A', 'Gene_B')):
+            self.assertIsInstance(result[a].dtype, pd.CategoricalDtype)
+            self.assertTrue(result[a].cat.categories.equals(result[b].cat.categories))
+            self.assertEqual(values(result[a]), values(expected[a]))
+        self.assertEqual(str(result['taxid_B'].dtype), 'Int32')
+
+    def test_iterator_yields_per_chunk_results(self):
+        chunks = list(MITAB_parser.from_file(self.gz_path, ['taxid'], chunksize=4, iterator=True))
+
+        self.assertEqual([chunk.index.tolist() for chunk in chunks], [[0, 1, 2, 3], [4, 5, 6, 7], [8]])
+        self.assertEqual(values(chunks[2]['taxid_B']), ['10090'])
+
+    def test_parallel_results_keep_file_order(self):
+        expected = self._expected()
+        result = MITAB_parser.from_file(self.gz_path, ['protein_id', 'taxid'], chunksize=2, n_workers=2)
+
+        self.assertEqual(result.index.tolist(), list(range(len(self.df))))
+        for column in expected.columns:
+            self.assertEqual(values(result[column]), values(expected[column]))
+
+    def test_taxid_type(self):
+        for n_workers in (1, 2):
+            result = MITAB_parser.from_file(self.path, ['taxid'], chunksize=4, n_workers=n_workers, compact=True,
+                                            taxid_type='text')
+            self.assertEqual(values(result['taxid_A']), ['human'] * 9)
+            self.assertEqual(list(result['taxid_B'].cat.categories), ['human', 'mouse'])
+        full = MITAB_parser(self.df, ['taxid'], taxid_type='full').parse()
+        self.assertEqual(values(full['taxid_B']), ['10090(mouse)'] * 9)
+        with self.assertRaises(Exception):
+            MITAB_parser.from_file(self.path, ['taxid'], taxid_type='name')
+
+    def test_reads_only_required_columns(self):
+        chunks = list(MITAB_parser._read_chunks(self.path, 4, MITAB_parser._columns_for(['taxid'])))
+
+        self.assertEqual(list(chunks[0].columns), ['Taxid interactor A', 'Taxid interactor B'])
+
+    def test_rejects_file_without_required_columns(self):
+        self.df.drop(columns=['Taxid interactor B']).to_csv(self.path, sep='\t', index=False)
+
+        with self.assertRaises(Exception):
+            MITAB_parser.from_file(self.path, ['taxid'], iterator=True)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_pyarrow_engine(self):
+        expected = self._expected()
+        result = MITAB_parser.from_file(self.gz_path, ['protein_id', 'taxid'], chunksize=4, engine='pyarrow')
+
+        self.assertEqual(result.index.tolist(), list(range(len(self.df))))
+        for column in expected.columns:
+            self.assertEqual(values(result[column]), values(expected[column]))
+
+    def test_row_filter_reads_its_columns(self):
+        self.df['Confidence value(s)'] = ['intact-miscore:0.8', 'intact-miscore:0.1', '-'] * 3
+        self.df.to_csv(self.path, sep='\t', index=False)
+        row_filter = MITABFilter(min_score=0.5)
+
+        for n_workers in (1, 2):
+            result = MITAB_parser.from_file(self.path, ['taxid'], chunksize=4, n_workers=n_workers, row_filter=row_filter)
+            self.assertEqual(result.index.tolist(), [0, 3, 6])
+            self.assertEqual(list(result.columns), ['taxid_A', 'taxid_B'])
+
+    def test_confidence_chunks_share_columns(self):
+        self.df['Confidence value(s)'] = ['intact-miscore:0.8', 'intact-miscore:0.1', '-',
+                                          'author-score:0.5', '-', 'author-score:0.7',
+                                          '-', 'mint-score:0.2|intact-miscore:0.4', '-']
+        self.df.to_csv(self.path, sep='\t', index=False)
+        expected = ['confidence_author-score', 'confidence_intact-miscore', 'confidence_mint-score']
+
+        for n_workers in (1, 2):
+            with self.assertWarns(UserWarning):
+                chunks = list(MITAB_parser.from_file(self.path, ['confidence'], chunksize=3, n_workers=n_workers,
+                                                     iterator=True))
+            self.assertEqual([list(chunk.columns) for chunk in chunks], [expected] * 3)
+        with self.assertWarns(UserWarning):
+            result = MITAB_parser.from_file(self.path, ['confidence'], chunksize=3)
+        self.assertEqual(list(result.columns), expected)
+        self.assertEqual(values(result['confidence_intact-miscore']), [0.8, 0.1, None, None, None, None, None, 0.4, None])
+
+        chosen = MITAB_parser.from_file(self.path, ['confidence'], chunksize=3, iterator=True,
+                                        confidence_methods=['mint-score', 'author-score'])
+        self.assertEqual([list(chunk.columns) for chunk in chosen],
+                         [['confidence_author-score', 'confidence_mint-score']] * 3)
+
+    def test_publication_table_from_file(self):
+        self.df['Publication Identifier(s)'] = ['pubmed:1|imex:IM-1', '-', 'pubmed:2'] * 3
+        self.df.to_csv(self.path, sep='\t', index=False)
+
+        for n_workers in (1, 2):
+            table = MITAB_parser.from_file(self.path, ['publications'], chunksize=2,
+                                           n_workers=n_workers, publications='table')
+            self.assertEqual(table['row_idx'].tolist(), [0, 0, 2, 3, 3, 5, 6, 6, 8])
+            self.assertEqual(table['id'].tolist(), ['1', 'IM-1', '2'] * 3)
+            self.assertEqual(list(table['db'].cat.categories), ['imex', 'pubmed'])
+            self.assertEqual(table.index.tolist(), list(range(9)))
+        chunks = list(MITAB_parser.from_file(self.path, ['publications'], chunksize=4, iterator=True,
+                                             publications='table'))
+        self.assertEqual([chunk['row_idx'].tolist() for chunk in chunks], [[0, 0, 2, 3, 3], [5, 6, 6], [8]])
+
+    def test_publication_table_needs_only_publications(self):
+        with self.assertRaises(ValueError):
+            MITAB_parser.from_file(self.path, ['publications', 'taxid'], publications='table')
+        with self.assertRaises(Exception):
+            MITAB_parser.from_file(self.path, ['publications'], publications='long')
+
+    def test_validates_arguments_before_reading(self):
+        with self.assertRaises(ValueError):
+            MITAB_parser.from_file(self.path, chunksize=0)
+        with self.assertRaises(ValueError):
+            MITAB_parser.from_file(self.path, n_workers=0)
+        with self.assertRaises(Exception):
+            MITAB_parser.from_file(self.path, engine='python')
+        with self.assertRaises(Exception):
+            MITAB_parser.from_file(self.path, ['UniProtID'], iterator=True)
+
+
+class TestResolveMissingUniProtIDs(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+    async def _lookup(self, genes, taxid, **kwargs):
+        self.calls.append((taxid, genes))
+        return {gene: f'{gene}_{taxid}' for gene in genes if gene != 'NOPE'}, ['NOPE']
+
+    def _interactors(self):
+        return pd.DataFrame({'UniProtID_A': ['P1', None, None, None, None],
+                             'UniProtID_B': [None, None, 'P2', None, None],
+                             'Gene_A': ['G1', 'G2', 'G2', 'G2', None],
+                             'Gene_B': ['G2', 'NOPE', 'G1', 'G2', 'G3'],
+                             'taxid_A': ['9606', '9606', '10090', '9606', None],
+                             'taxid_B': ['9606', '9606', '9606', '9606', None]})
+
+    def test_resolves_each_gene_and_taxid_once(self):
+        df = self._interactors()
+
+        result = asyncio.run(resolve_missing_uniprot_ids(df, lookup=self._lookup))
+
+        self.assertEqual(sorted(self.calls), [(9606, ['G2', 'NOPE', 'G3']), (10090, ['G2'])])
+        self.assertEqual(values(result['UniProtID_A']), ['P1', 'G2_9606', 'G2_10090', 'G2_9606', None])
+        self.assertEqual(values(result['UniProtID_B']), ['G2_9606', None, 'P2', 'G2_9606', 'G3_9606'])
+        self.assertEqual(values(df['UniProtID_A']), ['P1', None, None, None, None])
+
+    def test_keeps_compact_dtypes_and_skips_genes_without_taxid(self):
+        compact = _to_compact_dtypes(self._interactors())
+
+        result = asyncio.run(resolve_missing_uniprot_ids(compact, taxid=None, lookup=self._lookup))
+
+        self.assertEqual(sorted(self.calls), [(9606, ['G2', 'NOPE']), (10090, ['G2'])])
+        self.assertIsInstance(result['UniProtID_A'].dtype, pd.CategoricalDtype)
+        self.assertTrue(result['UniProtID_A'].cat.categories.equals(result['UniProtID_B'].cat.categories))
+        self.assertEqual(values(result['UniProtID_B']), ['G2_9606', None, 'P2', 'G2_9606', None])
+
+
 if __name__ == "__main__":
     unittest.main()
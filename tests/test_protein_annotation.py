@@ -1,13 +1,21 @@
 import unittest
+import numpy as np
 import pandas as pd
 import asyncio
 
 from BioTools.protein_annotation import (
+    _get_pdb_structures_batch,
+    _init_error_ids,
+    _iter_pipeline,
+    iter_proteins_info,
+    _match_uniprot_entries,
     _parse_pdb_data,
     _parse_uniprot_data,
     protein_results_to_dataframe,
     get_proteins_info,
 )
+from BioTools.sifts_index import SiftsIndex
+from helpers import FakeResponse, FakeSession
 
 
 class TestProteinAnnotationParsers(unittest.TestCase):
@@ -79,5 +87,182 @@ class TestProteinAnnotationParsers(unittest.TestCase):
             asyncio.run(get_proteins_info([], request_timeout=0))
 
 
+def _collect_pipeline(uniprot_ids, uniprot_session, pdb_session, **kwargs):
+    async def _collect():
+        return [
+            item
+            async for chunk in _iter_pipeline(enumerate(uniprot_ids), uniprot_session, pdb_session, **kwargs)
+            for item in chunk
+        ]
+
+    return sorted(asyncio.run(_collect()))
+
+
+class TestUniProtBatch(unittest.TestCase):
+    def test_match_uniprot_entries_uses_secondary_accessions(self):
+        entries = [
+            {"accession": "P04637", "secondaryAccession": ["Q15086"]},
+            {"accession": "P00533"},
+        ]
+        matched = _match_uniprot_entries(["P00533", "Q15086", "P99999"], entries)
+        self.assertEqual(set(matched), {"P00533", "Q15086"})
+        self.assertEqual(matched["Q15086"]["accession"], "P04637")
+
+    def test_batch_records_only_missing_accessions(self):
+        entry = {
+            "accession": "P04637",
+            "gene": [{"name": {"value": "TP53"}}],
+            "organism": {"taxonomy": 9606},
+            "sequence": {"sequence": "MEEPQSDPSV"},
+        }
+        uniprot_session = FakeSession({"https://www.ebi.ac.uk/proteins/api/proteins": (200, [entry])})
+        pdb_session = FakeSession({
+            "https://www.ebi.ac.uk/pdbe/api/mappings/best_structures/": (200, {"P04637": [{"pdb_id": "1tup"}]}),
+        })
+
+        results = _collect_pipeline(
+            ["P04637", "P99999"], uniprot_session, pdb_session, batch_size=100, per_request_retries=0,
+        )
+
+        self.assertEqual(results[0][2]["Gene"], "TP53")
+        self.assertEqual(results[0][2]["PDB"], ["1tup"])
+        self.assertEqual(results[0][3], ["Annotation", "GO_terms"])
+        self.assertEqual(results[1][2:], (None, ["UniProtID"]))
+        self.assertEqual(uniprot_session.calls[0][2]["accession"], "P04637,P99999")
+
+    def test_pdb_batch_records_accessions_without_structures(self):
+        session = FakeSession({
+            "https://www.ebi.ac.uk/pdbe/api/mappings/best_structures/": (200, {"P04637": [{"pdb_id": "1tup"}]}),
+        })
+        error_ids = _init_error_ids()
+
+        data = asyncio.run(_get_pdb_structures_batch(["P04637", "P00533"], session, error_ids))
+
+        self.assertEqual(_parse_pdb_data(data, "P04637"), ["1tup"])
+        self.assertEqual(error_ids["PDB"], ["P00533"])
+        self.assertEqual(
+            session.calls,
+            [("POST", "https://www.ebi.ac.uk/pdbe/api/mappings/best_structures/", None, "P04637,P00533")],
+        )
+
+    def test_pdb_batch_treats_404_as_no_structures(self):
+        error_ids = _init_error_ids()
+        data = asyncio.run(_get_pdb_structures_batch(["P99999"], FakeSession({}), error_ids))
+        self.assertEqual(data, {})
+        self.assertEqual(error_ids["PDB"], ["P99999"])
+
+    def test_get_proteins_info_validates_batch_size(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(get_proteins_info([], batch_size=101))
+
+
+class _GatedResponse(FakeResponse):
+    """UniProt response that is only delivered after the PDB stage has been queried."""
+
+    def __init__(self, status, payload, gate):
+        super().__init__(status, payload)
+        self.gate = gate
+
+    async def json(self):
+        await self.gate.wait()
+        return self._payload
+
+
+class TestPipeline(unittest.TestCase):
+    def test_pdb_stage_does_not_wait_for_uniprot_stage(self):
+        async def _run():
+            gate = asyncio.Event()
+            uniprot_session = FakeSession({})
+            uniprot_session.get = lambda url, params=None, headers=None: _GatedResponse(
+                200, {"gene": [{"name": {"value": "TP53"}}]}, gate
+            )
+            pdb_session = FakeSession({})
+
+            def _pdb_get(url, params=None, headers=None):
+                gate.set()
+                return FakeResponse(200, {"P04637": [{"pdb_id": "1tup"}]})
+
+            pdb_session.get = _pdb_get
+            chunks = [
+                chunk async for chunk in _iter_pipeline(
+                    enumerate(["P04637"]), uniprot_session, pdb_session,
+                    uniprot_concurrent=1, pdb_concurrent=1,
+                )
+            ]
+            return chunks
+
+        chunks = asyncio.run(asyncio.wait_for(_run(), timeout=5))
+        (index, uid, result, errors), = chunks[0]
+        self.assertEqual((index, uid, result["Gene"], result["PDB"]), (0, "P04637", "TP53", ["1tup"]))
+
+    def test_pdb_errors_are_reported_only_for_found_entries(self):
+        uniprot_session = FakeSession({
+            "https://www.ebi.ac.uk/proteins/api/proteins/P04637": (200, {"gene": [{"name": {"value": "TP53"}}]}),
+        })
+        results = _collect_pipeline(["P04637", "P99999"], uniprot_session, FakeSession({}), per_request_retries=0)
+
+        self.assertIn("PDB", results[0][3])
+        self.assertEqual(results[0][2]["PDB"], [])
+        self.assertEqual(results[1][3], ["UniProtID"])
+
+    def test_pdb_index_replaces_pdb_requests(self):
+        entry = {"accession": "P04637", "gene": [{"name": {"value": "TP53"}}]}
+        uniprot_session = FakeSession({"https://www.ebi.ac.uk/proteins/api/proteins": (200, [entry])})
+        pdb_session = FakeSession({})
+        sifts = SiftsIndex(np.array(["P04637"]), np.array([0, 2]), np.array(["1tup", "2ocj"]), np.array([0, 1]))
+
+        results = _collect_pipeline(["P04637", "P00533"], uniprot_session, pdb_session, batch_size=100,
+                                    per_request_retries=0, pdb_index=sifts)
+
+        self.assertEqual(pdb_session.calls, [])
+        self.assertEqual(sorted(results[0][2]["PDB"]), ["1tup", "2ocj"])
+        self.assertNotIn("PDB", results[0][3])
+        self.assertEqual(results[1][3], ["UniProtID"])
+
+    def test_window_bounds_items_in_flight(self):
+        state = {"read": 0, "yielded": 0, "max_in_flight": 0}
+
+        async def _ids():
+            for i in range(20):
+                state["read"] += 1
+                state["max_in_flight"] = max(state["max_in_flight"], state["read"] - state["yielded"])
+                yield (i, f"P{i:05d}")
+
+        async def _run():
+            async for chunk in _iter_pipeline(
+                _ids(), FakeSession({}), FakeSession({}), batch_size=3, per_request_retries=0, window=4,
+            ):
+                state["yielded"] += len(chunk)
+
+        asyncio.run(asyncio.wait_for(_run(), timeout=5))
+
+        self.assertEqual(state["yielded"], 20)
+        self.assertLessEqual(state["max_in_flight"], 4)
+
+    def test_early_exit_leaves_no_pending_tasks(self):
+        async def _run():
+            pipeline = _iter_pipeline(
+                enumerate(f"P{i:05d}" for i in range(50)), FakeSession({}), FakeSession({}),
+                batch_size=2, per_request_retries=0, window=4,
+            )
+            await pipeline.__anext__()
+            await pipeline.aclose()
+            return asyncio.all_tasks() - {asyncio.current_task()}
+
+        self.assertEqual(asyncio.run(_run()), set())
+
+    def test_iter_proteins_info_validates_window(self):
+        async def _first():
+            async for item in iter_proteins_info(["P04637"], window=0):
+                return item
+
+        with self.assertRaises(ValueError):
+            asyncio.run(_first())
+
+    def test_get_proteins_info_validates_stage_concurrency(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(get_proteins_info([], pdb_concurrent=0))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,227 @@
+import asyncio
+import contextlib
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from BioTools.protein_annotation import get_proteins_info, iter_proteins_info
+from BioTools.protein_index import ProteinIndex
+from BioTools.sifts_index import SiftsIndex
+from helpers import FakeSession
+
+FLAT = """\
+ID   P53_HUMAN               Reviewed;         393 AA.
+AC   P04637; Q15086; Q15087;
+AC   Q9UQ61;
+DE   RecName: Full=Cellular tumor antigen p53;
+GN   Name=TP53 {ECO:0000312|HGNC:HGNC:11998}; Synonyms=P53;
+OS   Homo sapiens (Human).
+OX   NCBI_TaxID=9606;
+CC   -!- FUNCTION: Acts as a tumor suppressor in many tumor types
+CC       (PubMed:11025664). {ECO:0000269|PubMed:11025664}.
+CC   -!- FUNCTION: [Isoform 2]: May be secreted.
+CC   -!- SUBCELLULAR LOCATION: Cytoplasm.
+CC   ---------------------------------------------------------------------------
+CC   Copyrighted by the UniProt Consortium
+CC   ---------------------------------------------------------------------------
+DR   PDB; 2OCJ; X-ray; 2.05 A; A/B/C/D=94-293.
+DR   PDB; 1A1U; NMR; -; A/C=324-358.
+DR   GO; GO:0005737; C:cytoplasm; IDA:UniProtKB.
+DR   GO; GO:0003677; F:DNA binding; IDA:UniProtKB.
+SQ   SEQUENCE   12 AA;  1000 MW;  0000000000000000 CRC64;
+     MEEPQSDPSV EP
+//
+ID   A0A000_MOUSE            Unreviewed;         5 AA.
+AC   A0A000;
+OX   NCBI_TaxID=10090 {ECO:0000313|EMBL:AAA1};
+SQ   SEQUENCE   5 AA;  500 MW;  0000000000000000 CRC64;
+     MTAKQ
+//
+"""
+
+XML = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<uniprot xmlns="http://uniprot.org/uniprot">
+<entry dataset="Swiss-Prot">
+  <accession>P04637</accession>
+  <accession>Q15086</accession>
+  <name>P53_HUMAN</name>
+  <gene><name type="synonym">P53</name><name type="primary">TP53</name></gene>
+  <organism><dbReference type="NCBI Taxonomy" id="9606"/></organism>
+  <comment type="function"><text evidence="1">Acts as a tumor suppressor in many tumor types (PubMed:11025664).</text></comment>
+  <dbReference type="PDB" id="2OCJ"/>
+  <dbReference type="PDB" id="1A1U"/>
+  <dbReference type="GO" id="GO:0005737"><property type="term" value="C:cytoplasm"/></dbReference>
+  <dbReference type="GO" id="GO:0003677"><property type="term" value="F:DNA binding"/></dbReference>
+  <sequence length="12">MEEPQSDPSV
+EP</sequence>
+</entry>
+<entry dataset="TrEMBL">
+  <accession>A0A000</accession>
+  <organism><dbReference type="NCBI Taxonomy" id="10090"/></organism>
+  <sequence length="5">MTAKQ</sequence>
+</entry>
+</uniprot>
+"""
+
+EBI_ENTRY = {
+    "accession": "P04637",
+    "secondaryAccession": ["Q15086"],
+    "gene": [{"name": {"value": "TP53"}}],
+    "organism": {"taxonomy": 9606},
+    "comments": [{"type": "FUNCTION", "text": [{"value": "Acts as a tumor suppressor in many tumor types (PubMed:11025664)."}]}],
+    "dbReferences": [
+        {"type": "PDB", "id": "2OCJ"},
+        {"type": "PDB", "id": "1A1U"},
+        {"type": "GO", "id": "GO:0005737", "properties": {"term": "C:cytoplasm"}},
+        {"type": "GO", "id": "GO:0003677", "properties": {"term": "F:DNA binding"}},
+    ],
+    "sequence": {"sequence": "MEEPQSDPSVEP"},
+}
+
+REST_ENTRY = {
+    "primaryAccession": "A0A000",
+    "organism": {"taxonId": 10090},
+    "uniProtKBCrossReferences": [{"database": "GO", "id": "GO:0005634", "properties": [{"key": "GoTerm", "value": "C:nucleus"}]}],
+    "sequence": {"value": "MTAKQ"},
+}
+
+P53 = {
+    "Gene": "TP53",
+    "TaxID": 9606,
+    "Annotation": "Acts as a tumor suppressor in many tumor types (PubMed:11025664).",
+    "GO_terms": {"GO:0005737": "C:cytoplasm", "GO:0003677": "F:DNA binding"},
+    "Sequence": "MEEPQSDPSVEP",
+    "PDB": ["1a1u", "2ocj"],
+}
+
+
+class TestProteinIndex(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.dir = tmpdir.name
+        self.db_path = os.path.join(self.dir, "proteins.sqlite")
+        self.index = ProteinIndex(self.db_path)
+        self.addCleanup(self.index.close)
+
+    def _write(self, name, text):
+        path = os.path.join(self.dir, name)
+        with (gzip.open(path, "wt") if name.endswith(".gz") else open(path, "w")) as f:
+            f.write(text)
+        return path
+
+    def test_flat_file(self):
+        self.assertEqual(self.index.ingest(self._write("uniprot_sprot.dat.gz", FLAT)), 2)
+
+        found = self.index.lookup(["P04637", "Q9UQ61", "A0A000", "P00000"])
+
+        self.assertEqual(found["P04637"], P53)
+        self.assertEqual(found["Q9UQ61"], P53)
+        self.assertEqual(found["A0A000"], {"Gene": "N/A", "TaxID": 10090, "Annotation": "N/A", "GO_terms": {},
+                                           "Sequence": "MTAKQ", "PDB": []})
+        self.assertNotIn("P00000", found)
+
+    def test_xml_file(self):
+        self.index.ingest(self._write("uniprot_sprot.xml", XML))
+
+        found = self.index.lookup(["Q15086", "A0A000"])
+
+        self.assertEqual(found["Q15086"], P53)
+        self.assertEqual(found["A0A000"]["TaxID"], 10090)
+
+    def test_json_lines_in_both_layouts(self):
+        path = self._write("entries.jsonl", json.dumps(EBI_ENTRY) + "\n\n" + json.dumps(REST_ENTRY) + "\n")
+        self.index.ingest(path)
+
+        found = self.index.lookup(["P04637", "A0A000"])
+
+        self.assertEqual(found["P04637"], P53)
+        self.assertEqual(found["A0A000"]["GO_terms"], {"GO:0005634": "C:nucleus"})
+        self.assertEqual(found["A0A000"]["Sequence"], "MTAKQ")
+        with self.assertRaises(ValueError):
+            self.index.ingest(path, format="fasta")
+
+    def test_get_proteins_info_local_backend(self):
+        self.index.ingest(self._write("uniprot_sprot.dat", FLAT))
+
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            results, error_ids = asyncio.run(get_proteins_info(["P04637", "P00000", "A0A000"], backend="local",
+                                                               protein_index=self.db_path))
+
+        self.assertEqual(results[0], dict(P53, UniProtID="P04637"))
+        self.assertEqual([result["UniProtID"] for result in results], ["P04637", "A0A000"])
+        self.assertEqual(error_ids["UniProtID"], ["P00000"])
+        self.assertEqual(sorted(error_ids["PDB"]), ["A0A000"])
+        self.assertEqual(sorted(error_ids["Gene"]), ["A0A000"])
+
+    def test_local_backend_matches_api_results(self):
+        self.index.ingest(self._write("entries.jsonl", json.dumps(EBI_ENTRY) + "\n"))
+        uniprot_session = FakeSession({"https://www.ebi.ac.uk/proteins/api/proteins": (200, [EBI_ENTRY])})
+        pdb_session = FakeSession({
+            "https://www.ebi.ac.uk/pdbe/api/mappings/best_structures/":
+                (200, {"P04637": [{"pdb_id": "1a1u"}, {"pdb_id": "2ocj"}]}),
+        })
+
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            local, _ = asyncio.run(get_proteins_info(["P04637"], backend="local", protein_index=self.index))
+            api, _ = asyncio.run(get_proteins_info(["P04637"], batch_size=100, per_request_retries=0,
+                                                   uniprot_session=uniprot_session, pdb_session=pdb_session))
+
+        # the API path collects PDB IDs in a set, so only their values are compared
+        self.assertEqual(sorted(api[0].pop("PDB")), local[0].pop("PDB"))
+        self.assertEqual(local, api)
+
+    def test_get_proteins_info_columnar(self):
+        self.index.ingest(self._write("uniprot_sprot.dat", FLAT))
+
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            table, error_ids = asyncio.run(get_proteins_info(["A0A000", "P00000", "Q15086"], backend="local",
+                                                             protein_index=self.index, columnar=True))
+            df, _ = asyncio.run(get_proteins_info(["A0A000", "Q15086"], backend="local", protein_index=self.index,
+                                                  columnar=True, return_dataframe=True))
+
+        self.assertEqual(len(table), 2)
+        self.assertEqual(error_ids["UniProtID"], ["P00000"])
+        self.assertEqual(df.index.tolist(), ["A0A000", "Q15086"])
+        self.assertEqual(list(df.loc["Q15086", "PDB"]), P53["PDB"])
+        self.assertEqual(df.loc["Q15086", "Sequence"], P53["Sequence"])
+
+    def test_iter_proteins_info_local_backend(self):
+        self.index.ingest(self._write("uniprot_sprot.dat", FLAT))
+
+        async def collect():
+            return [item async for item in iter_proteins_info(["Q15087", "P00000"], backend="local", protein_index=self.index)]
+
+        (uid, result, errors), (missing_uid, missing, missing_errors) = asyncio.run(collect())
+        self.assertEqual((uid, result["Gene"], errors), ("Q15087", "TP53", []))
+        self.assertEqual((missing_uid, missing, missing_errors), ("P00000", None, ["UniProtID"]))
+
+    def test_local_backend_with_sifts_index(self):
+        self.index.ingest(self._write("uniprot_sprot.dat", FLAT))
+        sifts = SiftsIndex(np.array(["P04637"]), np.array([0, 1]), np.array(["1tup"]), np.array([0]))
+
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            results, error_ids = asyncio.run(get_proteins_info(["Q15086", "A0A000"], backend="local",
+                                                               protein_index=self.index, pdb_index=sifts))
+            with self.assertRaises(FileNotFoundError):
+                asyncio.run(get_proteins_info(["Q15086"], backend="local", protein_index=self.index,
+                                              pdb_index=os.path.join(self.dir, "missing")))
+
+        self.assertEqual(results[0]["PDB"], ["1tup"])
+        self.assertEqual(error_ids["PDB"], ["A0A000"])
+
+    def test_validates_backend(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(get_proteins_info(["P04637"], backend="uniprot"))
+        with self.assertRaises(ValueError):
+            asyncio.run(get_proteins_info(["P04637"], backend="local"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from BioTools.protein_annotation import get_proteins_info
+from BioTools.protein_table import ProteinTable
+from helpers import values
+
+P53 = {
+    "Gene": "TP53",
+    "TaxID": 9606,
+    "Annotation": "Acts as a tumor suppressor.",
+    "GO_terms": {"GO:0005737": "C:cytoplasm", "GO:0003677": "F:DNA binding"},
+    "Sequence": "MEEPQSDPSVEP",
+    "PDB": ["1A1U", "2OCJ"],
+}
+EGFR = {
+    "Gene": "EGFR",
+    "TaxID": 9606,
+    "Annotation": "N/A",
+    "GO_terms": {"GO:0005737": "C:cytoplasm"},
+    "Sequence": "MRPSGTAGAALLALLAALCPASRA",
+    "PDB": ["1IVO"],
+}
+UNKNOWN = {"Gene": "N/A", "TaxID": "N/A", "Annotation": "N/A", "GO_terms": {}, "Sequence": "MTAKQ", "PDB": []}
+
+
+def _table():
+    # appended out of order, like chunks completing out of order
+    table = ProteinTable()
+    table.append("P00533", EGFR, position=2)
+    table.append("P04637", P53, position=0)
+    table.append("A0A000", UNKNOWN, position=1)
+    return table
+
+
+class TestProteinTable(unittest.TestCase):
+    def test_to_arrow(self):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+
+        arrow_table = _table().to_arrow()
+
+        self.assertEqual(arrow_table.column_names,
+                         ["UniProtID", "Gene", "TaxID", "Annotation", "Sequence", "GO_ids", "GO_labels", "PDB"])
+        self.assertEqual(arrow_table.column("UniProtID").to_pylist(), ["P04637", "A0A000", "P00533"])
+        self.assertEqual(arrow_table.column("Gene").to_pylist(), ["TP53", None, "EGFR"])
+        self.assertEqual(arrow_table.column("TaxID").to_pylist(), [9606, None, 9606])
+        self.assertEqual(arrow_table.column("Sequence").to_pylist()[2], EGFR["Sequence"])
+        self.assertEqual(arrow_table.column("GO_ids").to_pylist(),
+                         [["GO:0005737", "GO:0003677"], [], ["GO:0005737"]])
+        self.assertEqual(arrow_table.column("GO_labels").to_pylist()[0], ["C:cytoplasm", "F:DNA binding"])
+        self.assertEqual(arrow_table.column("PDB").to_pylist(), [["1A1U", "2OCJ"], [], ["1IVO"]])
+        self.assertTrue(pa.types.is_dictionary(arrow_table.schema.field("PDB").type.value_type))
+
+    def test_to_pandas(self):
+        df = _table().to_pandas()
+
+        self.assertEqual(df.index.tolist(), ["P04637", "A0A000", "P00533"])
+        self.assertEqual(values(df["Annotation"]), ["Acts as a tumor suppressor.", None, None])
+        self.assertEqual(values(df["TaxID"]), [9606, None, 9606])
+        self.assertEqual([list(value) for value in df["GO_ids"]], [["GO:0005737", "GO:0003677"], [], ["GO:0005737"]])
+
+    def test_to_pandas_without_pyarrow(self):
+        table = _table()
+        with mock.patch.object(ProteinTable, "to_arrow", side_effect=ImportError):
+            df = table.to_pandas(set_index=False)
+
+        self.assertEqual(df["UniProtID"].tolist(), ["P04637", "A0A000", "P00533"])
+        self.assertEqual(values(df["Gene"]), ["TP53", None, "EGFR"])
+        self.assertEqual(values(df["TaxID"]), [9606, None, 9606])
+        self.assertEqual(df["GO_labels"].tolist(), [["C:cytoplasm", "F:DNA binding"], [], ["C:cytoplasm"]])
+        self.assertEqual(df["PDB"].tolist(), [["1A1U", "2OCJ"], [], ["1IVO"]])
+
+    def test_append_after_export_raises(self):
+        table = ProteinTable()
+        table.append("P04637", P53)
+        exported = table.to_pandas()
+
+        with self.assertRaises(RuntimeError):
+            table.append("P00533", EGFR)
+        self.assertEqual(len(table), 1)
+        self.assertEqual(exported.index.tolist(), ["P04637"])
+
+    def test_get_proteins_info_fills_the_table_in_input_order(self):
+        async def stream(items, protein_index, pdb_index=None):
+            yield [(2, "P00533", EGFR, [])]
+            yield [(1, "P00000", None, ["UniProtID"]), (3, "A0A000", UNKNOWN, [])]
+            yield [(0, "P04637", P53, [])]
+
+        with mock.patch("BioTools.protein_annotation._stream_local", stream), \
+                contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            table, error_ids = asyncio.run(get_proteins_info(["P04637", "P00000", "P00533", "A0A000"],
+                                                             backend="local", protein_index="index.sqlite",
+                                                             columnar=True))
+
+        self.assertIsNone(table._order())
+        self.assertEqual(table._strings["UniProtID"].to_list(), ["P04637", "P00533", "A0A000"])
+        self.assertEqual(error_ids["UniProtID"], ["P00000"])
+
+    def test_empty_table(self):
+        table = ProteinTable()
+
+        self.assertEqual(len(table), 0)
+        self.assertEqual(len(table.to_pandas()), 0)
+        with mock.patch.object(ProteinTable, "to_arrow", side_effect=ImportError):
+            self.assertEqual(len(table.to_pandas()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
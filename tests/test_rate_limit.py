@@ -0,0 +1,107 @@
+import asyncio
+import time
+import unittest
+
+from BioTools.rate_limit import (
+    AdaptiveConcurrency,
+    RateLimiter,
+    TokenBucket,
+    backoff_delay,
+    fetch_json,
+    parse_retry_after,
+)
+from helpers import FakeResponse
+
+
+class _ScriptedSession:
+    """Returns the scripted responses one after another."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+class TestBackoff(unittest.TestCase):
+    def test_backoff_grows_exponentially_within_jitter_bounds(self):
+        for attempt, full_delay in [(0, 0.5), (1, 1.0), (3, 4.0), (10, 60.0)]:
+            delay = backoff_delay(attempt, base_delay=0.5, max_delay=60.0)
+            self.assertGreaterEqual(delay, full_delay / 2)
+            self.assertLessEqual(delay, full_delay)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    def test_halves_once_per_window_and_grows_additively(self):
+        concurrency = AdaptiveConcurrency(max_limit=8)
+        concurrency.on_throttle(epoch=0)
+        concurrency.on_throttle(epoch=0)
+        self.assertEqual(concurrency.limit, 4)
+
+        for _ in range(4):
+            concurrency.on_success()
+        self.assertEqual(concurrency.limit, 5)
+
+    def test_limit_never_drops_below_minimum(self):
+        concurrency = AdaptiveConcurrency(max_limit=2)
+        for epoch in range(5):
+            concurrency.on_throttle(epoch)
+        self.assertEqual(concurrency.limit, 1)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_services_on_one_host_are_limited_independently(self):
+        limiter = RateLimiter(max_concurrent=4)
+        uniprot = limiter.for_url("https://www.ebi.ac.uk/proteins/api/proteins/P04637")
+        pdb = limiter.for_url("https://www.ebi.ac.uk/pdbe/api/mappings/best_structures/P04637")
+        self.assertIsNot(uniprot, pdb)
+        self.assertIs(uniprot, limiter.for_url("https://www.ebi.ac.uk/proteins/api/proteins/P00533"))
+
+    def test_token_bucket_caps_rate(self):
+        async def _acquire_all():
+            bucket = TokenBucket(rate=100, burst=1)
+            start = time.monotonic()
+            for _ in range(6):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(_acquire_all()), 0.045)
+
+    def test_fetch_json_honors_retry_after_and_throttles(self):
+        session = _ScriptedSession([
+            FakeResponse(429, headers={"Retry-After": "0.05"}),
+            FakeResponse(200, {"ok": True}),
+        ])
+        limiter = RateLimiter(max_concurrent=4)
+
+        async def _fetch():
+            start = time.monotonic()
+            result = await fetch_json(session, "GET", "https://mygene.info/v3/query", limiter=limiter,
+                                      retry_delay=0.001)
+            return result, time.monotonic() - start
+
+        (status, payload), elapsed = asyncio.run(_fetch())
+
+        self.assertEqual((status, payload), (200, {"ok": True}))
+        self.assertGreaterEqual(elapsed, 0.05)
+        stats = limiter.stats()["mygene.info/v3"]
+        self.assertEqual(stats["throttled"], 1)
+        self.assertEqual(stats["limit"], 2)
+
+    def test_fetch_json_gives_up_after_retries(self):
+        session = _ScriptedSession([FakeResponse(500), FakeResponse(500)])
+        result = asyncio.run(fetch_json(session, "GET", "https://mygene.info/v3/query", retries=1, retry_delay=0.001))
+        self.assertEqual(result, (None, None))
+        self.assertEqual(session.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
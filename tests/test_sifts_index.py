@@ -0,0 +1,52 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from BioTools.sifts_index import SiftsIndex
+
+# 2OCJ maps to P04637 through several chains
+SIFTS = """\
+# 2024/01/10 - 11:04 | PDB: 01.24 | UNP: 2024.01
+PDB\tCHAIN\tSP_PRIMARY\tRES_BEG\tRES_END\tPDB_BEG\tPDB_END\tSP_BEG\tSP_END
+2ocj\tA\tP04637\t1\t200\t94\t293\t94\t293
+2ocj\tB\tP04637\t1\t200\t94\t293\t94\t293
+1a1u\tA\tP04637\t1\t35\t324\t358\t324\t358
+1ivo\tA\tP00533\t1\t600\t1\t600\t25\t624
+1TUP\tA\tP04637\t1\t200\t94\t293\t94\t293
+"""
+
+
+class TestSiftsIndex(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.dir = tmpdir.name
+        self.path = os.path.join(self.dir, "pdb_chain_uniprot.tsv.gz")
+        with gzip.open(self.path, "wt") as f:
+            f.write(SIFTS)
+
+    def test_builds_csr_index(self):
+        sifts = SiftsIndex.from_tsv(self.path)
+
+        self.assertEqual(sifts.accessions.tolist(), ["P00533", "P04637"])
+        self.assertEqual(sifts.indptr.tolist(), [0, 1, 4])
+        self.assertEqual(sifts.pdb_codes.tolist(), ["1a1u", "1ivo", "1tup", "2ocj"])
+        self.assertEqual(sifts.pdb_ids("P04637"), ["1a1u", "1tup", "2ocj"])
+        self.assertEqual(sifts.pdb_ids("P99999"), [])
+        self.assertEqual(sifts.lookup(["Q00000", "P00533", "ZZZZZZ"]), {"P00533": ["1ivo"]})
+
+    def test_save_and_load_memory_mapped(self):
+        SiftsIndex.from_tsv(self.path).save(os.path.join(self.dir, "sifts"))
+
+        sifts = SiftsIndex.load(os.path.join(self.dir, "sifts"))
+
+        self.assertIsInstance(sifts.structures, np.memmap)
+        self.assertEqual(len(sifts), 2)
+        self.assertEqual(sifts.pdb_ids("P00533"), ["1ivo"])
+
+
+if __name__ == "__main__":
+    unittest.main()